@@ -2,9 +2,26 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from typing import Protocol
 
+# Candidate budget for queries whose filters run after the vector search
+OVERFETCH_FACTOR = 3
+MAX_OVERFETCH = 200
+
+
+def overfetch_limit(limit: int, post_filtered: bool) -> int:
+    """Number of neighbours to request so post-filtering can still fill limit.
+
+    Post-filtered queries fetch OVERFETCH_FACTOR times the limit, capped at
+    MAX_OVERFETCH so large limits don't widen the HNSW search several-fold,
+    but never fewer than limit itself.
+    """
+    if not post_filtered:
+        return limit
+    return max(limit, min(limit * OVERFETCH_FACTOR, MAX_OVERFETCH))
+
 
 @dataclass
 class VectorResult:
@@ -23,6 +40,14 @@ class VectorBackend(Protocol):
         self, id: str, text: str, embedding: list[float], metadata: dict
     ) -> None: ...
 
+    def insert_many(
+        self,
+        ids: list[str],
+        texts: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict],
+    ) -> None: ...
+
     def update(
         self,
         id: str,
@@ -31,19 +56,27 @@ class VectorBackend(Protocol):
         metadata: dict | None,
     ) -> None: ...
 
+    def update_metadata(self, id: str, updates: dict) -> None: ...
+
+    def update_metadata_many(self, ids: list[str], updates: dict) -> None: ...
+
     def delete(self, ids: list[str]) -> None: ...
 
     def query(
         self, embedding: list[float], limit: int, where: dict | None = None,
-        query_text: str | None = None,
+        query_text: str | None = None, with_text: bool = True,
     ) -> list[VectorResult]: ...
 
     def get(self, ids: list[str]) -> list[VectorResult]: ...
 
+    def exists(self, ids: list[str]) -> set[str]: ...
+
     def scan(
         self, offset: int, limit: int, where: dict | None = None
     ) -> tuple[list[VectorResult], int]: ...
 
+    def iter_metadata(self, where: dict | None = None) -> Iterator[tuple[str, dict]]: ...
+
     def count(self, where: dict | None = None) -> int: ...
 
 
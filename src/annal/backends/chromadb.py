@@ -3,21 +3,135 @@
 from __future__ import annotations
 
 import json
+import os
+import sys
+import threading
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
 
 import chromadb
 
-from annal.backend import VectorResult
+from annal.backend import VectorResult, overfetch_limit
+
+try:
+    import orjson
+
+    def _dumps_tags(tags: list[str]) -> str:
+        return orjson.dumps(tags).decode()
+
+    _loads_tags = orjson.loads
+except ImportError:  # optional speedup, see the "fast" extra
+    _dumps_tags = json.dumps
+    _loads_tags = json.loads
+
+
+@lru_cache(maxsize=4096)
+def _parse_tags(raw: str) -> tuple[str, ...]:
+    """Parse a stored tags string; memories mostly reuse a small tag vocabulary.
+
+    Tags are interned so equal tags across rows are one object and compare
+    by identity first.
+    """
+    return tuple(sys.intern(tag) for tag in _loads_tags(raw))
+
+
+# Each tag is mirrored into a boolean "tag:<name>" key so tag filters run
+# inside Chroma; removed tags have their keys deleted
+_TAG_KEY = "tag:"
+# HNSW settings for new collections: a denser graph (M 24 vs 16) and a wider
+# build beam raise recall at the same search beam. Chroma fixes these at
+# creation, so existing collections keep the ones they were built with.
+_COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 24,
+    "hnsw:construction_ef": 128,
+    "hnsw:search_ef": 100,
+}
+
+# created_at is mirrored as integer epoch milliseconds, since Chroma only
+# range-compares numbers
+_CREATED_MS_KEY = "created_at_ms"
+
+# One client per data directory, shared by every project's collection
+_clients: dict[str, chromadb.ClientAPI] = {}
+_clients_lock = threading.Lock()
+
+
+def _client_for(path: str) -> chromadb.ClientAPI:
+    """Get or create the PersistentClient for a data directory."""
+    key = os.path.realpath(path)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = chromadb.PersistentClient(path=path)
+        return client
+
+
+def clear_client(path: str) -> None:
+    """Drop and close the cached client for a data directory.
+
+    Only call this once no ChromaBackend for path is in use; the next
+    backend opened there gets a fresh client.
+    """
+    with _clients_lock:
+        client = _clients.pop(os.path.realpath(path), None)
+    close = getattr(client, "close", None)  # Client.close arrived in Chroma 1.x
+    if close is not None:
+        close()
+
+
+def _epoch_ms(value: object) -> int | None:
+    """ISO 8601 timestamp as epoch milliseconds, naive values taken as UTC."""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
 
 
 class ChromaBackend:
     """VectorBackend implementation backed by ChromaDB PersistentClient."""
 
     def __init__(self, path: str, collection_name: str, dimension: int) -> None:
-        self._client = chromadb.PersistentClient(path=path)
+        self._client = _client_for(path)
         self._collection = self._client.get_or_create_collection(
             name=collection_name,
-            metadata={"hnsw:space": "cosine"},
+            metadata=_COLLECTION_METADATA,
         )
+        # Chroma rejects adds larger than its SQLite-bound batch limit
+        self._max_batch = self._client.get_max_batch_size()
+        self._ensure_derived_keys(Path(path) / f"{collection_name}.derived-keys")
+
+    def _ensure_derived_keys(self, marker: Path) -> None:
+        """Backfill tag and timestamp keys on rows written before they existed (runs once)."""
+        if marker.exists():
+            return
+        offset = 0
+        while True:
+            batch = self._collection.get(
+                include=["metadatas"], limit=self._max_batch, offset=offset,
+            )
+            ids, metadatas = [], []
+            for doc_id, meta in zip(batch["ids"], batch["metadatas"]):
+                derived: dict = {f"{_TAG_KEY}{t}": True for t in self._stored_tags(meta)}
+                created_ms = _epoch_ms(meta.get("created_at")) if meta else None
+                if created_ms is not None:
+                    derived[_CREATED_MS_KEY] = created_ms
+                if derived:
+                    ids.append(doc_id)
+                    metadatas.append(derived)
+            if ids:
+                self._collection.update(ids=ids, metadatas=metadatas)
+            if len(batch["ids"]) < self._max_batch:
+                break
+            offset += self._max_batch
+        marker.touch()
 
     def insert(self, id: str, text: str, embedding: list[float], metadata: dict) -> None:
         meta = self._serialize_meta(metadata)
@@ -25,6 +139,22 @@ class ChromaBackend:
             ids=[id], documents=[text], embeddings=[embedding], metadatas=[meta]
         )
 
+    def insert_many(
+        self,
+        ids: list[str],
+        texts: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict],
+    ) -> None:
+        step = self._max_batch
+        for i in range(0, len(ids), step):
+            self._collection.add(
+                ids=ids[i:i + step],
+                documents=texts[i:i + step],
+                embeddings=embeddings[i:i + step],
+                metadatas=[self._serialize_meta(m) for m in metadatas[i:i + step]],
+            )
+
     def update(
         self,
         id: str,
@@ -32,82 +162,107 @@ class ChromaBackend:
         embedding: list[float] | None,
         metadata: dict | None,
     ) -> None:
-        current = self._collection.get(ids=[id], include=["documents", "metadatas"])
+        current = self._collection.get(ids=[id], include=["metadatas"])
         if not current["ids"]:
             raise ValueError(f"Document {id} not found")
 
-        new_doc = text if text is not None else current["documents"][0]
-        new_meta = self._serialize_meta(metadata) if metadata is not None else current["metadatas"][0]
+        if metadata is not None:
+            new_meta = self._serialize_meta(metadata, self._stored_tags(current["metadatas"][0]))
+        else:
+            new_meta = current["metadatas"][0]
 
-        kwargs: dict = {"ids": [id], "documents": [new_doc], "metadatas": [new_meta]}
+        # Passing documents without embeddings makes Chroma re-embed them with
+        # its own default model, so the kept text is left out entirely
+        kwargs: dict = {"ids": [id], "metadatas": [new_meta]}
+        if text is not None:
+            kwargs["documents"] = [text]
         if embedding is not None:
             kwargs["embeddings"] = [embedding]
         self._collection.update(**kwargs)
 
+    def update_metadata(self, id: str, updates: dict) -> None:
+        """Merge the given keys into a document's metadata, leaving others untouched."""
+        previous_tags: list[str] = []
+        if "tags" in updates:
+            current = self._collection.get(ids=[id], include=["metadatas"])
+            if current["ids"]:
+                previous_tags = self._stored_tags(current["metadatas"][0])
+        self._collection.update(ids=[id], metadatas=[self._serialize_meta(updates, previous_tags)])
+
+    def update_metadata_many(self, ids: list[str], updates: dict) -> None:
+        """Merge the same keys into several documents' metadata in one update per batch."""
+        for start in range(0, len(ids), self._max_batch):
+            batch = ids[start:start + self._max_batch]
+            if "tags" in updates:
+                current = self._collection.get(ids=batch, include=["metadatas"])
+                batch = current["ids"]
+                metadatas = [self._serialize_meta(updates, self._stored_tags(m)) for m in current["metadatas"]]
+            else:
+                metadatas = [self._serialize_meta(updates)] * len(batch)
+            if batch:
+                self._collection.update(ids=batch, metadatas=metadatas)
+
     def delete(self, ids: list[str]) -> None:
         if ids:
             self._collection.delete(ids=ids)
 
     def query(
         self, embedding: list[float], limit: int, where: dict | None = None,
-        query_text: str | None = None,
+        query_text: str | None = None, with_text: bool = True,
     ) -> list[VectorResult]:
-        total = self._collection.count()
-        if total == 0:
-            return []
-
         chroma_where, post_filters = self._split_where(where)
-        # Overfetch 3x when post-filters are active to compensate for
-        # filtered-out results, but cap at 500 to bound vector DB load.
-        n = min(limit * 3, 500) if post_filters else limit
+        # Chroma clamps n_results to the collection size itself, so no
+        # count() round trip is needed first.
+        n = overfetch_limit(limit, bool(post_filters))
 
         results = self._collection.query(
             query_embeddings=[embedding],
-            n_results=min(n, total),
+            n_results=max(n, 1),
             where=chroma_where or None,
+            include=["documents", "metadatas", "distances"] if with_text else ["metadatas", "distances"],
         )
 
         if not results["ids"] or not results["ids"][0]:
             return []
 
+        # Unpack the single query's columns once, outside the loop
+        ids = results["ids"][0]
+        metadatas = results["metadatas"][0]
+        distances = results["distances"][0] if results["distances"] else [None] * len(ids)
+        documents = results["documents"][0] if with_text else [""] * len(ids)
+
         out: list[VectorResult] = []
-        for i, doc_id in enumerate(results["ids"][0]):
-            meta = self._deserialize_meta(results["metadatas"][0][i])
-            if not self._passes_post_filters(meta, post_filters):
+        for doc_id, raw, distance, text in zip(ids, metadatas, distances, documents):
+            meta = self._deserialize_meta(raw)
+            if post_filters and not self._passes_post_filters(meta, post_filters):
                 continue
-            distance = results["distances"][0][i] if results["distances"] else None
-            out.append(VectorResult(
-                id=doc_id,
-                text=results["documents"][0][i],
-                metadata=meta,
-                distance=distance,
-            ))
+            out.append(VectorResult(id=doc_id, text=text, metadata=meta, distance=distance))
+            if len(out) >= limit:
+                break
 
         return out[:limit]
 
     def get(self, ids: list[str]) -> list[VectorResult]:
         results = self._collection.get(ids=ids, include=["documents", "metadatas"])
-        out: list[VectorResult] = []
-        for i, doc_id in enumerate(results["ids"]):
-            meta = self._deserialize_meta(results["metadatas"][i])
-            out.append(VectorResult(id=doc_id, text=results["documents"][i], metadata=meta))
-        return out
+        return [
+            VectorResult(id=doc_id, text=text, metadata=self._deserialize_meta(raw))
+            for doc_id, text, raw in zip(results["ids"], results["documents"], results["metadatas"])
+        ]
+
+    def exists(self, ids: list[str]) -> set[str]:
+        """The subset of ids that are stored, fetched without documents or metadata."""
+        return set(self._collection.get(ids=ids, include=[])["ids"])
 
     def scan(
         self, offset: int, limit: int, where: dict | None = None
     ) -> tuple[list[VectorResult], int]:
-        if self._collection.count() == 0:
-            return [], 0
-
         chroma_where, post_filters = self._split_where(where)
 
         if not post_filters:
             # Fast path: let ChromaDB paginate directly
-            if chroma_where:
-                all_filtered = self._collection.get(include=["metadatas"], where=chroma_where)
-                total = len(all_filtered["ids"])
-            else:
-                total = self._collection.count()
+            total = self._count_native(chroma_where)
+            if total == 0:
+                return [], 0
 
             batch = self._collection.get(
                 include=["documents", "metadatas"],
@@ -125,29 +280,40 @@ class ChromaBackend:
             ]
             return results, total
 
-        # Slow path: scan everything and post-filter
+        # Slow path: post-filter metadata only, then fetch documents for the
+        # requested page rather than for every matching row
+        matches = list(self.iter_metadata(where))
+
+        page = matches[offset:offset + limit]
+        if not page:
+            return [], len(matches)
+        docs = self._collection.get(ids=[doc_id for doc_id, _ in page], include=["documents"])
+        text_by_id = dict(zip(docs["ids"], docs["documents"]))
+        results = [
+            VectorResult(id=doc_id, text=text_by_id.get(doc_id, ""), metadata=meta)
+            for doc_id, meta in page
+        ]
+        return results, len(matches)
+
+    def iter_metadata(self, where: dict | None = None) -> Iterator[tuple[str, dict]]:
+        """Yield (id, metadata) for every match without loading documents."""
+        chroma_where, post_filters = self._split_where(where)
         batch_size = 5000
-        total_docs = self._collection.count()
-        all_items: list[VectorResult] = []
-        for batch_offset in range(0, total_docs, batch_size):
+        offset = 0
+        while True:
             batch = self._collection.get(
-                include=["documents", "metadatas"],
+                include=["metadatas"],
                 limit=batch_size,
-                offset=batch_offset,
+                offset=offset,
                 where=chroma_where or None,
             )
-            for i in range(len(batch["ids"])):
-                meta = self._deserialize_meta(batch["metadatas"][i])
-                if self._passes_post_filters(meta, post_filters):
-                    all_items.append(VectorResult(
-                        id=batch["ids"][i],
-                        text=batch["documents"][i],
-                        metadata=meta,
-                    ))
-
-        filtered_total = len(all_items)
-        page = all_items[offset:offset + limit]
-        return page, filtered_total
+            for doc_id, raw in zip(batch["ids"], batch["metadatas"]):
+                meta = self._deserialize_meta(raw)
+                if not post_filters or self._passes_post_filters(meta, post_filters):
+                    yield doc_id, meta
+            if len(batch["ids"]) < batch_size:
+                return
+            offset += batch_size
 
     def count(self, where: dict | None = None) -> int:
         if where is None:
@@ -156,69 +322,108 @@ class ChromaBackend:
         chroma_where, post_filters = self._split_where(where)
 
         if not post_filters:
-            if chroma_where:
-                results = self._collection.get(include=[], where=chroma_where)
-                return len(results["ids"])
-            return self._collection.count()
+            return self._count_native(chroma_where)
 
         # Post-filter path: scan everything
-        batch_size = 5000
-        total_docs = self._collection.count()
-        count = 0
-        for batch_offset in range(0, total_docs, batch_size):
+        return sum(1 for _ in self.iter_metadata(where))
+
+    def _count_native(self, chroma_where: dict | None) -> int:
+        """Count rows matching a native filter, paging IDs rather than loading them all."""
+        if not chroma_where:
+            return self._collection.count()
+        total = 0
+        while True:
             batch = self._collection.get(
-                include=["metadatas"],
-                limit=batch_size,
-                offset=batch_offset,
-                where=chroma_where or None,
+                include=[], where=chroma_where, limit=self._max_batch, offset=total,
             )
-            for i in range(len(batch["ids"])):
-                meta = self._deserialize_meta(batch["metadatas"][i])
-                if self._passes_post_filters(meta, post_filters):
-                    count += 1
-        return count
+            total += len(batch["ids"])
+            if len(batch["ids"]) < self._max_batch:
+                return total
 
     # --- internal helpers ---
 
     @staticmethod
-    def _serialize_meta(metadata: dict) -> dict:
-        """Convert native list tags to JSON string for ChromaDB storage."""
-        meta = dict(metadata)
+    def _serialize_meta(metadata: dict, previous_tags: list[str] | None = None) -> dict:
+        """Convert native list tags to a JSON string plus per-tag keys.
+
+        previous_tags are the stored tags being replaced; Chroma merges
+        metadata on update, so their keys are set to None, which deletes them.
+        created_at also gets its numeric mirror.
+        """
+        meta = {
+            k: v for k, v in metadata.items()
+            if not k.startswith(_TAG_KEY) and k != _CREATED_MS_KEY
+        }
+        created_ms = _epoch_ms(meta.get("created_at"))
+        if created_ms is not None:
+            meta[_CREATED_MS_KEY] = created_ms
         if "tags" in meta:
-            meta["tags"] = json.dumps(meta["tags"])
+            tags = meta["tags"]
+            meta["tags"] = _dumps_tags(tags)
+            for tag in previous_tags or ():
+                meta[f"{_TAG_KEY}{tag}"] = None
+            for tag in tags:
+                meta[f"{_TAG_KEY}{tag}"] = True
         return meta
 
+    @staticmethod
+    def _stored_tags(meta: dict | None) -> list[str]:
+        tags = meta.get("tags") if meta else None
+        return list(_parse_tags(tags)) if isinstance(tags, str) else []
+
     @staticmethod
     def _deserialize_meta(meta: dict) -> dict:
-        """Convert JSON string tags back to native lists."""
-        result = dict(meta)
-        if "tags" in result and isinstance(result["tags"], str):
-            result["tags"] = json.loads(result["tags"])
-        return result
+        """Convert JSON string tags back to native lists and drop derived keys.
+
+        Chroma builds fresh metadata dicts for every get/query, so they are
+        converted in place rather than copied.
+        """
+        meta.pop(_CREATED_MS_KEY, None)
+        tags = meta.get("tags")
+        if isinstance(tags, str):
+            meta["tags"] = list(_parse_tags(tags))
+            for key in [k for k in meta if k.startswith(_TAG_KEY)]:
+                del meta[key]
+        return meta
 
     @staticmethod
     def _split_where(where: dict | None) -> tuple[dict | None, dict]:
         """Split where clause into ChromaDB-native filters and post-query filters.
 
-        ChromaDB can natively handle simple equality (e.g. chunk_type == X).
-        Everything else (tags.$contains_any, source.$prefix, created_at.$gt/$lt)
-        must be applied post-query.
+        ChromaDB can natively handle simple equality (e.g. chunk_type == X),
+        tags.$contains_any via the per-tag keys and created_at.$gt/$lt via
+        the epoch-millisecond key. Everything else (source.$prefix,
+        $not_exists, unparseable dates) must be applied post-query.
         """
         if not where:
             return None, {}
 
-        chroma_where: dict = {}
+        clauses: list[dict] = []
         post_filters: dict = {}
 
         for key, value in where.items():
-            if isinstance(value, dict):
-                # Operator filters — all go to post-filter
+            if key == "tags" and isinstance(value, dict) and list(value) == ["$contains_any"] and value["$contains_any"]:
+                # Tag membership maps onto the per-tag keys
+                tag_clauses = [{f"{_TAG_KEY}{tag}": True} for tag in value["$contains_any"]]
+                clauses.append(tag_clauses[0] if len(tag_clauses) == 1 else {"$or": tag_clauses})
+            elif key == "created_at" and isinstance(value, dict) and value and set(value) <= {"$gt", "$lt"} \
+                    and all(_epoch_ms(bound) is not None for bound in value.values()):
+                # Date ranges compare as integers on the mirrored key
+                clauses.extend({_CREATED_MS_KEY: {op: _epoch_ms(bound)}} for op, bound in value.items())
+            elif isinstance(value, dict):
+                # Other operator filters go to post-filter; tag sets are
+                # built once here rather than per row
+                if "$contains_any" in value:
+                    value = {**value, "$contains_any": frozenset(value["$contains_any"])}
                 post_filters[key] = value
             else:
                 # Simple equality — ChromaDB can handle this
-                chroma_where[key] = value
+                clauses.append({key: value})
 
-        return chroma_where or None, post_filters
+        if not clauses:
+            return None, post_filters
+        chroma_where = clauses[0] if len(clauses) == 1 else {"$and": clauses}
+        return chroma_where, post_filters
 
     @staticmethod
     def _passes_post_filters(meta: dict, post_filters: dict) -> bool:
@@ -231,7 +436,7 @@ class ChromaBackend:
             if "$contains_any" in condition:
                 if not isinstance(value, list):
                     return False
-                if not any(t in value for t in condition["$contains_any"]):
+                if condition["$contains_any"].isdisjoint(value):
                     return False
 
             if "$prefix" in condition:
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import threading
 import uuid
+from collections.abc import Iterator
 
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
@@ -14,6 +16,7 @@ from qdrant_client.models import (
     FusionQuery,
     MatchAny,
     MatchValue,
+    PayloadSelectorExclude,
     PointIdsList,
     PointStruct,
     Prefetch,
@@ -23,17 +26,30 @@ from qdrant_client.models import (
     VectorParams,
 )
 
-from annal.backend import VectorResult
+from annal.backend import VectorResult, overfetch_limit
 
 # Fixed namespace for deterministic string→UUID conversion
 _ANNAL_NS = uuid.UUID("a4b1c2d3-e5f6-7890-abcd-ef1234567890")
 
+# One client per server URL, shared by every project's collection
+_clients: dict[str, QdrantClient] = {}
+_clients_lock = threading.Lock()
+
+
+def _client_for(url: str) -> QdrantClient:
+    """Get or create the QdrantClient for a server URL."""
+    with _clients_lock:
+        client = _clients.get(url)
+        if client is None:
+            client = _clients[url] = QdrantClient(url=url)
+        return client
+
 
 class QdrantBackend:
     """VectorBackend implementation backed by a Qdrant server."""
 
     def __init__(self, url: str, collection_name: str, dimension: int, hybrid: bool = False) -> None:
-        self._client = QdrantClient(url=url)
+        self._client = _client_for(url)
         self._collection = collection_name
         self._hybrid = hybrid
         self._ensure_collection(dimension)
@@ -63,6 +79,29 @@ class QdrantBackend:
             )
 
     def insert(self, id: str, text: str, embedding: list[float], metadata: dict) -> None:
+        self._client.upsert(
+            collection_name=self._collection,
+            points=[self._make_point(id, text, embedding, metadata)],
+        )
+
+    def insert_many(
+        self,
+        ids: list[str],
+        texts: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict],
+    ) -> None:
+        if not ids:
+            return
+        self._client.upsert(
+            collection_name=self._collection,
+            points=[
+                self._make_point(id, text, embedding, metadata)
+                for id, text, embedding, metadata in zip(ids, texts, embeddings, metadatas)
+            ],
+        )
+
+    def _make_point(self, id: str, text: str, embedding: list[float], metadata: dict) -> PointStruct:
         payload = {**metadata, "text": text, "_annal_id": id}
         if self._hybrid:
             vector = {
@@ -71,10 +110,7 @@ class QdrantBackend:
             }
         else:
             vector = embedding
-        self._client.upsert(
-            collection_name=self._collection,
-            points=[PointStruct(id=self._to_uuid(id), vector=vector, payload=payload)],
-        )
+        return PointStruct(id=self._to_uuid(id), vector=vector, payload=payload)
 
     def update(
         self,
@@ -122,6 +158,23 @@ class QdrantBackend:
                     points=[uid],
                 )
 
+    def update_metadata(self, id: str, updates: dict) -> None:
+        """Merge the given keys into a point's payload, leaving others untouched."""
+        self._client.set_payload(
+            collection_name=self._collection,
+            payload=dict(updates),
+            points=[self._to_uuid(id)],
+        )
+
+    def update_metadata_many(self, ids: list[str], updates: dict) -> None:
+        """Merge the same keys into several points' payloads in one call."""
+        if ids:
+            self._client.set_payload(
+                collection_name=self._collection,
+                payload=dict(updates),
+                points=[self._to_uuid(i) for i in ids],
+            )
+
     def delete(self, ids: list[str]) -> None:
         if ids:
             uids = [self._to_uuid(i) for i in ids]
@@ -132,13 +185,12 @@ class QdrantBackend:
 
     def query(
         self, embedding: list[float], limit: int, where: dict | None = None,
-        query_text: str | None = None,
+        query_text: str | None = None, with_text: bool = True,
     ) -> list[VectorResult]:
         native, post = self._split_where(where) if where else (None, None)
         qfilter = self._build_filter(native) if native else None
-        # Overfetch 3x when post-filters are active to compensate for
-        # filtered-out results, but cap at 500 to bound vector DB load.
-        fetch_limit = min(limit * 3, 500) if post else limit
+        fetch_limit = overfetch_limit(limit, bool(post))
+        payload = True if with_text else PayloadSelectorExclude(exclude=["text"])
 
         is_rrf = self._hybrid and query_text
         if is_rrf:
@@ -155,7 +207,7 @@ class QdrantBackend:
                 query=FusionQuery(fusion=Fusion.RRF),
                 limit=fetch_limit,
                 query_filter=qfilter,
-                with_payload=True,
+                with_payload=payload,
             )
         elif self._hybrid:
             results = self._client.query_points(
@@ -164,7 +216,7 @@ class QdrantBackend:
                 using="dense",
                 limit=fetch_limit,
                 query_filter=qfilter,
-                with_payload=True,
+                with_payload=payload,
             )
         else:
             results = self._client.query_points(
@@ -172,7 +224,7 @@ class QdrantBackend:
                 query=embedding,
                 limit=fetch_limit,
                 query_filter=qfilter,
-                with_payload=True,
+                with_payload=payload,
             )
 
         items = [self._to_result(p, rrf=is_rrf) for p in results.points]
@@ -189,6 +241,16 @@ class QdrantBackend:
         )
         return [self._to_result(p) for p in results]
 
+    def exists(self, ids: list[str]) -> set[str]:
+        by_uuid = {self._to_uuid(i): i for i in ids}
+        results = self._client.retrieve(
+            collection_name=self._collection,
+            ids=list(by_uuid),
+            with_payload=False,
+            with_vectors=False,
+        )
+        return {by_uuid[str(p.id)] for p in results}
+
     def scan(
         self, offset: int, limit: int, where: dict | None = None
     ) -> tuple[list[VectorResult], int]:
@@ -259,6 +321,26 @@ class QdrantBackend:
 
         return collected, total
 
+    def iter_metadata(self, where: dict | None = None) -> Iterator[tuple[str, dict]]:
+        """Yield (id, metadata) for every match without fetching document text."""
+        native, post = self._split_where(where) if where else (None, None)
+        qfilter = self._build_filter(native) if native else None
+        next_offset = None
+        while True:
+            records, next_offset = self._client.scroll(
+                collection_name=self._collection,
+                scroll_filter=qfilter,
+                limit=1000,
+                offset=next_offset,
+                with_payload=PayloadSelectorExclude(exclude=["text"]),
+            )
+            for record in records:
+                result = self._to_result(record)
+                if not post or self._matches_post_filter(result, post):
+                    yield result.id, result.metadata
+            if not records or next_offset is None:
+                return
+
     def count(self, where: dict | None = None) -> int:
         native, post = self._split_where(where) if where else (None, None)
         qfilter = self._build_filter(native) if native else None
@@ -2,18 +2,28 @@
 
 from __future__ import annotations
 
+import copy
+import json
 import os
+from collections.abc import Sequence
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 
 import yaml
 
+try:
+    from yaml import CSafeDumper as _SafeDumper, CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _SafeDumper, SafeLoader as _SafeLoader
+
 DEFAULT_DATA_DIR = os.path.expanduser("~/.annal/data")
 DEFAULT_CONFIG_PATH = os.path.expanduser("~/.annal/config.yaml")
 DEFAULT_PORT = 9200
 
-DEFAULT_WATCH_PATTERNS = ["**/*.md", "**/*.yaml", "**/*.toml", "**/*.json"]
-DEFAULT_WATCH_EXCLUDE = [
+# Tuples, so every project using the defaults can share them
+DEFAULT_WATCH_PATTERNS = ("**/*.md", "**/*.yaml", "**/*.toml", "**/*.json")
+DEFAULT_WATCH_EXCLUDE = (
     "**/node_modules/**",
     "**/vendor/**",
     "**/.git/**",
@@ -21,14 +31,52 @@ DEFAULT_WATCH_EXCLUDE = [
     "**/__pycache__/**",
     "**/dist/**",
     "**/build/**",
-]
+)
+
+
+@lru_cache(maxsize=8)
+def _load_raw(path: str, mtime_ns: int, size: int) -> dict:
+    """Parse a config file; cached so an unchanged file is only parsed once.
+
+    Across processes the parsed result is kept in a JSON sidecar stamped
+    with the YAML file's mtime and size, so later starts skip YAML.
+    """
+    cache_path = _cache_path(path)
+    try:
+        cached = json.loads(cache_path.read_bytes())
+        if cached["mtime_ns"] == mtime_ns and cached["size"] == size:
+            return cached["raw"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    with open(path) as f:
+        raw = yaml.load(f, Loader=_SafeLoader) or {}
+    _write_cache(cache_path, raw, mtime_ns, size)
+    return raw
+
+
+def _cache_path(path: str) -> Path:
+    return Path(path).with_suffix(".json.cache")
+
+
+def _write_cache(cache_path: Path, raw: dict, mtime_ns: int, size: int) -> None:
+    """Best-effort write of the JSON sidecar; skipped if raw isn't plain JSON."""
+    try:
+        text = json.dumps({"mtime_ns": mtime_ns, "size": size, "raw": raw})
+        # Non-string keys or YAML-only types don't survive JSON unchanged
+        if json.loads(text)["raw"] != raw:
+            return
+        tmp = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(text)
+        os.replace(tmp, cache_path)
+    except (OSError, TypeError, ValueError):
+        pass
 
 
 @dataclass
 class ProjectConfig:
     watch_paths: list[str] = field(default_factory=list)
-    watch_patterns: list[str] = field(default_factory=lambda: list(DEFAULT_WATCH_PATTERNS))
-    watch_exclude: list[str] = field(default_factory=lambda: list(DEFAULT_WATCH_EXCLUDE))
+    watch_patterns: Sequence[str] = DEFAULT_WATCH_PATTERNS
+    watch_exclude: Sequence[str] = DEFAULT_WATCH_EXCLUDE
     watch: bool = True
 
 
@@ -52,15 +100,16 @@ class AnnalConfig:
         if not path.exists():
             return cls(config_path=config_path)
 
-        with open(path) as f:
-            raw = yaml.safe_load(f) or {}
+        st = path.stat()
+        # Copy so callers can mutate the result without touching the cache
+        raw = copy.deepcopy(_load_raw(str(path), st.st_mtime_ns, st.st_size))
 
         projects = {}
         for name, proj_data in raw.get("projects", {}).items():
             projects[name] = ProjectConfig(
                 watch_paths=proj_data.get("watch_paths", []),
-                watch_patterns=proj_data.get("watch_patterns", list(DEFAULT_WATCH_PATTERNS)),
-                watch_exclude=proj_data.get("watch_exclude", list(DEFAULT_WATCH_EXCLUDE)),
+                watch_patterns=proj_data.get("watch_patterns", DEFAULT_WATCH_PATTERNS),
+                watch_exclude=proj_data.get("watch_exclude", DEFAULT_WATCH_EXCLUDE),
                 watch=proj_data.get("watch", True),
             )
 
@@ -94,8 +143,8 @@ class AnnalConfig:
             "projects": {
                 name: {
                     "watch_paths": proj.watch_paths,
-                    "watch_patterns": proj.watch_patterns,
-                    "watch_exclude": proj.watch_exclude,
+                    "watch_patterns": list(proj.watch_patterns),
+                    "watch_exclude": list(proj.watch_exclude),
                     "watch": proj.watch,
                 }
                 for name, proj in self.projects.items()
@@ -106,8 +155,16 @@ class AnnalConfig:
                 "backend": self.storage.backend,
                 "backends": self.storage.backends,
             }
-        with open(path, "w") as f:
-            yaml.dump(raw, f, default_flow_style=False)
+        text = yaml.dump(raw, Dumper=_SafeDumper, default_flow_style=False)
+        try:
+            if path.read_text() == text:
+                return  # unchanged: keep the file, its mtime and the caches
+        except OSError:
+            pass
+        path.write_text(text)
+        _load_raw.cache_clear()
+        st = path.stat()
+        _write_cache(_cache_path(str(path)), raw, st.st_mtime_ns, st.st_size)
 
     def add_project(
         self,
@@ -127,8 +184,8 @@ class AnnalConfig:
             return proj
         self.projects[name] = ProjectConfig(
             watch_paths=watch_paths or [],
-            watch_patterns=watch_patterns or list(DEFAULT_WATCH_PATTERNS),
-            watch_exclude=watch_exclude or list(DEFAULT_WATCH_EXCLUDE),
+            watch_patterns=watch_patterns or DEFAULT_WATCH_PATTERNS,
+            watch_exclude=watch_exclude or DEFAULT_WATCH_EXCLUDE,
         )
         return self.projects[name]
 
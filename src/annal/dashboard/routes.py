@@ -6,6 +6,7 @@ import asyncio
 import math
 import queue
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
 
 from starlette.requests import Request
@@ -22,6 +23,12 @@ TEMPLATES_DIR = Path(__file__).parent / "templates"
 PAGE_SIZE = 50
 
 
+@lru_cache(maxsize=1)
+def _templates() -> Jinja2Templates:
+    """One template environment per process, so compiled templates are shared by every app."""
+    return Jinja2Templates(directory=str(TEMPLATES_DIR))
+
+
 def _annotate_stale(memories: list[dict], max_age_days: int = 60) -> None:
     """Mark each memory dict with a 'stale' boolean for template rendering."""
     cutoff = (datetime.now(timezone.utc) - timedelta(days=max_age_days)).isoformat()
@@ -39,7 +46,7 @@ def _annotate_stale(memories: list[dict], max_age_days: int = 60) -> None:
 
 def create_routes(pool: StorePool, config: AnnalConfig) -> list[Route]:
     """Create dashboard route list with access to the store pool and config."""
-    templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+    templates = _templates()
 
     async def dashboard(request: Request) -> Response:
         """System dashboard landing page."""
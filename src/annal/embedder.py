@@ -2,21 +2,72 @@
 
 from __future__ import annotations
 
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
 
+if TYPE_CHECKING:
+    import numpy as np
+
+# Recently embedded texts kept per embedder; as float32 arrays a full
+# cache is about 6 MB
+EMBED_CACHE_SIZE = 4096
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
 
 class OnnxEmbedder:
-    """Default embedder using the ONNX MiniLM-L6-V2 model (384 dimensions)."""
+    """Default embedder using the ONNX MiniLM-L6-V2 model (384 dimensions).
+
+    Vectors are cached by a digest of the text, so re-indexing unchanged
+    chunks or repeating a query skips the model. This is the only embedding
+    cache: queries, filter tags and indexed chunks share one LRU. That is
+    intended, since a reconcile embedding more than EMBED_CACHE_SIZE new
+    chunks costs each evicted query one model call on its next use, and
+    splitting the budget would leave most of it idle the rest of the time.
+    """
 
     def __init__(self) -> None:
         self._fn = ONNXMiniLM_L6_V2()
+        self._cache: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     @property
     def dimension(self) -> int:
         return 384
 
     def embed(self, text: str) -> list[float]:
-        return self._fn([text])[0].tolist()
+        return self.embed_batch([text])[0]
 
     def embed_batch(self, texts: list[str]) -> list[list[float]]:
-        return [e.tolist() for e in self._fn(texts)]
+        keys = [_digest(t) for t in texts]
+        vectors: dict[bytes, np.ndarray] = {}
+        with self._cache_lock:
+            for key in keys:
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    vectors[key] = vector
+
+        # Each distinct uncached text goes to the model once
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if missing:
+            fresh = dict(zip(missing, self._fn(list(missing.values()))))
+            vectors.update(fresh)
+            with self._cache_lock:
+                self._cache.update(fresh)
+                while len(self._cache) > EMBED_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return [vectors[key].tolist() for key in keys]
+
+
+@lru_cache(maxsize=1)
+def shared_embedder() -> OnnxEmbedder:
+    """The process-wide OnnxEmbedder, so the model is loaded once per process."""
+    return OnnxEmbedder()
@@ -2,54 +2,52 @@
 
 from __future__ import annotations
 
+import hashlib
 import re
 from pathlib import Path
 
-from annal.store import MemoryStore
+from annal.store import BatchItem, MemoryStore
+
+
+# A heading line; whitespace after the hashes must not run onto the next line
+_HEADING_RE = re.compile(r"^(#{1,6})[^\S\n]+(.+)$", re.MULTILINE)
 
 
 def chunk_markdown(content: str, filename: str) -> list[dict]:
-    """Split markdown content into chunks by heading boundaries."""
-    lines = content.split("\n")
+    """Split markdown content into chunks by heading boundaries.
+
+    One regex pass over the whole text finds the heading lines; each
+    chunk's body is the slice between consecutive headings.
+    """
     chunks = []
-    current_content: list[str] = []
-    heading_stack: list[str] = []
-    heading_levels: list[int] = []
-    current_heading = filename
-
-    for line in lines:
-        heading_match = re.match(r"^(#{1,6})\s+(.+)$", line)
-        if heading_match:
-            # Save previous chunk
-            text = "\n".join(current_content).strip()
-            if text:
-                chunks.append({"heading": current_heading, "content": text})
-            current_content = []
-
-            level = len(heading_match.group(1))
-            heading_text = heading_match.group(2).strip()
-
-            # Update heading stack — pop headings at same or deeper level
-            while heading_levels and heading_levels[-1] >= level:
-                heading_levels.pop()
-                heading_stack.pop()
-
-            # h1 headings are top-level section markers, not nesting parents
-            if level > 1:
-                heading_stack.append(heading_text)
-                heading_levels.append(level)
-                current_heading = filename + " > " + " > ".join(heading_stack)
-            else:
-                heading_stack.clear()
-                heading_levels.clear()
-                current_heading = filename + " > " + heading_text
-        else:
-            current_content.append(line)
+    # The filename, then the open headings; joined only when a chunk is emitted
+    heading_path: list[str] = [filename]
+    heading_levels: list[int] = [0]
+    body_start = 0
+
+    for heading_match in _HEADING_RE.finditer(content):
+        # Save previous chunk
+        text = content[body_start:heading_match.start()].strip()
+        if text:
+            chunks.append({"heading": " > ".join(heading_path), "content": text})
+        body_start = heading_match.end()
+
+        level = len(heading_match.group(1))
+
+        # Update heading stack — pop headings at same or deeper level
+        while heading_levels[-1] >= level:
+            heading_levels.pop()
+            heading_path.pop()
+
+        # h1 headings are top-level section markers, not nesting parents:
+        # recorded past the deepest level, the next heading always pops them
+        heading_path.append(heading_match.group(2).strip())
+        heading_levels.append(level if level > 1 else 7)
 
     # Don't forget the last chunk
-    text = "\n".join(current_content).strip()
+    text = content[body_start:].strip()
     if text:
-        chunks.append({"heading": current_heading, "content": text})
+        chunks.append({"heading": " > ".join(heading_path), "content": text})
 
     return chunks
 
@@ -64,16 +62,54 @@ def index_file(store: MemoryStore, file_path: str, file_mtime: float | None = No
     path = Path(file_path)
     if not path.exists():
         return 0
+    data = path.read_bytes()
+    if file_mtime is None:
+        file_mtime = path.stat().st_mtime
+    return index_content(store, file_path, data, file_mtime)
 
-    content = path.read_text(encoding="utf-8", errors="replace")
-    if not content.strip():
+
+def index_content(store: MemoryStore, file_path: str, data: bytes, file_mtime: float) -> int:
+    """Index a file's bytes, already in memory, as the chunks of file_path.
+
+    Saves that leave the bytes unchanged only refresh the stored mtime; the
+    existing chunks are kept and their count returned.
+    """
+    prepared = prepare_content(file_path, data)
+    if prepared is None:
         return 0
+    items, file_hash = prepared
+    stored = store.get_file_hash(file_path)
+    if stored is not None and stored[0] == file_hash:
+        store.set_file_mtime(stored[1], file_mtime)
+        return len(stored[1])
+    return store_file_items(store, file_path, items, file_mtime, file_hash)
 
-    if file_mtime is None:
-        file_mtime = path.stat().st_mtime
 
-    # Delete any existing chunks from this file
-    store.delete_by_source(f"file:{file_path}")
+def prepare_file(file_path: str) -> tuple[list[BatchItem], str] | None:
+    """Read and chunk a file into batch items without touching the store.
+
+    Returns (items, content hash), or None if the file is missing or blank,
+    in which case any existing chunks are left alone. Safe to call from
+    worker threads.
+    """
+    path = Path(file_path)
+    if not path.exists():
+        return None
+    return prepare_content(file_path, path.read_bytes())
+
+
+def prepare_content(file_path: str, data: bytes) -> tuple[list[BatchItem], str] | None:
+    """Chunk a file's bytes into batch items; prepare_file without the read.
+
+    The file's suffix picks the chunker and its path the tags. Returns
+    None for blank content.
+    """
+    path = Path(file_path)
+    file_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+    # Same result as read_text(errors="replace"), including newline translation
+    content = data.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+    if not content.strip():
+        return None
 
     # Chunk based on file type
     suffix = path.suffix.lower()
@@ -84,20 +120,59 @@ def index_file(store: MemoryStore, file_path: str, file_mtime: float | None = No
     else:
         chunks = [{"heading": path.name, "content": content}]
 
-    # Store each chunk with heading context prepended for better embeddings
-    for chunk in chunks:
-        tags = _derive_tags(path)
-        heading_context = chunk["heading"]
-        content_with_context = f"{heading_context}: {chunk['content']}"
-        store.store(
-            content=content_with_context,
+    # Heading context is prepended to each chunk for better embeddings
+    tags = _derive_tags(path)
+    items = [
+        BatchItem(
+            content=f"{chunk['heading']}: {chunk['content']}",
             tags=tags,
             source=f"file:{file_path}|{chunk['heading']}",
-            chunk_type="file-indexed",
-            file_mtime=file_mtime,
         )
-
-    return len(chunks)
+        for chunk in chunks
+    ]
+    return items, file_hash
+
+
+def store_file_items(
+    store: MemoryStore,
+    file_path: str,
+    items: list[BatchItem],
+    file_mtime: float,
+    file_hash: str | None = None,
+) -> int:
+    """Replace a file's chunks in the store with items from prepare_file()."""
+    return store_files(store, [(file_path, items, file_mtime, file_hash)])
+
+
+def store_files(
+    store: MemoryStore,
+    files: list[tuple[str, list[BatchItem], float, str | None]],
+    embeddings: list[list[float]] | None = None,
+) -> int:
+    """Replace the chunks of several (path, items, mtime, hash) files at once.
+
+    The new chunks of every file go in one store_many call and the old ones
+    in one delete pass afterwards, so a batch costs one metadata scan, one
+    embedding call and one backend insert. If storing fails, the old chunks
+    and their mtimes are left in place, so the next reconcile retries the
+    files. embeddings, if given, cover the files' items in order. Returns
+    the number of chunks stored.
+    """
+    if not files:
+        return 0
+    old_ids = store.ids_by_source(tuple(f"file:{path}" for path, _, _, _ in files))
+    items: list[BatchItem] = []
+    extra_metadata: list[dict] = []
+    for _, file_items, file_mtime, file_hash in files:
+        meta: dict = {"file_mtime": file_mtime}
+        if file_hash is not None:
+            meta["file_hash"] = file_hash
+        items.extend(file_items)
+        extra_metadata.extend([meta] * len(file_items))
+    store.store_many(items, chunk_type="file-indexed", extra_metadata=extra_metadata, embeddings=embeddings)
+    if old_ids:
+        store.delete_many(old_ids)
+    return len(items)
 
 
 def _derive_tags(path: Path) -> list[str]:
@@ -36,9 +36,7 @@ def migrate(
 
         texts = [doc.text for doc in docs]
         embeddings = embedder.embed_batch(texts)
-
-        for doc, embedding in zip(docs, embeddings):
-            dst.insert(doc.id, doc.text, embedding, doc.metadata)
+        dst.insert_many([doc.id for doc in docs], texts, embeddings, [doc.metadata for doc in docs])
 
         migrated += len(docs)
         offset += len(docs)
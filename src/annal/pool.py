@@ -3,12 +3,14 @@
 from __future__ import annotations
 
 import logging
+import queue
 import threading
+from collections import deque
 from collections.abc import Callable
 from datetime import datetime, timezone
 
 from annal.backend import Embedder, VectorBackend
-from annal.embedder import OnnxEmbedder
+from annal.embedder import shared_embedder
 from annal.config import AnnalConfig
 from annal.events import event_bus, Event
 from annal.store import MemoryStore
@@ -16,6 +18,11 @@ from annal.watcher import FileWatcher
 
 logger = logging.getLogger(__name__)
 
+MAX_CONCURRENT_RECONCILES = 4
+
+# (project, job, event set once the job has finished)
+_ReconcileJob = tuple[str, Callable[[], None], threading.Event]
+
 
 class StorePool:
     """Manages MemoryStore and FileWatcher instances per project."""
@@ -24,11 +31,23 @@ class StorePool:
         self._config = config
         self._stores: dict[str, MemoryStore] = {}
         self._watchers: dict[str, FileWatcher] = {}
+        # FileWatchers by project, shared by reconcile and watching; each is
+        # keyed on the config it compiled so edited projects get a new one
+        self._file_watchers: dict[str, tuple[tuple, FileWatcher]] = {}
         self._lock = threading.Lock()
         self._index_locks: dict[str, threading.Lock] = {}
         self._index_started: dict[str, datetime] = {}
         self._last_reconcile: dict[str, dict] = {}
-        self._reconcile_threads: list[threading.Thread] = []
+        # Background reconciles run on a few long-lived workers fed by a
+        # queue, started on demand up to MAX_CONCURRENT_RECONCILES
+        self._reconcile_queue: queue.SimpleQueue[_ReconcileJob | None] = queue.SimpleQueue()
+        # Projects with a job on the queue or running, and the jobs queued
+        # behind it; a project never has two jobs out, so no worker waits
+        # on another's index lock while other projects are queued
+        self._reconcile_backlog: dict[str, deque[_ReconcileJob]] = {}
+        self._reconcile_workers: list[threading.Thread] = []
+        self._reconcile_pending = 0
+        self._reconcile_idle = threading.Condition(self._lock)
         self._embedder: Embedder | None = None
 
     def _get_index_lock(self, project: str) -> threading.Lock:
@@ -39,9 +58,9 @@ class StorePool:
             return self._index_locks[project]
 
     def _get_embedder(self) -> Embedder:
-        """Get the shared embedder instance (created once, reused across stores)."""
+        """Get the shared embedder instance (created once, reused across stores and pools)."""
         if self._embedder is None:
-            self._embedder = OnnxEmbedder()
+            self._embedder = shared_embedder()
         return self._embedder
 
     def _create_backend(self, project: str) -> VectorBackend:
@@ -67,6 +86,10 @@ class StorePool:
 
     def get_store(self, project: str) -> MemoryStore:
         """Get or create a MemoryStore for the given project."""
+        # Lock-free fast path: stores are never removed once created
+        store = self._stores.get(project)
+        if store is not None:
+            return store
         need_save = False
         with self._lock:
             if project not in self._stores:
@@ -83,14 +106,29 @@ class StorePool:
             self._config.save()
         return store
 
+    def _get_file_watcher(self, project: str) -> FileWatcher:
+        """Get or create the FileWatcher for a project's current config."""
+        store = self.get_store(project)
+        proj_config = self._config.projects[project]
+        key = (
+            id(proj_config),
+            tuple(proj_config.watch_paths),
+            tuple(proj_config.watch_patterns),
+            tuple(proj_config.watch_exclude),
+        )
+        with self._lock:
+            cached = self._file_watchers.get(project)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            watcher = FileWatcher(store=store, project_config=proj_config)
+            self._file_watchers[project] = (key, watcher)
+            return watcher
+
     def reconcile_project(self, project: str) -> int:
         """Reconcile file indexes for a project. Returns number of files indexed."""
         if project not in self._config.projects:
             return 0
-        store = self.get_store(project)
-        proj_config = self._config.projects[project]
-        watcher = FileWatcher(store=store, project_config=proj_config)
-        count = watcher.reconcile()
+        count = self._get_file_watcher(project).reconcile()
         with self._lock:
             self._last_reconcile[project] = {
                 "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -105,8 +143,12 @@ class StorePool:
         on_progress: Callable[[int], None] | None = None,
         on_complete: Callable[[int], None] | None = None,
         clear_first: bool = False,
-    ) -> None:
-        """Kick off reconciliation on a background thread. Returns immediately."""
+    ) -> threading.Event:
+        """Queue reconciliation for a background worker. Returns immediately.
+
+        The returned event is set once this reconcile has finished, whether
+        or not it succeeded.
+        """
         def _run() -> None:
             lock = self._get_index_lock(project)
             if not lock.acquire(blocking=False):
@@ -120,8 +162,7 @@ class StorePool:
                 store = self.get_store(project)
                 if clear_first:
                     store.delete_by_source("file:")
-                proj_config = self._config.projects[project]
-                watcher = FileWatcher(store=store, project_config=proj_config)
+                watcher = self._get_file_watcher(project)
                 count = watcher.reconcile(progress_callback=on_progress)
                 with self._lock:
                     self._last_reconcile[project] = {
@@ -139,15 +180,53 @@ class StorePool:
             finally:
                 with self._lock:
                     self._index_started.pop(project, None)
-                    self._reconcile_threads = [
-                        t for t in self._reconcile_threads if t.is_alive()
-                    ]
                 lock.release()
 
-        thread = threading.Thread(target=_run, daemon=True)
+        job = (project, _run, threading.Event())
         with self._lock:
-            self._reconcile_threads.append(thread)
-        thread.start()
+            self._reconcile_pending += 1
+            backlog = self._reconcile_backlog.get(project)
+            if backlog is not None:
+                backlog.append(job)
+                return job[2]
+            self._reconcile_backlog[project] = deque()
+            # Projects reconcile in parallel, but at most a few at once so
+            # startup with many projects doesn't oversubscribe the CPU
+            if len(self._reconcile_workers) < min(len(self._reconcile_backlog), MAX_CONCURRENT_RECONCILES):
+                worker = threading.Thread(target=self._reconcile_loop, name="annal-reconcile", daemon=True)
+                self._reconcile_workers.append(worker)
+                worker.start()
+        self._reconcile_queue.put(job)
+        return job[2]
+
+    def _reconcile_loop(self) -> None:
+        """Worker body: run queued reconciles until a None sentinel arrives."""
+        while (job := self._reconcile_queue.get()) is not None:
+            project, run, done = job
+            try:
+                run()
+            except Exception:
+                logger.exception("Background reconcile crashed")
+            finally:
+                with self._lock:
+                    backlog = self._reconcile_backlog[project]
+                    if backlog:
+                        self._reconcile_queue.put(backlog.popleft())
+                    else:
+                        del self._reconcile_backlog[project]
+                with self._reconcile_idle:
+                    self._reconcile_pending -= 1
+                    if not self._reconcile_pending:
+                        self._reconcile_idle.notify_all()
+                done.set()
+
+    def wait_for_reconcile(self, timeout: float | None = None) -> bool:
+        """Block until queued and in-flight background reconciliations finish.
+
+        Returns False if some were still pending after `timeout` seconds.
+        """
+        with self._reconcile_idle:
+            return self._reconcile_idle.wait_for(lambda: not self._reconcile_pending, timeout)
 
     def is_indexing(self, project: str) -> bool:
         """Check if a project is currently being indexed."""
@@ -177,24 +256,20 @@ class StorePool:
             return
         if project in self._watchers:
             return
-        store = self.get_store(project)
-        proj_config = self._config.projects[project]
-        watcher = FileWatcher(store=store, project_config=proj_config)
+        watcher = self._get_file_watcher(project)
         watcher.start()
         self._watchers[project] = watcher
         logger.info("File watcher started for project '%s'", project)
 
     def shutdown(self, timeout: float = 10.0) -> None:
         """Stop all active file watchers and wait for in-flight reconciliation."""
-        # Wait for reconciliation threads to finish
-        with self._lock:
-            threads = list(self._reconcile_threads)
-        for thread in threads:
-            thread.join(timeout=timeout)
+        self.wait_for_reconcile(timeout)
+        # Idle workers exit on the sentinel; a reconcile still running past
+        # the timeout finishes first, and the daemon threads never block exit
         with self._lock:
-            self._reconcile_threads = [
-                t for t in self._reconcile_threads if t.is_alive()
-            ]
+            workers, self._reconcile_workers = self._reconcile_workers, []
+        for _ in workers:
+            self._reconcile_queue.put(None)
 
         with self._lock:
             watchers = dict(self._watchers)
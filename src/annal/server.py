@@ -8,6 +8,9 @@ import logging
 import sys
 import threading
 from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import TextIO
 
 from mcp.server.fastmcp import FastMCP
 
@@ -16,6 +19,11 @@ from annal.events import event_bus, Event
 from annal.pool import StorePool
 from annal.store import BatchItem
 
+try:
+    from orjson import loads as _loads_json
+except ImportError:  # optional speedup, see the "fast" extra
+    _loads_json = json.loads
+
 logging.basicConfig(level=logging.INFO, stream=sys.stderr)
 logger = logging.getLogger(__name__)
 
@@ -29,154 +37,58 @@ def _normalize_tags(tags: list[str] | str | None) -> list[str] | None:
     seen: set[str] = set()
     result: list[str] = []
     for tag in tags:
-        normalized = tag.strip().lower()
+        normalized = sys.intern(tag.strip().lower())
         if normalized and normalized not in seen:
             seen.add(normalized)
             result.append(normalized)
     return result
 
 
-SERVER_INSTRUCTIONS = """\
-Annal is your persistent semantic memory. Memories you store survive across sessions.
-
-## Project parameter
-Every tool requires a `project` parameter. Pass the project name that matches
-your current working context. The project name is typically the directory name
-of the codebase you're working in (e.g. "classmanager", "annal").
-
-If you're unsure which project to use, check your CLAUDE.md or environment
-for an ANNAL_PROJECT reference, or use the directory name of the current codebase.
-
-## First-time setup
-If the current project has no watch paths configured, use `init_project` to set it up.
-Pass the project name and a list of directory paths to watch for file indexing.
-For example: init_project(project_name="myapp", watch_paths=["/home/user/projects/myapp"])
-
-## When to store memories
-Store memories when you encounter information worth preserving across sessions:
-- Architectural decisions and their rationale
-- Bug fixes and their root causes
-- User preferences for workflow, style, or tooling
-- Important patterns or conventions in the codebase
-- Domain knowledge that took effort to discover
-
-Use `store_batch` to store 2+ memories at once — reduces tool calls and is more efficient.
-
-## When to search
-Search annal at these moments — prefer summary mode for most searches:
-- Session start: load context for the current project and task area
-- Questions about prior work: "what did we decide about X?", "have we seen this before?"
-- Before proposing architectural changes: check for prior decisions in the same domain
-- When a bug feels familiar: search for prior root causes and fixes
-- Before starting a new feature: look for related specs, patterns, or preferences
-
-## Search modes
-- `mode="summary"` (recommended): returns first 200 chars of content with full metadata.
-  Enough to judge relevance without a follow-up call. Use this for most searches.
-- `mode="probe"`: compact one-line summaries with scores. Use when scanning large result
-  sets and context window is tight. Follow up with `expand_memories` for details.
-- `mode="full"`: complete content. Use when you already know you need the full text.
-
-## Searching
-Use search_memories with natural language — it uses semantic similarity, not keyword
-matching. Use mode="probe" to scan results cheaply, then expand_memories for details.
-Filter by tags to narrow results when the memory store grows large.
-Filter by source with `source="file:/path/to/doc"` to search within a specific file's chunks,
-or `source="session"` to search only session observations.
-
-## Temporal filtering
-Scope searches by date using `after` and `before` (ISO 8601 dates):
-  search_memories(query="auth decision", after="2026-02-01", before="2026-02-28")
-
-## Cross-project search
-Search across multiple projects to find knowledge from other codebases:
-  search_memories(query="auth decision", project="current", projects=["other_project"])
-Use projects="*" to search all configured projects at once. Results are merged
-by relevance score. Each result includes the source project name.
-
-## Structured output
-For programmatic access, use output="json" to get structured results:
-  search_memories(query="...", output="json")
-Returns {"results": [...], "meta": {...}} instead of formatted text.
-Also available on expand_memories(memory_ids=[...], output="json").
-
-## Tag conventions
-
-Tags serve two purposes: classifying what a memory is about (domain tags) and
-controlling who stored it and how to retrieve it (system tags).
-
-### Memory type tags — use these when storing memories
-
-- `memory` — session observations, discoveries, things learned while working
-- `decision` — architectural or design decisions and their rationale
-- `preference` — user preferences for workflow, tooling, or communication style
-- `pattern` — recurring codebase patterns, conventions, or idioms
-- `bug` — bug discoveries, root causes, and fixes
-- `spec` — specifications, requirements, or design constraints
-
-Combine type tags with domain tags for the subject area, e.g.:
-  tags: ["decision", "billing", "auth"]
-  tags: ["bug", "checkout", "timezone"]
-
-### Agent identity tags — namespace with `agent:`
-
-When storing memories, include your agent identity tag so memories can be
-filtered by who stored them. Format: `agent:<role>`.
-
-Examples: `agent:code-reviewer`, `agent:planner`, `agent:debugger`
-
-This lets agents retrieve their own prior context:
-  search_memories(query="...", tags=["agent:code-reviewer"])
-
-### System tags — applied automatically to file-indexed content
-
-These are set by the file indexer, not by agents:
-- `indexed` — all file-indexed chunks
-- `agent-config` — chunks from CLAUDE.md, AGENT.md, or similar agent config files
-- `docs` — chunks from README files
-
-To search only agent-stored memories (excluding file-indexed content), filter
-by any memory type tag. To search only file-indexed content, use `indexed`.
-
-### Retagging memories
-
-Use `retag_memory` to fix or refine tags after storage without changing content.
-Supports `add_tags`, `remove_tags` (incremental), or `set_tags` (full replace).
-  retag_memory(project="myapp", memory_id="...", add_tags=["billing"], remove_tags=["misc"])
-
-## Memory supersession
-
-When a decision changes or knowledge is updated, use `supersedes` to replace the old
-memory instead of just storing a new one:
-  store_memory(project="myapp", content="We now use JWT", tags=["decision", "auth"],
-               supersedes="<old-memory-id>")
-
-The old memory is hidden from search but preserved for audit. If you get a similarity
-hint when storing (score 0.80–0.95), consider whether the new memory replaces the
-similar one. Use `include_superseded=True` on search_memories to see replaced memories.
-
-## Pruning stale memories
-
-Use `prune_stale` to review and clean up memories that are no longer being accessed.
-Run with `dry_run=True` (default) first to preview what would be deleted,
-then `dry_run=False` to execute. Targets agent memories only — file-indexed chunks
-are managed by the file watcher.
+def _format_search_result(r: dict, mode: str, is_cross_project: bool) -> str:
+    """Format one search result as text for the given mode."""
+    proj_label = f"({r['project']}) " if is_cross_project else ""
+    if mode == "probe":
+        content = r["content"]
+        first_line = content.split("\n", 1)[0]
+        snippet = first_line[:150]
+        if len(first_line) > 150:
+            snippet += "…"
+        date = (r.get("updated_at") or r["created_at"] or "")[:10] or "unknown"
+        source_label = r["source"] or "session observation"
+        return (
+            f'{proj_label}[{r["score"]:.2f}] ({", ".join(r["tags"])}) "{snippet}"'
+            f"\n  Source: {source_label} | {date} | ID: {r['id']}"
+        )
+    elif mode == "summary":
+        content = r["content"]
+        preview = content[:200]
+        if len(content) > 200:
+            preview += "…"
+        date = (r.get("updated_at") or r["created_at"] or "")[:10] or "unknown"
+        source_label = r["source"] or "session observation"
+        return (
+            f'{proj_label}[{r["score"]:.2f}] ({", ".join(r["tags"])}) {preview}'
+            f"\n  Source: {source_label} | {date} | ID: {r['id']}"
+        )
+    else:
+        parts = [f"{proj_label}[{r['score']:.2f}] ({', '.join(r['tags'])}) {r['content']}"]
+        if r["source"]:
+            parts.append(f"  Source: {r['source']}")
+        if r.get("updated_at"):
+            parts.append(f"  Updated: {r['updated_at']}")
+        if r.get("superseded_by"):
+            parts.append(f"  Superseded by: {r['superseded_by']}")
+        parts.append(f"  ID: {r['id']}")
+        return "\n".join(parts)
 
-## Decision verification
 
-Before accepting, proposing, or implementing a design decision, search annal
-for prior decisions in the same domain. Use the `decision` tag combined with
-relevant domain tags:
-  search_memories(query="<describe the decision area>", tags=["decision"])
+INSTRUCTIONS_PATH = Path(__file__).parent / "instructions.md"
 
-If a prior decision contradicts what is currently being proposed, surface it
-explicitly. Explain what was previously decided, why, and ask whether the new
-direction is intentional or an oversight. Do not silently override prior
-decisions — treat them as constraints until the user explicitly revises them.
 
-This applies at every stage of a workflow: analysis, architecture, development,
-review, and QA. Each role should verify against prior decisions before proceeding.
-"""
+@lru_cache(maxsize=1)
+def load_instructions() -> str:
+    """Read the MCP server instructions shipped alongside this module."""
+    return INSTRUCTIONS_PATH.read_text(encoding="utf-8")
 
 
 def create_server(
@@ -190,7 +102,7 @@ def create_server(
 
     mcp = FastMCP(
         "annal",
-        instructions=SERVER_INSTRUCTIONS,
+        instructions=load_instructions(),
         host="127.0.0.1",
         port=config.port,
     )
@@ -410,18 +322,15 @@ def create_server(
 
         is_cross_project = len(search_projects) > 1
 
-        empty_meta = {"query": query, "mode": mode, "project": project, "total": 0, "returned": 0}
-        if is_cross_project:
-            empty_meta["projects_searched"] = search_projects
-        empty_json = json.dumps({"results": [], "meta": empty_meta})
-
-        if not results:
-            return empty_json if output == "json" else f"[{project}] No matching memories found."
-
         if not tags:
             results = [r for r in results if r["score"] >= min_score]
         if not results:
-            return empty_json if output == "json" else f"[{project}] No matching memories found."
+            if output != "json":
+                return f"[{project}] No matching memories found."
+            empty_meta = {"query": query, "mode": mode, "project": project, "total": 0, "returned": 0}
+            if is_cross_project:
+                empty_meta["projects_searched"] = search_projects
+            return json.dumps({"results": [], "meta": empty_meta})
 
         if output == "json":
             json_results = []
@@ -470,58 +379,20 @@ def create_server(
                 })
             return json.dumps({"results": json_results, "meta": meta})
 
-        def _format_text_result(r: dict) -> str:
-            proj_label = f"({r['project']}) " if is_cross_project else ""
-            if mode == "probe":
-                content = r["content"]
-                first_line = content.split("\n", 1)[0]
-                snippet = first_line[:150]
-                if len(first_line) > 150:
-                    snippet += "…"
-                date = (r.get("updated_at") or r["created_at"] or "")[:10] or "unknown"
-                source_label = r["source"] or "session observation"
-                return (
-                    f'{proj_label}[{r["score"]:.2f}] ({", ".join(r["tags"])}) "{snippet}"'
-                    f"\n  Source: {source_label} | {date} | ID: {r['id']}"
-                )
-            elif mode == "summary":
-                content = r["content"]
-                preview = content[:200]
-                if len(content) > 200:
-                    preview += "…"
-                date = (r.get("updated_at") or r["created_at"] or "")[:10] or "unknown"
-                source_label = r["source"] or "session observation"
-                entry = f'{proj_label}[{r["score"]:.2f}] ({", ".join(r["tags"])}) {preview}'
-                entry += f"\n  Source: {source_label} | {date} | ID: {r['id']}"
-                return entry
-            else:
-                entry = f"{proj_label}[{r['score']:.2f}] ({', '.join(r['tags'])}) {r['content']}"
-                if r["source"]:
-                    entry += f"\n  Source: {r['source']}"
-                if r.get("updated_at"):
-                    entry += f"\n  Updated: {r['updated_at']}"
-                if r.get("superseded_by"):
-                    entry += f"\n  Superseded by: {r['superseded_by']}"
-                entry += f"\n  ID: {r['id']}"
-                return entry
-
         # Group results when both types are present
-        has_agent = any(r["chunk_type"] == "agent-memory" for r in results)
-        has_file = any(r["chunk_type"] == "file-indexed" for r in results)
+        agent_results = [r for r in results if r["chunk_type"] == "agent-memory"]
+        file_results = [r for r in results if r["chunk_type"] == "file-indexed"]
         header = f"[{project}] {len(results)} results:\n"
 
-        if has_agent and has_file:
-            agent_results = [r for r in results if r["chunk_type"] == "agent-memory"]
-            file_results = [r for r in results if r["chunk_type"] == "file-indexed"]
-            sections = []
-            sections.append(f"\n── Agent memories ({len(agent_results)}) ──\n")
-            sections.append("\n\n".join(_format_text_result(r) for r in agent_results))
-            sections.append(f"\n\n── File-indexed ({len(file_results)}) ──\n")
-            sections.append("\n\n".join(_format_text_result(r) for r in file_results))
-            return header + "\n".join(sections)
+        if agent_results and file_results:
+            return header + "\n".join((
+                f"\n── Agent memories ({len(agent_results)}) ──\n",
+                "\n\n".join([_format_search_result(r, mode, is_cross_project) for r in agent_results]),
+                f"\n\n── File-indexed ({len(file_results)}) ──\n",
+                "\n\n".join([_format_search_result(r, mode, is_cross_project) for r in file_results]),
+            ))
 
-        lines = [_format_text_result(r) for r in results]
-        return header + "\n" + "\n\n".join(lines)
+        return header + "\n" + "\n\n".join([_format_search_result(r, mode, is_cross_project) for r in results])
 
     @mcp.tool()
     def expand_memories(project: str, memory_ids: list[str], output: str = "text") -> str:
@@ -666,7 +537,7 @@ def create_server(
         if not topics:
             return f"[{project}] No topics found. The memory store is empty."
 
-        lines = [f"  {tag}: {count} memories" for tag, count in sorted(topics.items(), key=lambda x: -x[1])]
+        lines = [f"  {tag}: {count} memories" for tag, count in topics.most_common()]
         return f"[{project}] Topics:\n" + "\n".join(lines)
 
     @mcp.tool()
@@ -712,13 +583,13 @@ def create_server(
             return (
                 f"Project '{project_name}' initialized. "
                 f"Indexing in progress — use index_status to check progress. "
-                f"Patterns: {proj.watch_patterns}, excludes: {proj.watch_exclude}."
+                f"Patterns: {list(proj.watch_patterns)}, excludes: {list(proj.watch_exclude)}."
             )
         return (
             f"Project '{project_name}' initialized with "
             f"watch paths: {proj.watch_paths}, "
-            f"patterns: {proj.watch_patterns}, "
-            f"excludes: {proj.watch_exclude}."
+            f"patterns: {list(proj.watch_patterns)}, "
+            f"excludes: {list(proj.watch_exclude)}."
         )
 
     @mcp.tool()
@@ -842,31 +713,43 @@ def create_server(
     return mcp, pool
 
 
-def _start_dashboard(pool: StorePool, config: AnnalConfig, port: int) -> None:
-    """Start the dashboard web server on a background thread."""
+def _start_dashboard(pool: StorePool, config: AnnalConfig, port: int) -> int | None:
+    """Start the dashboard web server on a background thread.
+
+    The socket is bound before the thread starts, so a port clash is
+    reported here and the port is known without waiting for startup.
+    Returns the bound port, or None if it could not be bound.
+    """
     import asyncio
+    import socket
 
     import uvicorn
 
     from annal.dashboard import create_dashboard_app
 
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.bind(("127.0.0.1", port))
+        sock.listen(128)
+    except OSError as e:
+        sock.close()
+        logger.warning("Dashboard disabled, cannot listen on port %d: %s", port, e)
+        return None
+    port = sock.getsockname()[1]
+
     app = create_dashboard_app(pool, config)
-    uv_config = uvicorn.Config(
-        app,
-        host="127.0.0.1",
-        port=port,
-        log_level="warning",
-    )
-    server = uvicorn.Server(uv_config)
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
 
     def _run() -> None:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
-        loop.run_until_complete(server.serve())
+        loop.run_until_complete(server.serve(sockets=[sock]))
 
     thread = threading.Thread(target=_run, daemon=True)
     thread.start()
     logger.info("Dashboard available at http://127.0.0.1:%d", port)
+    return port
 
 
 def _add_serve_args(parser: "argparse.ArgumentParser") -> None:
@@ -904,14 +787,15 @@ def _make_backend(name: str, config: AnnalConfig, collection: str, dimension: in
     raise ValueError(f"Unknown backend: {name}")
 
 
-def _run_export(config: AnnalConfig, project: str) -> None:
-    """Export all memories for a project to JSONL on stdout."""
-    from annal.embedder import OnnxEmbedder
+def _run_export(config: AnnalConfig, project: str, out: TextIO | None = None) -> None:
+    """Export all memories for a project as JSONL to `out` (default stdout)."""
+    from annal.embedder import shared_embedder
 
-    embedder = OnnxEmbedder()
+    embedder = shared_embedder()
     collection = f"annal_{project}"
     backend = _make_backend(config.storage.backend, config, collection, embedder.dimension)
 
+    out = out or sys.stdout
     batch_size = 500
     offset = 0
     count = 0
@@ -921,7 +805,7 @@ def _run_export(config: AnnalConfig, project: str) -> None:
             break
         for r in results:
             record = {"id": r.id, "text": r.text, "metadata": r.metadata}
-            sys.stdout.write(json.dumps(record) + "\n")
+            out.write(json.dumps(record) + "\n")
             count += 1
         offset += len(results)
         sys.stderr.write(f"\rExported {count}/{total} records")
@@ -930,9 +814,9 @@ def _run_export(config: AnnalConfig, project: str) -> None:
 
 def _run_import(config: AnnalConfig, project: str, filepath: str) -> None:
     """Import memories from a JSONL file into a project."""
-    from annal.embedder import OnnxEmbedder
+    from annal.embedder import shared_embedder
 
-    embedder = OnnxEmbedder()
+    embedder = shared_embedder()
     collection = f"annal_{project}"
     backend = _make_backend(config.storage.backend, config, collection, embedder.dimension)
 
@@ -940,12 +824,13 @@ def _run_import(config: AnnalConfig, project: str, filepath: str) -> None:
     batch_records: list[dict] = []
     count = 0
 
-    with open(filepath) as f:
+    # Read bytes: orjson parses them without a decode, json.loads accepts them too
+    with open(filepath, "rb") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
-            record = json.loads(line)
+            record = _loads_json(line)
             batch_texts.append(record["text"])
             batch_records.append(record)
 
@@ -964,10 +849,9 @@ def _run_import(config: AnnalConfig, project: str, filepath: str) -> None:
 
 
 def _import_batch(backend, embedder, records: list[dict], texts: list[str]) -> None:
-    """Embed and insert a batch of records."""
+    """Embed and insert a batch of records with one call each."""
     embeddings = embedder.embed_batch(texts)
-    for record, embedding in zip(records, embeddings):
-        backend.insert(record["id"], record["text"], embedding, record["metadata"])
+    backend.insert_many([r["id"] for r in records], texts, embeddings, [r["metadata"] for r in records])
 
 
 def main() -> None:
@@ -1021,11 +905,11 @@ def main() -> None:
         return
 
     if args.command == "migrate":
-        from annal.embedder import OnnxEmbedder
+        from annal.embedder import shared_embedder
         from annal.migrate import migrate
 
         config = AnnalConfig.load(args.config)
-        embedder = OnnxEmbedder()
+        embedder = shared_embedder()
         collection = f"annal_{args.project}"
 
         src = _make_backend(args.from_backend, config, collection, embedder.dimension)
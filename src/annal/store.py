@@ -5,11 +5,18 @@ from __future__ import annotations
 import re
 import threading
 import uuid
+from collections import Counter
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
 from annal.backend import Embedder, VectorBackend, VectorResult
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 @dataclass
 class BatchItem:
@@ -49,6 +56,7 @@ AGENT_MEMORY_BOOST = 0.05
 _ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}:\d{2})?")
 
 
+@lru_cache(maxsize=512)
 def _normalize_date_bound(value: str, end_of_day: bool) -> str | None:
     """Normalize a date-only string to include time for correct comparison.
 
@@ -61,59 +69,88 @@ def _normalize_date_bound(value: str, end_of_day: bool) -> str | None:
     return value + ("T23:59:59" if end_of_day else "T00:00:00")
 
 
+def _safe_norms(matrix: np.ndarray) -> np.ndarray:
+    """Row-wise L2 norms as a column vector, with zero norms replaced by 1.
+
+    Dividing by these leaves zero vectors at zero, so they never clear the
+    similarity threshold.
+    """
+    import numpy as np
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return norms
+
+
+def _fuzzy_match(filt: np.ndarray, known: np.ndarray, threshold: float) -> np.ndarray:
+    """Boolean mask of known rows whose cosine with any filter row reaches threshold.
+
+    Both inputs must already be L2-normalized. The whole comparison is one
+    (known x filter) matrix product, which numpy hands to its multithreaded
+    BLAS, so there is no per-row Python loop to parallelize.
+    """
+    # float16 known rows are upcast and accumulated in float32 against filt
+    return (known @ filt.T >= threshold).any(axis=1)
+
+
 class MemoryStore:
     def __init__(self, backend: VectorBackend, embedder: Embedder) -> None:
         self._backend = backend
         self._embedder = embedder
-        self._tag_cache: dict | None = None
+        self._tag_cache: tuple[list[str], dict[str, int], np.ndarray] | None = None
         self._tag_cache_lock = threading.Lock()
+        # list_topics results keyed by include_superseded; cleared with the tag cache
+        self._topic_counts: dict[bool, Counter[str]] = {}
 
     def _invalidate_tag_cache(self) -> None:
-        """Clear the tag embedding cache. Called after store/update/delete."""
+        """Clear the tag embedding and topic caches. Called after store/update/delete."""
         with self._tag_cache_lock:
             self._tag_cache = None
+            self._topic_counts = {}
+
+    def _get_tag_embeddings(self) -> tuple[list[str], dict[str, int], np.ndarray]:
+        """Get or build a cache of all known tag names and their embeddings.
 
-    def _get_tag_embeddings(self) -> dict:
-        """Get or build a cache of tag -> embedding for all tags in the store."""
+        Returns (names, name -> row index, matrix). Rows are L2-normalized so
+        cosine similarity is a plain dot product, and stored as float16 to
+        halve the cache footprint.
+        """
         import numpy as np
         with self._tag_cache_lock:
             if self._tag_cache is not None:
                 return self._tag_cache
-        topics = self.list_topics()
-        if not topics:
-            with self._tag_cache_lock:
-                self._tag_cache = {}
-                return self._tag_cache
-        tag_names = list(topics.keys())
-        embeddings = self._embedder.embed_batch(tag_names)
-        cache = {name: np.array(emb) for name, emb in zip(tag_names, embeddings)}
+        tag_names = list(self.list_topics())
+        if tag_names:
+            matrix = np.asarray(self._embedder.embed_batch(tag_names), dtype=np.float32)
+            matrix = (matrix / _safe_norms(matrix)).astype(np.float16)
+        else:
+            matrix = np.empty((0, self._embedder.dimension), dtype=np.float16)
+        tag_index = {name: i for i, name in enumerate(tag_names)}
         with self._tag_cache_lock:
-            self._tag_cache = cache
+            self._tag_cache = (tag_names, tag_index, matrix)
             return self._tag_cache
 
     def _expand_tags(self, filter_tags: list[str]) -> set[str]:
-        """Expand filter tags to include semantically similar known tags."""
+        """Expand filter tags to include semantically similar known tags.
+
+        Filter tags that are already known reuse their cached embedding rows;
+        only unknown tags go through the embedder.
+        """
         import numpy as np
-        tag_embeddings = self._get_tag_embeddings()
-        if not tag_embeddings:
+        tag_names, tag_index, matrix = self._get_tag_embeddings()
+        if not tag_names:
             return set(filter_tags)
 
-        expanded = set(filter_tags)
-        filter_embeddings = self._embedder.embed_batch(filter_tags)
-
-        for i, filter_tag in enumerate(filter_tags):
-            filter_emb = np.array(filter_embeddings[i])
-            filter_norm = np.linalg.norm(filter_emb)
-            if filter_norm == 0:
-                continue
-            for known_tag, known_emb in tag_embeddings.items():
-                known_norm = np.linalg.norm(known_emb)
-                if known_norm == 0:
-                    continue
-                similarity = np.dot(filter_emb, known_emb) / (filter_norm * known_norm)
-                if similarity >= FUZZY_TAG_THRESHOLD:
-                    expanded.add(known_tag)
+        filter_tags = list(dict.fromkeys(filter_tags))
+        rows = [tag_index[t] for t in filter_tags if t in tag_index]
+        unknown = [t for t in filter_tags if t not in tag_index]
+        parts = [matrix[rows].astype(np.float32)]
+        if unknown:
+            embedded = np.asarray(self._embedder.embed_batch(unknown), dtype=np.float32)
+            parts.append(embedded / _safe_norms(embedded))
+        matched = _fuzzy_match(np.vstack(parts), matrix, FUZZY_TAG_THRESHOLD)
 
+        expanded = set(filter_tags)
+        expanded.update(name for name, hit in zip(tag_names, matched) if hit)
         return expanded
 
     def _build_where(
@@ -153,27 +190,67 @@ class MemoryStore:
         file_mtime: float | None = None,
         supersedes: str | None = None,
     ) -> str:
-        mem_id = str(uuid.uuid4())
-        embedding = self._embedder.embed(content)
-        metadata: dict = {
-            "tags": tags,
-            "source": source,
-            "chunk_type": chunk_type,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
-        if file_mtime is not None:
-            metadata["file_mtime"] = file_mtime
-        self._backend.insert(mem_id, content, embedding, metadata)
+        item = BatchItem(content=content, tags=tags, source=source, supersedes=supersedes)
+        return self.store_many([item], chunk_type=chunk_type, file_mtime=file_mtime)[0]
 
-        if supersedes:
-            old = self._backend.get([supersedes])
-            if old:
-                old_meta = dict(old[0].metadata)
-                old_meta["superseded_by"] = mem_id
-                self._backend.update(supersedes, text=None, embedding=None, metadata=old_meta)
+    def store_many(
+        self,
+        items: list[BatchItem],
+        chunk_type: str = "agent-memory",
+        file_mtime: float | None = None,
+        file_hash: str | None = None,
+        extra_metadata: list[dict] | None = None,
+        embeddings: list[list[float]] | None = None,
+    ) -> list[str]:
+        """Store multiple memories with one embedding call and one backend insert.
+
+        Unlike store_batch, no deduplication is performed — every item is
+        stored. extra_metadata, if given, holds per-item keys merged into
+        each item's metadata; embeddings, if given, come from embed_items
+        and skip the embedding call. Returns the new memory IDs in input order.
+        """
+        if not items:
+            return []
+
+        if embeddings is None:
+            embeddings = self.embed_items(items)
+        now = datetime.now(timezone.utc).isoformat()
+        ids: list[str] = []
+        metadatas: list[dict] = []
+        for item in items:
+            metadata: dict = {
+                "tags": item.tags,
+                "source": item.source,
+                "chunk_type": chunk_type,
+                "created_at": now,
+            }
+            if file_mtime is not None:
+                metadata["file_mtime"] = file_mtime
+            if file_hash is not None:
+                metadata["file_hash"] = file_hash
+            ids.append(str(uuid.uuid4()))
+            metadatas.append(metadata)
+        if extra_metadata is not None:
+            for metadata, extra in zip(metadatas, extra_metadata):
+                metadata.update(extra)
+
+        self._backend.insert_many(ids, [item.content for item in items], embeddings, metadatas)
+
+        for mem_id, item in zip(ids, items):
+            if item.supersedes:
+                self._mark_superseded(item.supersedes, mem_id)
 
         self._invalidate_tag_cache()
-        return mem_id
+        return ids
+
+    def embed_items(self, items: list[BatchItem]) -> list[list[float]]:
+        """Embed the content of several items in one call (safe from any thread)."""
+        return self._embedder.embed_batch([item.content for item in items])
+
+    def _mark_superseded(self, old_id: str, new_id: str) -> None:
+        """Point an existing memory at the memory that replaces it (no-op if missing)."""
+        if self._backend.exists([old_id]):
+            self._backend.update_metadata(old_id, {"superseded_by": new_id})
 
     def store_batch(self, items: list[BatchItem]) -> BatchResult:
         """Store multiple memories in a single call with deduplication.
@@ -225,8 +302,9 @@ class MemoryStore:
             hint: str | None = None
 
             # Dedup against existing store (skip if superseding)
-            if not item.supersedes and self._backend.count() > 0:
-                candidates = self._backend.query(embeddings[idx], limit=10, where=where)
+            if not item.supersedes:
+                # Only scores and chunk types matter here, so skip the documents
+                candidates = self._backend.query(embeddings[idx], limit=10, where=where, with_text=False)
                 should_skip = False
                 for c in candidates:
                     if c.metadata.get("chunk_type") != "agent-memory":
@@ -256,11 +334,7 @@ class MemoryStore:
 
             # Handle supersession
             if item.supersedes:
-                old = self._backend.get([item.supersedes])
-                if old:
-                    old_meta = dict(old[0].metadata)
-                    old_meta["superseded_by"] = mem_id
-                    self._backend.update(item.supersedes, text=None, embedding=None, metadata=old_meta)
+                self._mark_superseded(item.supersedes, mem_id)
 
             result.items.append(BatchItemResult(
                 status="stored",
@@ -292,9 +366,6 @@ class MemoryStore:
                 raise ValueError(f"Invalid date format for 'before': expected ISO 8601, got '{before}'")
             before = normalized
 
-        if self._backend.count() == 0:
-            return []
-
         embedding = self._embedder.embed(query)
         where = self._build_where(tags=tags, after=after, before=before, include_superseded=include_superseded, source_prefix=source_prefix)
 
@@ -304,19 +375,19 @@ class MemoryStore:
         memories = []
         now = datetime.now(timezone.utc).isoformat()
         for r in results:
+            is_agent_memory = r.metadata.get("chunk_type") == "agent-memory"
             # Hit tracking for agent-memory results
-            if r.metadata.get("chunk_type") == "agent-memory":
-                hit_count = int(r.metadata.get("hit_count", 0)) + 1
-                r.metadata["hit_count"] = hit_count
-                r.metadata["last_accessed_at"] = now
+            if is_agent_memory:
+                hits = {"hit_count": int(r.metadata.get("hit_count", 0)) + 1, "last_accessed_at": now}
+                r.metadata.update(hits)
                 try:
-                    self._backend.update(r.id, text=None, embedding=None, metadata=dict(r.metadata))
+                    self._backend.update_metadata(r.id, hits)
                 except Exception:
                     pass  # best-effort telemetry
 
             distance = r.distance if r.distance is not None else 0.0
             score = 1.0 - distance
-            if r.metadata.get("chunk_type") == "agent-memory":
+            if is_agent_memory:
                 score += AGENT_MEMORY_BOOST
             mem = self._format_result(r)
             mem["score"] = score
@@ -335,15 +406,21 @@ class MemoryStore:
             now = datetime.now(timezone.utc).isoformat()
             for r in results:
                 if r.metadata.get("chunk_type") == "agent-memory":
-                    hit_count = int(r.metadata.get("hit_count", 0)) + 1
-                    r.metadata["hit_count"] = hit_count
-                    r.metadata["last_accessed_at"] = now
+                    hits = {"hit_count": int(r.metadata.get("hit_count", 0)) + 1, "last_accessed_at": now}
+                    r.metadata.update(hits)
                     try:
-                        self._backend.update(r.id, text=None, embedding=None, metadata=dict(r.metadata))
+                        self._backend.update_metadata(r.id, hits)
                     except Exception:
                         pass  # best-effort telemetry
         return [self._format_result(r) for r in results]
 
+    def exists_many(self, ids: list[str]) -> dict[str, bool]:
+        """Whether each id is stored, without fetching or touching the memories."""
+        if not ids:
+            return {}
+        found = self._backend.exists(ids)
+        return {mem_id: mem_id in found for mem_id in ids}
+
     def delete(self, mem_id: str) -> None:
         self._backend.delete([mem_id])
         self._invalidate_tag_cache()
@@ -360,18 +437,21 @@ class MemoryStore:
         if not existing:
             raise ValueError(f"Memory {mem_id} not found")
 
-        old = existing[0]
-        new_text = content if content is not None else None
-        new_embedding = self._embedder.embed(content) if content is not None else None
-
-        new_meta = dict(old.metadata)
-        new_meta["updated_at"] = datetime.now(timezone.utc).isoformat()
+        changes: dict = {"updated_at": datetime.now(timezone.utc).isoformat()}
         if tags is not None:
-            new_meta["tags"] = tags
+            changes["tags"] = tags
         if source is not None:
-            new_meta["source"] = source
+            changes["source"] = source
 
-        self._backend.update(mem_id, text=new_text, embedding=new_embedding, metadata=new_meta)
+        if content is None:
+            self._backend.update_metadata(mem_id, changes)
+        else:
+            self._backend.update(
+                mem_id,
+                text=content,
+                embedding=self._embedder.embed(content),
+                metadata={**existing[0].metadata, **changes},
+            )
         self._invalidate_tag_cache()
 
     def retag(
@@ -401,20 +481,16 @@ class MemoryStore:
         if set_tags is not None:
             final_tags = list(dict.fromkeys(set_tags))  # dedupe, preserve order
         else:
-            tag_set = list(dict.fromkeys(current_tags))  # start from current, deduped
-            if add_tags:
-                for t in add_tags:
-                    if t not in tag_set:
-                        tag_set.append(t)
-            if remove_tags:
-                tag_set = [t for t in tag_set if t not in set(remove_tags)]
-            final_tags = tag_set
-
-        new_meta = dict(old.metadata)
-        new_meta["tags"] = final_tags
-        new_meta["updated_at"] = datetime.now(timezone.utc).isoformat()
-
-        self._backend.update(mem_id, text=None, embedding=None, metadata=new_meta)
+            tag_set = dict.fromkeys(current_tags)  # ordered set: dedupes, preserves order
+            tag_set.update(dict.fromkeys(add_tags or ()))
+            for t in remove_tags or ():
+                tag_set.pop(t, None)
+            final_tags = list(tag_set)
+
+        self._backend.update_metadata(mem_id, {
+            "tags": final_tags,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        })
         self._invalidate_tag_cache()
         return final_tags
 
@@ -424,45 +500,49 @@ class MemoryStore:
             self._backend.delete(ids[i:i + 5000])
         self._invalidate_tag_cache()
 
-    def _iter_metadata(self) -> list[tuple[str, dict]]:
-        """Iterate all (id, metadata) pairs via backend scan."""
-        batch_size = 5000
-        total = self._backend.count()
-        pairs: list[tuple[str, dict]] = []
-        offset = 0
-        while offset < total:
-            results, _ = self._backend.scan(offset=offset, limit=batch_size)
-            if not results:
-                break
-            for r in results:
-                pairs.append((r.id, r.metadata))
-            offset += len(results)
-        return pairs
+    def _iter_metadata(self, where: dict | None = None) -> Iterator[tuple[str, dict]]:
+        """Yield all (id, metadata) pairs, one backend batch at a time.
+
+        Documents are never loaded, and the backend pages until a short
+        batch instead of counting matches up front.
+        """
+        return self._backend.iter_metadata(where)
 
-    def list_topics(self, include_superseded: bool = False) -> dict[str, int]:
-        tag_counts: dict[str, int] = {}
+    def list_topics(self, include_superseded: bool = False) -> Counter[str]:
+        with self._tag_cache_lock:
+            cached = self._topic_counts.get(include_superseded)
+            topic_counts = self._topic_counts
+        if cached is not None:
+            return Counter(cached)
+        tag_counts: Counter[str] = Counter()
         for _, meta in self._iter_metadata():
             if not include_superseded and meta.get("superseded_by"):
                 continue
-            for tag in meta.get("tags", []):
-                tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        return tag_counts
+            tag_counts.update(meta.get("tags", ()))
+        # Skip caching if a write invalidated the counts while we scanned
+        with self._tag_cache_lock:
+            if self._topic_counts is topic_counts:
+                topic_counts[include_superseded] = tag_counts
+        return Counter(tag_counts)
 
-    def delete_by_source(self, source_prefix: str) -> None:
-        """Delete all chunks whose source starts with the given prefix."""
-        ids_to_delete = [
+    def ids_by_source(self, source_prefix: str | tuple[str, ...]) -> list[str]:
+        """IDs of all chunks whose source starts with the given prefix (or any of them)."""
+        return [
             doc_id for doc_id, meta in self._iter_metadata()
             if meta.get("source", "").startswith(source_prefix)
         ]
+
+    def delete_by_source(self, source_prefix: str | tuple[str, ...]) -> None:
+        """Delete all chunks whose source starts with the given prefix (or any of them)."""
+        ids_to_delete = self.ids_by_source(source_prefix)
         if ids_to_delete:
-            for i in range(0, len(ids_to_delete), 5000):
-                self._backend.delete(ids_to_delete[i:i + 5000])
-            self._invalidate_tag_cache()
+            self.delete_many(ids_to_delete)
 
     def get_all_file_mtimes(self) -> dict[str, float]:
         """Build a source-prefix -> mtime lookup map for all file-indexed chunks."""
         mtimes: dict[str, float] = {}
-        for _, meta in self._iter_metadata():
+        # Equality filters run inside the backend, so agent memories are never read
+        for _, meta in self._iter_metadata(where={"chunk_type": "file-indexed"}):
             source = meta.get("source", "")
             if not source.startswith("file:"):
                 continue
@@ -474,6 +554,34 @@ class MemoryStore:
                 mtimes[file_key] = float(mtime)
         return mtimes
 
+    def get_all_file_hashes(self) -> dict[str, tuple[str, list[str]]]:
+        """Map source prefix -> (content hash, chunk IDs) for hashed file-indexed chunks."""
+        hashes: dict[str, tuple[str, list[str]]] = {}
+        for doc_id, meta in self._iter_metadata(where={"chunk_type": "file-indexed"}):
+            source = meta.get("source", "")
+            file_hash = meta.get("file_hash")
+            if not source.startswith("file:") or not file_hash:
+                continue
+            file_key = source.split("|")[0]
+            hashes.setdefault(file_key, (file_hash, []))[1].append(doc_id)
+        return hashes
+
+    def get_file_hash(self, file_path: str) -> tuple[str, list[str]] | None:
+        """(content hash, chunk IDs) of one indexed file, or None if it has none."""
+        where = {"chunk_type": "file-indexed", "source": {"$prefix": f"file:{file_path}|"}}
+        file_hash: str | None = None
+        ids: list[str] = []
+        for doc_id, meta in self._iter_metadata(where=where):
+            if not meta.get("file_hash"):
+                return None
+            file_hash = meta["file_hash"]
+            ids.append(doc_id)
+        return (file_hash, ids) if file_hash else None
+
+    def set_file_mtime(self, ids: list[str], file_mtime: float) -> None:
+        """Record a new mtime on a file's chunks without re-embedding them."""
+        self._backend.update_metadata_many(ids, {"file_mtime": file_mtime})
+
     def browse(
         self,
         offset: int = 0,
@@ -484,9 +592,6 @@ class MemoryStore:
         include_superseded: bool = False,
     ) -> tuple[list[dict], int]:
         """Paginated retrieval with optional filters. Returns (results, total_matching)."""
-        if self._backend.count() == 0:
-            return [], 0
-
         where = self._build_where(
             chunk_type=chunk_type,
             source_prefix=source_prefix,
@@ -573,19 +678,23 @@ class MemoryStore:
     @staticmethod
     def _format_result(r: VectorResult) -> dict:
         """Convert a VectorResult to the dict format expected by callers."""
+        get = r.metadata.get
         result = {
             "id": r.id,
             "content": r.text,
-            "tags": r.metadata.get("tags", []),
-            "source": r.metadata.get("source", ""),
-            "chunk_type": r.metadata.get("chunk_type", ""),
-            "created_at": r.metadata.get("created_at", ""),
-            "updated_at": r.metadata.get("updated_at", ""),
+            "tags": get("tags", []),
+            "source": get("source", ""),
+            "chunk_type": get("chunk_type", ""),
+            "created_at": get("created_at", ""),
+            "updated_at": get("updated_at", ""),
         }
-        if r.metadata.get("superseded_by"):
-            result["superseded_by"] = r.metadata["superseded_by"]
-        if "hit_count" in r.metadata:
-            result["hit_count"] = int(r.metadata["hit_count"])
-        if "last_accessed_at" in r.metadata:
-            result["last_accessed_at"] = r.metadata["last_accessed_at"]
+        superseded_by = get("superseded_by")
+        if superseded_by:
+            result["superseded_by"] = superseded_by
+        hit_count = get("hit_count")
+        if hit_count is not None:
+            result["hit_count"] = int(hit_count)
+        last_accessed_at = get("last_accessed_at")
+        if last_accessed_at is not None:
+            result["last_accessed_at"] = last_accessed_at
         return result
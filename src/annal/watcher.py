@@ -3,160 +3,724 @@
 from __future__ import annotations
 
 import fnmatch
+import itertools
 import logging
 import os
-from collections.abc import Callable
+import re
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
 from pathlib import Path
 
-from watchdog.events import FileSystemEventHandler, FileModifiedEvent, FileCreatedEvent, FileDeletedEvent
+from watchdog.events import (
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+    FileSystemEventHandler,
+)
 from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver, ObservedWatch
+from watchdog.observers.polling import PollingObserver
 
 from annal.config import ProjectConfig
-from annal.indexer import index_file
-from annal.store import MemoryStore
+from annal.indexer import index_file, prepare_file, store_files
+from annal.store import BatchItem, MemoryStore
 
 logger = logging.getLogger(__name__)
 
+_MATCH_CACHE_SIZE = 10000
+_RECONCILE_WORKERS = min(8, os.cpu_count() or 4)
+_STAT_BATCH = 256
+# Chunks buffered across files before one delete + embed + insert round
+_INSERT_BATCH = 250
+_DEBOUNCE_SECONDS = 0.25
+_MAX_WATCHES_PER_TREE = 64
+# Every native watch is its own inotify instance, and the default
+# fs.inotify.max_user_instances (128) is shared by all of the user's
+# processes, so the whole process stays well below it
+_MAX_NATIVE_WATCHES = 64
+# inotify never sees changes made by other NFS/SMB clients, so trees on
+# network mounts are polled instead
+_NETWORK_FS_TYPES = frozenset({"nfs", "nfs4", "cifs", "smb3", "smbfs", "fuse.sshfs"})
+_POLL_INTERVAL = 5.0
+
+# A compiled pattern is (kind, value): common glob shapes become plain string
+# tests, anything else a regex. See _compile_pattern.
+_Pattern = tuple[str, object]
+_GLOB_MAGIC = re.compile(r"[*?[]")
+_CASE_SENSITIVE = os.path.normcase("A") == "A"
+_NEEDS_NORMALIZE = os.sep != "/"
+
 
 def matches_patterns(
     rel_path: str, patterns: list[str], excludes: list[str]
 ) -> bool:
     """Check if a relative path matches watch patterns and isn't excluded."""
-    rel_path = rel_path.replace(os.sep, "/")
+    return _matches_compiled(
+        _to_posix(rel_path),
+        _compile_patterns(tuple(patterns)),
+        _compile_patterns(tuple(excludes)),
+    )
 
-    for exclude in excludes:
-        if _glob_match(rel_path, exclude):
-            return False
 
-    for pattern in patterns:
-        if _glob_match(rel_path, pattern):
-            return True
+def _to_posix(rel_path: str) -> str:
+    """Convert a native relative path to "/" separators (no-op on POSIX)."""
+    return rel_path.replace(os.sep, "/") if _NEEDS_NORMALIZE else rel_path
 
-    return False
 
+def _matches_compiled(
+    rel_path: str, includes: _PatternSet, excludes: _PatternSet
+) -> bool:
+    """matches_patterns() over compiled patterns; rel_path must be "/"-separated."""
+    if excludes.matches(rel_path):
+        return False
+    return includes.matches(rel_path)
 
-def _glob_match(rel_path: str, pattern: str) -> bool:
-    """Match a relative path against a glob pattern with ** support."""
-    # For patterns like **/*.md, match at any depth including root
-    if pattern.startswith("**/"):
-        suffix = pattern[3:]  # e.g. "*.md"
-        # Match the full path or just the filename
-        if fnmatch.fnmatch(rel_path, pattern) or fnmatch.fnmatch(rel_path, suffix):
+
+class _PatternSet:
+    """A list of compiled patterns merged by kind for single-pass matching.
+
+    All literal suffixes go into one tuple for str.endswith, all literal
+    directory prefixes into one tuple for str.startswith, and exact names
+    and "**/name/**" directory names into frozensets. Directory tests run
+    before suffix tests, so a path under an excluded directory is rejected
+    by its first check; regex patterns are tried last. Duplicates are
+    dropped.
+    """
+
+    __slots__ = ("_exact", "_prefixes", "_dir_names", "_suffixes", "_contains", "_regexes")
+
+    def __init__(self, patterns: list[_Pattern]) -> None:
+        exact: set[str] = set()
+        dir_names: set[str] = set()
+        # dicts as ordered sets: keep the configured order, drop repeats
+        prefixes: dict[str, None] = {}
+        suffixes: dict[str, None] = {}
+        contains: dict[str, None] = {}
+        regexes: dict[re.Pattern, None] = {}
+        for kind, value in patterns:
+            if kind == "endswith":
+                suffixes[value] = None
+            elif kind == "prefix":
+                exact.add(value[0])
+                prefixes[value[1]] = None
+            elif kind == "name":
+                exact.add(value[0])
+                suffixes[value[1]] = None
+            elif kind == "eq":
+                exact.add(value)
+            elif kind == "contains":
+                name = value[1:-1]
+                if "/" in name:
+                    contains[value] = None
+                else:
+                    dir_names.add(name)
+            else:
+                regexes[value] = None
+        self._exact = frozenset(exact)
+        self._prefixes = tuple(prefixes)
+        self._dir_names = frozenset(dir_names)
+        self._suffixes = tuple(suffixes)
+        self._contains = tuple(contains)
+        self._regexes = tuple(regexes)
+
+    def matches(self, rel_path: str) -> bool:
+        """Check a "/"-separated relative path against every pattern."""
+        if rel_path in self._exact or rel_path.startswith(self._prefixes):
+            return True
+        # "/name/" occurs in "/" + rel_path iff name is a directory component
+        if self._dir_names and not self._dir_names.isdisjoint(rel_path.split("/")[:-1]):
+            return True
+        if rel_path.endswith(self._suffixes):
             return True
-        # Also match any sub-path
-        parts = rel_path.split("/")
-        for i in range(len(parts)):
-            sub = "/".join(parts[i:])
-            if fnmatch.fnmatch(sub, suffix):
+        if self._contains:
+            slashed = "/" + rel_path
+            for value in self._contains:
+                if value in slashed:
+                    return True
+        for regex in self._regexes:
+            if regex.match(rel_path):
                 return True
         return False
 
-    # For patterns like node_modules/**, check if path starts with the prefix
+
+@lru_cache(maxsize=64)
+def _compile_patterns(patterns: tuple[str, ...]) -> _PatternSet:
+    """Compile a list of glob patterns into one _PatternSet."""
+    return _PatternSet([_compile_pattern(p) for p in patterns])
+
+
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> _Pattern:
+    """Compile a glob pattern with ** support into a (kind, value) matcher.
+
+    "**/suffix" matches suffix at the root or after any "/" boundary,
+    "prefix/**" matches the prefix itself or anything beneath it, and
+    everything else follows fnmatch (where * also matches "/"). Literal
+    shapes such as "**/*.md", "node_modules/**" and "**/.git/**" become
+    plain string tests; the rest compile to a regex.
+    """
+    if _CASE_SENSITIVE:
+        fast = _compile_literal(pattern)
+        if fast is not None:
+            return fast
+
+    flags = 0 if _CASE_SENSITIVE else re.IGNORECASE
+    # For patterns like **/*.md, match at any depth including root
+    if pattern.startswith("**/"):
+        return "re", re.compile(r"(?s:.*/)?" + fnmatch.translate(pattern[3:]), flags)
+
+    # For patterns like node_modules/**, match the prefix dir and its contents
     if pattern.endswith("/**"):
-        prefix = pattern[:-3]  # e.g. "node_modules"
-        return rel_path == prefix or rel_path.startswith(prefix + "/")
+        return "re", re.compile(re.escape(pattern[:-3]) + r"(?s:/.*)?\Z", flags)
+
+    return "re", re.compile(fnmatch.translate(pattern), flags)
+
+
+def _compile_literal(pattern: str) -> _Pattern | None:
+    """String-test form of a pattern whose only wildcards are structural."""
+    if pattern.startswith("**/"):
+        rest = pattern[3:]
+        # "*" also matches "/", so **/*.md is just a suffix test
+        if rest.startswith("*") and _is_literal(rest[1:]):
+            return "endswith", rest[1:]
+        if rest.endswith("/**") and _is_literal(rest[:-3]):
+            return "contains", "/" + rest[:-3] + "/"
+        if _is_literal(rest):
+            return "name", (rest, "/" + rest)
+        return None
+    if pattern.endswith("/**") and _is_literal(pattern[:-3]):
+        return "prefix", (pattern[:-3], pattern[:-3] + "/")
+    if pattern.startswith("*") and _is_literal(pattern[1:]):
+        return "endswith", pattern[1:]
+    if _is_literal(pattern):
+        return "eq", pattern
+    return None
+
+
+def _is_literal(text: str) -> bool:
+    return bool(text) and not _GLOB_MAGIC.search(text)
+
+
+def _scandir_recursive(
+    root: str, excludes: _PatternSet | None = None, prefix_len: int = 0
+) -> Iterator[os.DirEntry]:
+    """Yield every file under root using os.scandir.
+
+    DirEntry caches the file type from the directory read, so telling files
+    from directories costs no extra stat(). Symlinked directories are not
+    descended into; unreadable directories are skipped. With excludes,
+    directories whose path (minus the first prefix_len characters) is
+    excluded are pruned with one test instead of one per file.
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except (PermissionError, FileNotFoundError, NotADirectoryError):
+        logger.warning("Cannot scan directory, skipping: %s", root)
+        return
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if excludes is not None and _dir_excluded(entry.path[prefix_len:], excludes):
+                    continue
+                yield from _scandir_recursive(entry.path, excludes, prefix_len)
+            elif entry.is_file():
+                yield entry
+        except OSError:
+            continue
+
+
+def _batch_mtimes(
+    entries: list[os.DirEntry], pool: ThreadPoolExecutor
+) -> list[float | None]:
+    """Stat entries in parallel batches; None for files that can't be stat'ed.
+
+    On network filesystems each stat() is a round trip, so keeping several
+    in flight hides most of the latency. Batching keeps the per-task
+    overhead negligible when stats are served from the local cache.
+    """
+    if len(entries) <= _STAT_BATCH:
+        return _stat_mtimes(entries)
+    batches = [entries[i:i + _STAT_BATCH] for i in range(0, len(entries), _STAT_BATCH)]
+    return [mtime for batch in pool.map(_stat_mtimes, batches) for mtime in batch]
+
+
+def _prepared_files(
+    pool: ThreadPoolExecutor, pending: list[tuple[str, float]]
+) -> Iterator[tuple[str, float, Future]]:
+    """Run prepare_file over pending files, yielding each future as it finishes.
+
+    At most two reads per worker are in flight, so embedding jobs submitted to
+    the same pool are not queued behind every remaining file, and a finished
+    file's chunks are released once the caller has buffered them.
+    """
+    queued = iter(pending)
+    in_flight: dict[Future, tuple[str, float]] = {}
+    for path, mtime in itertools.islice(queued, 2 * _RECONCILE_WORKERS):
+        in_flight[pool.submit(prepare_file, path)] = (path, mtime)
+    while in_flight:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            path, mtime = in_flight.pop(future)
+            following = next(queued, None)
+            if following is not None:
+                in_flight[pool.submit(prepare_file, following[0])] = following
+            yield path, mtime, future
+
+
+def _stat_mtimes(entries: list[os.DirEntry]) -> list[float | None]:
+    mtimes: list[float | None] = []
+    for entry in entries:
+        try:
+            mtimes.append(entry.stat().st_mtime)
+        except OSError:
+            logger.warning("Cannot stat file, skipping: %s", entry.path)
+            mtimes.append(None)
+    return mtimes
+
+
+def _is_network_fs(path: str) -> bool:
+    """Check whether path lives on a network filesystem (Linux only)."""
+    try:
+        with open("/proc/self/mountinfo") as f:
+            mountinfo = f.read()
+    except OSError:
+        return False
+    real = os.path.realpath(path)
+    best, best_type = "", ""
+    for line in mountinfo.splitlines():
+        fields, _, tail = line.partition(" - ")
+        parts = fields.split(" ")
+        if len(parts) < 5 or not tail:
+            continue
+        # mountinfo escapes spaces and other specials in octal
+        mount_point = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), parts[4])
+        if (
+            real == mount_point
+            or real.startswith(mount_point.rstrip("/") + "/")
+        ) and len(mount_point) >= len(best):
+            best, best_type = mount_point, tail.split(" ", 1)[0]
+    return best_type in _NETWORK_FS_TYPES
+
 
-    return fnmatch.fnmatch(rel_path, pattern)
+def _dir_excluded(rel_dir: str, excludes: _PatternSet) -> bool:
+    """Check whether an exclude swallows a whole directory.
+
+    Directory excludes ("prefix/**", "**/name/**") match the directory's
+    relative path with a trailing slash.
+    """
+    return excludes.matches(_to_posix(rel_dir) + "/")
+
+
+def _plan_watches(
+    directory: str, root: str, excludes: _PatternSet
+) -> list[tuple[str, bool]]:
+    """Plan (path, recursive) watches covering directory but no excluded subtree.
+
+    Subtrees without excluded directories get one recursive watch. Any
+    directory with an excluded descendant is watched non-recursively and
+    its children are planned the same way, so excluded subtrees never get
+    inotify watches.
+    """
+    plan, _ = _plan_dir(directory, len(root.rstrip(os.sep)) + 1, excludes)
+    return plan
+
+
+def _plan_dir(
+    directory: str, prefix_len: int, excludes: _PatternSet
+) -> tuple[list[tuple[str, bool]], bool]:
+    try:
+        with os.scandir(directory) as it:
+            subdirs = [e.path for e in it if e.is_dir(follow_symlinks=False)]
+    except OSError:
+        return [(directory, True)], True
+
+    clean = True
+    children: list[tuple[str, bool]] = []
+    for sub in subdirs:
+        if _dir_excluded(sub[prefix_len:], excludes):
+            clean = False
+            continue
+        child_plan, child_clean = _plan_dir(sub, prefix_len, excludes)
+        clean = clean and child_clean
+        children.extend(child_plan)
+    if clean:
+        return [(directory, True)], True
+    return [(directory, False), *children], False
+
+
+_native_watches = 0
+_native_watches_lock = threading.Lock()
+
+
+def _native_watches_free() -> int:
+    """How many more native watches the process-wide budget allows."""
+    with _native_watches_lock:
+        return _MAX_NATIVE_WATCHES - _native_watches
+
+
+def _count_native_watches(delta: int) -> None:
+    global _native_watches
+    with _native_watches_lock:
+        _native_watches = max(0, _native_watches + delta)
 
 
 class _IndexHandler(FileSystemEventHandler):
     """Watchdog handler that re-indexes files on change."""
 
     def __init__(
-        self, store: MemoryStore, project_config: ProjectConfig, watch_root: str
+        self,
+        store: MemoryStore,
+        project_config: ProjectConfig,
+        watch_root: str,
+        index_lock: threading.Lock | None = None,
+        on_dir_created: Callable[[_IndexHandler, str], None] | None = None,
+        on_dir_deleted: Callable[[str], None] | None = None,
     ) -> None:
         self._store = store
         self._config = project_config
         self._watch_root = watch_root
+        self._on_dir_created = on_dir_created
+        self._on_dir_deleted = on_dir_deleted
+        # Editors emit several events per save; each path is handled once
+        # things go quiet. Store writes from all handlers of a watcher are
+        # serialized through index_lock.
+        self._pending: dict[str, threading.Timer] = {}
+        self._pending_lock = threading.Lock()
+        self._index_lock = index_lock or threading.Lock()
+        self._includes = _compile_patterns(tuple(project_config.watch_patterns))
+        self._excludes = _compile_patterns(tuple(project_config.watch_exclude))
+        # Patterns are fixed per handler, so the decision depends only on rel path
+        self._match_cache: dict[str, bool] = {}
 
     def _should_index(self, path: str) -> bool:
-        rel = os.path.relpath(path, self._watch_root)
-        return matches_patterns(rel, self._config.watch_patterns, self._config.watch_exclude)
+        rel = _to_posix(os.path.relpath(path, self._watch_root))
+        cached = self._match_cache.get(rel)
+        if cached is not None:
+            return cached
+        result = _matches_compiled(rel, self._includes, self._excludes)
+        if len(self._match_cache) >= _MATCH_CACHE_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            self._match_cache.pop(next(iter(self._match_cache)))
+        self._match_cache[rel] = result
+        return result
+
+    def _schedule(self, path: str, action: str) -> None:
+        """(Re)start the debounce timer for path; the last event's action wins."""
+        with self._pending_lock:
+            timer = self._pending.pop(path, None)
+            if timer is not None:
+                timer.cancel()
+            timer = threading.Timer(_DEBOUNCE_SECONDS, self._run, args=(path, action))
+            timer.daemon = True
+            self._pending[path] = timer
+            timer.start()
+
+    def _run(self, path: str, action: str) -> None:
+        with self._pending_lock:
+            # A later event may already have replaced this timer; leave that
+            # one tracked so cancel_pending() can still stop it
+            if self._pending.get(path) is threading.current_thread():
+                del self._pending[path]
+        with self._index_lock:
+            if action == "delete":
+                try:
+                    logger.info("File deleted, removing from store: %s", path)
+                    self._store.delete_by_source(f"file:{path}")
+                except Exception:
+                    logger.exception("Failed to remove deleted file: %s", path)
+            else:
+                try:
+                    logger.info("File changed, re-indexing: %s", path)
+                    index_file(self._store, path)
+                except Exception:
+                    logger.exception("Failed to index changed file: %s", path)
+
+    def cancel_pending(self) -> None:
+        """Drop any debounced events that have not fired yet."""
+        with self._pending_lock:
+            for timer in self._pending.values():
+                timer.cancel()
+            self._pending.clear()
 
     def on_modified(self, event: FileModifiedEvent) -> None:
         if not event.is_directory and self._should_index(event.src_path):
-            try:
-                logger.info("File modified, re-indexing: %s", event.src_path)
-                index_file(self._store, event.src_path)
-            except Exception:
-                logger.exception("Failed to index modified file: %s", event.src_path)
+            self._schedule(event.src_path, "index")
 
     def on_created(self, event: FileCreatedEvent) -> None:
-        if not event.is_directory and self._should_index(event.src_path):
-            try:
-                logger.info("File created, indexing: %s", event.src_path)
-                index_file(self._store, event.src_path)
-            except Exception:
-                logger.exception("Failed to index created file: %s", event.src_path)
+        if event.is_directory:
+            if self._on_dir_created:
+                self._on_dir_created(self, event.src_path)
+        elif self._should_index(event.src_path):
+            self._schedule(event.src_path, "index")
 
     def on_deleted(self, event: FileDeletedEvent) -> None:
-        if not event.is_directory and self._should_index(event.src_path):
-            try:
-                logger.info("File deleted, removing from store: %s", event.src_path)
-                self._store.delete_by_source(f"file:{event.src_path}")
-            except Exception:
-                logger.exception("Failed to remove deleted file: %s", event.src_path)
+        if event.is_directory:
+            if self._on_dir_deleted:
+                self._on_dir_deleted(event.src_path)
+        elif self._should_index(event.src_path):
+            self._schedule(event.src_path, "delete")
+        self._match_cache.pop(_to_posix(os.path.relpath(event.src_path, self._watch_root)), None)
+
+    def on_moved(self, event: FileMovedEvent) -> None:
+        if event.is_directory:
+            # The old path's watches would keep reporting under the old name,
+            # and a non-recursive parent gives the new path no watch at all
+            if self._on_dir_deleted:
+                self._on_dir_deleted(event.src_path)
+            self._schedule(event.src_path + os.sep, "delete")
+            if self._on_dir_created:
+                self._on_dir_created(self, event.dest_path)
+            return
+        if self._should_index(event.src_path):
+            self._schedule(event.src_path, "delete")
+        self._match_cache.pop(_to_posix(os.path.relpath(event.src_path, self._watch_root)), None)
+        if self._should_index(event.dest_path):
+            self._schedule(event.dest_path, "index")
 
 
 class FileWatcher:
     def __init__(self, store: MemoryStore, project_config: ProjectConfig) -> None:
         self._store = store
         self._config = project_config
-        self._observer: Observer | None = None
+        # One native and/or one polling observer, and which one each
+        # watch root uses; empty while stopped
+        self._observers: dict[bool, BaseObserver] = {}
+        self._root_observers: dict[str, BaseObserver] = {}
+        self._handlers: list[_IndexHandler] = []
+        self._watches: dict[str, tuple[BaseObserver, ObservedWatch]] = {}
+        # Directories watched non-recursively; new subdirectories under
+        # these need their own watch
+        self._flat_dirs: set[str] = set()
+        self._watch_lock = threading.Lock()
+        self._includes = _compile_patterns(tuple(project_config.watch_patterns))
+        self._excludes = _compile_patterns(tuple(project_config.watch_exclude))
 
     def reconcile(self, progress_callback: Callable[[int], None] | None = None) -> int:
         """Scan all watch paths and index new or changed files. Returns file count."""
         # Build mtime cache once — O(m) — instead of scanning all metadata per file
         mtime_cache = self._store.get_all_file_mtimes()
 
-        total = 0
-        skipped = 0
+        candidates: list[os.DirEntry] = []
         for watch_path in self._config.watch_paths:
-            root = Path(watch_path)
-            if not root.exists():
+            root = str(Path(watch_path))
+            if not os.path.exists(root):
                 logger.warning("Watch path does not exist, skipping: %s", watch_path)
                 continue
-            for path in root.rglob("*"):
-                if path.is_dir():
-                    continue
-                try:
-                    rel = str(path.relative_to(root))
-                    if not matches_patterns(rel, self._config.watch_patterns, self._config.watch_exclude):
-                        continue
+            prefix_len = len(root.rstrip(os.sep)) + 1
+            for entry in _scandir_recursive(root, self._excludes, prefix_len):
+                if _matches_compiled(_to_posix(entry.path[prefix_len:]), self._includes, self._excludes):
+                    candidates.append(entry)
 
-                    file_path = str(path)
-                    current_mtime = path.stat().st_mtime
-                    stored_mtime = mtime_cache.get(f"file:{file_path}")
+        with ThreadPoolExecutor(max_workers=_RECONCILE_WORKERS) as pool:
+            pending: list[tuple[str, float]] = []
+            skipped = 0
+            for entry, current_mtime in zip(candidates, _batch_mtimes(candidates, pool)):
+                if current_mtime is None:
+                    continue
+                stored_mtime = mtime_cache.get(f"file:{entry.path}")
+                if stored_mtime is not None and abs(stored_mtime - current_mtime) < 0.5:
+                    skipped += 1
+                    continue
+                pending.append((entry.path, current_mtime))
 
-                    if stored_mtime is not None and abs(stored_mtime - current_mtime) < 0.5:
-                        skipped += 1
-                        continue
+            # Read and chunk files on worker threads; store writes stay on this
+            # thread, since the scan for old chunks pages through the collection by
+            # offset and would skip rows if another thread deleted underneath it.
+            # Writes are buffered so many small files share one store round,
+            # and each buffer is embedded on a worker while the previous one
+            # is written, overlapping ONNX inference with SQLite I/O.
+            # Files whose mtime moved but whose bytes did not (git checkout, touch)
+            # only get their stored mtime refreshed
+            known = any(f"file:{path}" in mtime_cache for path, _ in pending)
+            hash_cache = self._store.get_all_file_hashes() if known else {}
 
-                    index_file(self._store, file_path, file_mtime=current_mtime)
+            total = 0
+            buffer: list[tuple[str, list[BatchItem], float, str]] = []
+            buffered_chunks = 0
+            embedding: tuple[list, Future] | None = None
+            for file_path, current_mtime, future in _prepared_files(pool, pending):
+                try:
+                    prepared = future.result()
+                    if prepared is not None:
+                        items, file_hash = prepared
+                        stored = hash_cache.get(f"file:{file_path}")
+                        if stored is not None and stored[0] == file_hash:
+                            self._store.set_file_mtime(stored[1], current_mtime)
+                            skipped += 1
+                            continue
+                        buffer.append((file_path, items, current_mtime, file_hash))
+                        buffered_chunks += len(items)
                     total += 1
                     if progress_callback and total % 50 == 0:
                         progress_callback(total)
                 except Exception:
-                    logger.exception("Failed to reconcile file: %s", path)
+                    logger.exception("Failed to reconcile file: %s", file_path)
+                    continue
+                if buffered_chunks >= _INSERT_BATCH:
+                    next_embedding = self._embed_async(pool, buffer)
+                    total -= self._flush(embedding)
+                    embedding = next_embedding
+                    buffer = []
+                    buffered_chunks = 0
+            next_embedding = self._embed_async(pool, buffer)
+            total -= self._flush(embedding)
+            total -= self._flush(next_embedding)
 
         if skipped:
             logger.info("Skipped %d unchanged files", skipped)
         return total
 
+    def _embed_async(
+        self, pool: ThreadPoolExecutor, buffer: list[tuple[str, list[BatchItem], float, str]],
+    ) -> tuple[list, Future] | None:
+        """Start embedding a buffer of files on the pool."""
+        if not buffer:
+            return None
+        items = [item for _, file_items, _, _ in buffer for item in file_items]
+        return buffer, pool.submit(self._store.embed_items, items)
+
+    def _flush(self, embedding: tuple[list, Future] | None) -> int:
+        """Write a buffer of files, once embedded, to the store.
+
+        Returns how many files failed to store (0 on success).
+        """
+        if embedding is None:
+            return 0
+        buffer, future = embedding
+        try:
+            store_files(self._store, buffer, future.result())
+            return 0
+        except Exception:
+            logger.exception("Failed to store %d reconciled files", len(buffer))
+            return len(buffer)
+
     def start(self) -> None:
         """Start watching for file changes."""
-        self._observer = Observer()
+        index_lock = threading.Lock()
         for watch_path in self._config.watch_paths:
             if not Path(watch_path).exists():
                 logger.warning("Watch path does not exist, skipping: %s", watch_path)
                 continue
-            handler = _IndexHandler(self._store, self._config, watch_path)
-            self._observer.schedule(handler, watch_path, recursive=True)
-        self._observer.start()
+            root = str(Path(watch_path))
+            network = _is_network_fs(root)
+            if network not in self._observers:
+                if network:
+                    logger.info("Polling network filesystem every %.0fs: %s", _POLL_INTERVAL, root)
+                self._observers[network] = (
+                    PollingObserver(timeout=_POLL_INTERVAL) if network else Observer()
+                )
+            self._root_observers[root] = self._observers[network]
+            handler = _IndexHandler(
+                self._store, self._config, root, index_lock,
+                on_dir_created=self._watch_new_dir,
+                on_dir_deleted=self._unwatch_dir,
+            )
+            self._handlers.append(handler)
+            observer = self._root_observers[root]
+            # Started before any watch is scheduled, so an emitter that
+            # cannot get an inotify instance fails in _watch_tree, per root
+            if not observer.is_alive():
+                observer.start()
+            with self._watch_lock:
+                self._watch_tree(handler, root, root)
+
+    def _watch_tree(self, handler: _IndexHandler, directory: str, root: str) -> None:
+        """Schedule watches for directory, skipping excluded subtrees.
+
+        Each scheduled watch costs an emitter thread, and a native one an
+        inotify instance, so if pruning would need more of them than this
+        tree or the process-wide budget allows, or the kernel refuses one,
+        fall back to one recursive watch.
+        """
+        observer = self._root_observers[root]
+        native = not isinstance(observer, PollingObserver)
+        plan = _plan_watches(directory, root, self._excludes)
+        if len(plan) > _MAX_WATCHES_PER_TREE or (
+            len(plan) > 1 and native and len(plan) > _native_watches_free()
+        ):
+            plan = [(directory, True)]
+        scheduled: list[str] = []
+        try:
+            for path, recursive in plan:
+                self._schedule_watch(observer, handler, path, recursive)
+                scheduled.append(path)
+        except OSError as exc:
+            for path in scheduled:
+                self._drop_watch(path)
+            if plan == [(directory, True)]:
+                logger.warning("Cannot watch %s: %s", directory, exc)
+                return
+            logger.warning("Cannot watch %s directory by directory (%s), watching it recursively", directory, exc)
+            try:
+                self._schedule_watch(observer, handler, directory, True)
+            except OSError as exc:
+                logger.warning("Cannot watch %s: %s", directory, exc)
+
+    def _schedule_watch(
+        self, observer: BaseObserver, handler: _IndexHandler, path: str, recursive: bool
+    ) -> None:
+        watch = observer.schedule(handler, path, recursive=recursive)
+        if not isinstance(observer, PollingObserver):
+            # Counted even past the budget: a recursive fallback is still needed
+            _count_native_watches(1)
+        self._watches[path] = (observer, watch)
+        if not recursive:
+            self._flat_dirs.add(path)
+
+    def _drop_watch(self, path: str) -> None:
+        observer, watch = self._watches.pop(path)
+        self._flat_dirs.discard(path)
+        if not isinstance(observer, PollingObserver):
+            _count_native_watches(-1)
+        try:
+            observer.unschedule(watch)
+        except KeyError:
+            pass  # emitter already gone with the directory
+
+    def _watch_new_dir(self, handler: _IndexHandler, path: str) -> None:
+        """Start watching a directory created under a non-recursive watch."""
+        root = handler._watch_root
+        with self._watch_lock:
+            if not self._observers or path in self._watches:
+                return
+            # Recursive watches pick up new subdirectories on their own
+            if os.path.dirname(path) not in self._flat_dirs:
+                return
+            if _dir_excluded(os.path.relpath(path, root), self._excludes):
+                return
+            self._watch_tree(handler, path, root)
+        # Files written before the watch existed produced no events
+        for entry in _scandir_recursive(path, self._excludes, len(root.rstrip(os.sep)) + 1):
+            if handler._should_index(entry.path):
+                handler._schedule(entry.path, "index")
+
+    def _unwatch_dir(self, path: str) -> None:
+        """Drop watches for a deleted directory and everything under it."""
+        with self._watch_lock:
+            if not self._observers:
+                return
+            for watched in [d for d in self._watches if d == path or d.startswith(path + os.sep)]:
+                self._drop_watch(watched)
 
     def stop(self) -> None:
         """Stop watching for file changes."""
-        if self._observer:
-            self._observer.stop()
-            self._observer.join()
-            self._observer = None
+        with self._watch_lock:
+            observers = list(self._observers.values())
+            _count_native_watches(-sum(
+                not isinstance(observer, PollingObserver) for observer, _ in self._watches.values()
+            ))
+            self._observers.clear()
+            self._root_observers.clear()
+            self._watches.clear()
+            self._flat_dirs.clear()
+        for observer in observers:
+            observer.stop()
+        for observer in observers:
+            observer.join()
+        for handler in self._handlers:
+            handler.cancel_pending()
+        self._handlers.clear()
@@ -1,35 +1,233 @@
+import ast
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
 import pytest
 
-from annal.embedder import OnnxEmbedder
-from annal.backends.chromadb import ChromaBackend
-from annal.store import MemoryStore
+from annal.embedder import shared_embedder
+from annal.backends.chromadb import ChromaBackend, clear_client
+from annal.store import BatchItem, MemoryStore
+
+
+# ANNAL_FAKE_EMBEDDER=1 swaps the ONNX model for HashEmbedder everywhere and
+# skips the tests marked real_embedder, which depend on semantic similarity
+FAKE_EMBEDDER = bool(os.environ.get("ANNAL_FAKE_EMBEDDER"))
+
+
+class HashEmbedder:
+    """Deterministic stand-in for the model: a unit vector hashed from the text.
+
+    Identical texts get identical vectors and different texts near-orthogonal
+    ones, so exact lookups and deduplication work but similarity means nothing.
+    """
+
+    def __init__(self, dimension: int = 384) -> None:
+        self.dimension = dimension
+
+    def embed(self, text: str) -> list[float]:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        raw = b"".join(hashlib.shake_256(t.encode()).digest(self.dimension) for t in texts)
+        vectors = np.frombuffer(raw, dtype=np.int8).reshape(len(texts), self.dimension).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors.tolist()
+
+
+@lru_cache(maxsize=1)
+def session_embedder():
+    """The embedder tests run against: the shared ONNX model, or HashEmbedder."""
+    return HashEmbedder() if FAKE_EMBEDDER else shared_embedder()
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "real_embedder: needs the ONNX model's semantic similarity"
+    )
+
+
+def pytest_runtest_setup(item):
+    if FAKE_EMBEDDER and item.get_closest_marker("real_embedder"):
+        pytest.skip("needs the real embedding model (ANNAL_FAKE_EMBEDDER is set)")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _fake_pool_embedder():
+    """Hand the server and StorePool the HashEmbedder when ANNAL_FAKE_EMBEDDER is set."""
+    if not FAKE_EMBEDDER:
+        yield
+        return
+    with pytest.MonkeyPatch.context() as m:
+        m.setattr("annal.embedder.shared_embedder", session_embedder)
+        m.setattr("annal.pool.shared_embedder", session_embedder)
+        yield
+
+
+@pytest.fixture(scope="session")
+def embedder():
+    """One ONNX session for every test module (expensive to create)."""
+    return session_embedder()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """Run async tests on uvloop where it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
+
+
+QDRANT_URL = "http://localhost:6333"
+
 
-# Shared embedder instance across all tests (expensive to create)
-_shared_embedder = None
+@lru_cache(maxsize=1)
+def _qdrant_probe():
+    """Connect to the local Qdrant server once per session; None if unavailable.
 
+    This is the same client every QdrantBackend for QDRANT_URL uses.
+    """
+    try:
+        from annal.backends.qdrant import _client_for
+    except ImportError:
+        return None
+    client = _client_for(QDRANT_URL)
+    try:
+        client.get_collections()
+    except Exception:
+        return None
+    return client
 
-def _get_shared_embedder():
-    global _shared_embedder
-    if _shared_embedder is None:
-        _shared_embedder = OnnxEmbedder()
-    return _shared_embedder
+
+def qdrant_available() -> bool:
+    return _qdrant_probe() is not None
+
+
+def qdrant_collection_name() -> str:
+    """A fresh collection name, prefixed by the pytest-xdist worker if any."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    return f"test_{worker}_{uuid.uuid4().hex[:8]}"
+
+
+def _shadowed_tests(path) -> list[str]:
+    """Top-level test functions defined more than once in a module.
+
+    Python keeps only the last definition, so earlier copies would be
+    silently dropped from collection.
+    """
+    tree = ast.parse(Path(path).read_text())
+    names = Counter(
+        node.name for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        and node.name.startswith("test_")
+    )
+    return sorted(name for name, n in names.items() if n > 1)
+
+
+def pytest_collection_modifyitems(config, items):
+    """Reject duplicated tests; under pytest-xdist, group Qdrant modules.
+
+    Run with `-n auto --dist loadgroup`: modules share a collection, so
+    their tests are grouped, while different modules run in parallel.
+    """
+    seen: set[str] = set()
+    for item in items:
+        if item.nodeid in seen:
+            raise pytest.UsageError(f"test collected twice: {item.nodeid}")
+        seen.add(item.nodeid)
+    for path in {item.path for item in items}:
+        if shadowed := _shadowed_tests(path):
+            raise pytest.UsageError(f"{path.name} redefines {', '.join(shadowed)}")
+
+    if not config.pluginmanager.hasplugin("xdist"):
+        return
+    for item in items:
+        if "qdrant" in item.nodeid:
+            item.add_marker(pytest.mark.xdist_group(f"qdrant:{item.module.__name__}"))
+
+
+@pytest.fixture(scope="session")
+def qdrant_client():
+    """The session's shared QdrantClient, for setup and cleanup calls."""
+    return _qdrant_probe()
 
 
 @pytest.fixture
-def tmp_data_dir(tmp_path):
-    """Provide a temporary data directory for ChromaDB."""
-    return str(tmp_path / "annal_data")
+def _test_dir(tmp_path_factory, request):
+    """A per-test directory under the session's temp root.
+
+    Named after the unique node id, so unlike tmp_path it needs no scan
+    of the root for the next free number. Sanitizing can map two ids to
+    one name (``test[a-b]`` and ``test[a_b]``), so a hash of the raw id
+    keeps the names distinct.
+    """
+    nodeid = request.node.nodeid
+    digest = hashlib.blake2b(nodeid.encode(), digest_size=6).hexdigest()
+    name = re.sub(r"\W", "_", nodeid)[-80:]
+    return tmp_path_factory.mktemp(f"{name}_{digest}", numbered=False)
+
+
+@pytest.fixture
+def tmp_data_dir(_test_dir):
+    """Provide a temporary data directory for ChromaDB, closing its client afterwards."""
+    data_dir = str(_test_dir / "annal_data")
+    yield data_dir
+    clear_client(data_dir)
+
+
+@pytest.fixture(scope="session")
+def seeded_store_dir(tmp_path_factory):
+    """A testproj store with three sample memories, embedded once per session."""
+    data_dir = str(tmp_path_factory.mktemp("seed") / "annal_data")
+    store = make_store(data_dir, "testproj")
+    store.store_many([
+        BatchItem("Billing decision about rounding", tags=["decision", "billing"], source="session"),
+        BatchItem("Auth architecture notes", tags=["decision", "auth"], source="design review"),
+    ])
+    store.store_many(
+        [BatchItem("File content from README", tags=["indexed", "docs"], source="file:/tmp/README.md")],
+        chunk_type="file-indexed",
+    )
+    # Closed before it is copied, so every copy starts from a quiescent store
+    clear_client(data_dir)
+    return data_dir
+
+
+@pytest.fixture
+def seeded_data_dir(seeded_store_dir, tmp_data_dir):
+    """A private copy of the seeded store, safe to mutate.
+
+    Files are copied, not hard-linked: SQLite and the HNSW segments are
+    written in place, so a linked copy would leak writes into the seed.
+    """
+    shutil.copytree(seeded_store_dir, tmp_data_dir)
+    return tmp_data_dir
 
 
 @pytest.fixture
-def tmp_config_path(tmp_path):
+def tmp_config_path(_test_dir):
     """Provide a temporary config file path."""
-    return str(tmp_path / "config.yaml")
+    return str(_test_dir / "config.yaml")
+
 
+def make_store(data_dir: str, project: str, fake_embeddings: bool = False) -> MemoryStore:
+    """Factory to create a MemoryStore with ChromaBackend for tests.
 
-def make_store(data_dir: str, project: str) -> MemoryStore:
-    """Factory to create a MemoryStore with ChromaBackend for tests."""
-    embedder = _get_shared_embedder()
+    With fake_embeddings, content is embedded by HashEmbedder instead of
+    the model; only use it where nothing relies on search ranking.
+    """
+    embedder = HashEmbedder() if fake_embeddings else session_embedder()
     backend = ChromaBackend(
         path=data_dir,
         collection_name=f"annal_{project}",
@@ -3,3 +3,185 @@
 Shared conformance tests live in test_backend_conformance.py.
 This file exists for any ChromaDB-specific behavior not covered there.
 """
+
+from annal.backends.chromadb import ChromaBackend, clear_client
+
+
+def test_insert_many_splits_at_max_batch_size(tmp_path):
+    backend = ChromaBackend(path=str(tmp_path / "chroma"), collection_name="test", dimension=3)
+    backend._max_batch = 2
+    backend.insert_many(
+        [f"m{i}" for i in range(5)],
+        [f"text {i}" for i in range(5)],
+        [[1.0, float(i), 0.0] for i in range(5)],
+        [{"tags": [], "created_at": "2026-01-01T00:00:00"} for _ in range(5)],
+    )
+    assert backend.count() == 5
+    assert {r.id for r in backend.get([f"m{i}" for i in range(5)])} == {f"m{i}" for i in range(5)}
+
+
+def test_tags_round_trip_in_either_json_encoding(tmp_path):
+    """Tags written by stdlib json (older rows) and by the fast encoder both load."""
+    import json
+
+    backend = ChromaBackend(path=str(tmp_path / "chroma"), collection_name="test", dimension=3)
+    backend.insert("new", "text", [1.0, 0.0, 0.0], {"tags": ["auth", "café"], "created_at": "2026-01-01T00:00:00"})
+    backend._collection.add(
+        ids=["old"], documents=["text"], embeddings=[[0.0, 1.0, 0.0]],
+        metadatas=[{"tags": json.dumps(["auth", "café"]), "created_at": "2026-01-01T00:00:00"}],
+    )
+    results = {r.id: r for r in backend.get(["new", "old"])}
+    assert results["new"].metadata["tags"] == ["auth", "café"]
+    assert results["old"].metadata["tags"] == ["auth", "café"]
+
+
+def test_rows_with_identical_tags_get_independent_lists(tmp_path):
+    backend = ChromaBackend(path=str(tmp_path / "chroma"), collection_name="test", dimension=3)
+    for doc_id in ("a", "b"):
+        backend.insert(doc_id, "text", [1.0, 0.0, 0.0], {"tags": ["auth"], "created_at": "2026-01-01T00:00:00"})
+    first, second = backend.get(["a", "b"])
+    first.metadata["tags"].append("mutated")
+    assert second.metadata["tags"] == ["auth"]
+    assert backend.get(["a"])[0].metadata["tags"] == ["auth"]
+
+
+def test_query_overfetch_is_bounded(tmp_path):
+    backend = ChromaBackend(path=str(tmp_path / "chroma"), collection_name="test", dimension=3)
+    requested = []
+    real_query = backend._collection.query
+    backend._collection.query = lambda **kw: requested.append(kw["n_results"]) or real_query(**kw)
+
+    post = {"source": {"$prefix": "file:"}}
+    backend.query([1.0, 0.0, 0.0], limit=5)
+    backend.query([1.0, 0.0, 0.0], limit=5, where=post)
+    backend.query([1.0, 0.0, 0.0], limit=100, where=post)
+    backend.query([1.0, 0.0, 0.0], limit=1000, where=post)
+    assert requested == [5, 15, 200, 1000]
+
+
+def test_tag_filter_runs_inside_chroma(tmp_path):
+    """A rare tag is found even when it sits outside any overfetch window."""
+    backend = ChromaBackend(path=str(tmp_path / "chroma"), collection_name="test", dimension=3)
+    backend.insert_many(
+        [f"m{i}" for i in range(30)],
+        [f"text {i}" for i in range(30)],
+        [[1.0, 0.0, float(i)] for i in range(30)],
+        [{"tags": ["rare"] if i == 29 else ["common"], "created_at": "2026-01-01T00:00:00"} for i in range(30)],
+    )
+    chroma_where, post = backend._split_where({"tags": {"$contains_any": ["rare", "missing"]}, "chunk_type": "agent-memory"})
+    assert post == {}
+    assert chroma_where["$and"][1] == {"chunk_type": "agent-memory"}
+
+    results = backend.query([1.0, 0.0, 0.0], limit=1, where={"tags": {"$contains_any": ["rare"]}})
+    assert [r.id for r in results] == ["m29"]
+    assert "tag:rare" not in results[0].metadata
+
+    backend.update_metadata("m29", {"tags": ["common"]})
+    assert backend.query([1.0, 0.0, 0.0], limit=5, where={"tags": {"$contains_any": ["rare"]}}) == []
+    backend.update_metadata_many(["m28", "m29"], {"tags": ["other"]})
+    # Replaced tags' keys are deleted rather than left behind as False
+    stored = backend._collection.get(ids=["m28", "m29"], include=["metadatas"])["metadatas"]
+    assert [sorted(k for k in meta if k.startswith("tag:")) for meta in stored] == [["tag:other"]] * 2
+
+
+def test_tag_keys_are_backfilled_once(tmp_path):
+    path = str(tmp_path / "chroma")
+    backend = ChromaBackend(path=path, collection_name="test", dimension=3)
+    backend._collection.add(
+        ids=["old"], documents=["text"], embeddings=[[1.0, 0.0, 0.0]],
+        metadatas=[{"tags": '["legacy"]', "created_at": "2026-01-01T00:00:00"}],
+    )
+    (tmp_path / "chroma" / "test.derived-keys").unlink()
+
+    reopened = ChromaBackend(path=path, collection_name="test", dimension=3)
+    results = reopened.query([1.0, 0.0, 0.0], limit=5, where={"tags": {"$contains_any": ["legacy"]}})
+    assert [r.id for r in results] == ["old"]
+    results = reopened.query([1.0, 0.0, 0.0], limit=5, where={"created_at": {"$gt": "2025-12-31"}})
+    assert [r.id for r in results] == ["old"]
+
+
+def test_date_range_runs_inside_chroma_on_epoch_ms(tmp_path):
+    backend = ChromaBackend(path=str(tmp_path / "chroma"), collection_name="test", dimension=3)
+    backend.insert("jan", "text", [1.0, 0.0, 0.0], {"tags": [], "created_at": "2026-01-15T12:00:00+00:00"})
+    backend.insert("feb", "text", [1.0, 0.0, 0.0], {"tags": [], "created_at": "2026-02-15T12:00:00+00:00"})
+
+    where = {"created_at": {"$gt": "2026-02-01T00:00:00", "$lt": "2026-03-01T00:00:00"}}
+    chroma_where, post = backend._split_where(where)
+    assert post == {}
+    assert chroma_where["$and"][0] == {"created_at_ms": {"$gt": 1769904000000}}
+
+    results = backend.query([1.0, 0.0, 0.0], limit=5, where=where)
+    assert [r.id for r in results] == ["feb"]
+    assert "created_at_ms" not in results[0].metadata
+    # Bounds that do not parse keep the string post-filter
+    assert backend._split_where({"created_at": {"$gt": "soon"}})[1] == {"created_at": {"$gt": "soon"}}
+
+
+def test_backends_in_one_data_dir_share_a_client(tmp_path):
+    first = ChromaBackend(path=str(tmp_path / "chroma"), collection_name="one", dimension=3)
+    second = ChromaBackend(path=str(tmp_path / "chroma" / "."), collection_name="two", dimension=3)
+    other = ChromaBackend(path=str(tmp_path / "elsewhere"), collection_name="one", dimension=3)
+    assert first._client is second._client
+    assert first._client is not other._client
+
+
+def test_clear_client_drops_the_cached_client(tmp_path):
+    path = str(tmp_path / "chroma")
+    first = ChromaBackend(path=path, collection_name="one", dimension=3)
+    first.insert("a", "text", [1.0, 0.0, 0.0], {"tags": [], "created_at": "2026-01-01T00:00:00"})
+    clear_client(path + "/.")
+    reopened = ChromaBackend(path=path, collection_name="one", dimension=3)
+    assert reopened._client is not first._client
+    assert [r.id for r in reopened.get(["a"])] == ["a"]
+    clear_client(path)
+    clear_client(path)  # clearing an uncached path is a no-op
+
+
+def test_filtered_count_pages_ids(tmp_path):
+    backend = ChromaBackend(path=str(tmp_path / "chroma"), collection_name="test", dimension=3)
+    backend.insert_many(
+        [f"m{i}" for i in range(7)],
+        [f"text {i}" for i in range(7)],
+        [[1.0, float(i), 0.0] for i in range(7)],
+        [{"tags": [], "chunk_type": "file-indexed" if i % 2 else "agent-memory", "created_at": "2026-01-01T00:00:00"} for i in range(7)],
+    )
+    backend._max_batch = 2
+    limits = []
+    real_get = backend._collection.get
+    backend._collection.get = lambda **kw: limits.append(kw.get("limit")) or real_get(**kw)
+
+    assert backend.count(where={"chunk_type": "agent-memory"}) == 4
+    assert limits == [2, 2, 2]
+    _, total = backend.scan(offset=0, limit=10, where={"chunk_type": "file-indexed"})
+    assert total == 3
+
+
+def test_tag_post_filter_matches_by_set_overlap(tmp_path):
+    backend = ChromaBackend(path=str(tmp_path / "chroma"), collection_name="test", dimension=3)
+    _, post = backend._split_where({"tags": {"$contains_any": ["auth", "db"], "$prefix": "x"}})
+    assert post["tags"]["$contains_any"] == frozenset({"auth", "db"})
+    condition = {"tags": {"$contains_any": frozenset({"auth", "db"})}}
+    assert backend._passes_post_filters({"tags": ["ui", "db"]}, condition)
+    assert not backend._passes_post_filters({"tags": ["ui"]}, condition)
+    assert not backend._passes_post_filters({"tags": "db"}, condition)
+
+
+def test_new_collections_use_tuned_hnsw_settings(tmp_path):
+    import chromadb
+
+    path = str(tmp_path / "chroma")
+    chromadb.PersistentClient(path=path).create_collection("legacy", metadata={"hnsw:space": "cosine"})
+
+    hnsw = ChromaBackend(path=path, collection_name="fresh", dimension=3)._collection.configuration_json["hnsw"]
+    assert (hnsw["space"], hnsw["max_neighbors"], hnsw["ef_construction"], hnsw["ef_search"]) == ("cosine", 24, 128, 100)
+    # Existing collections open unchanged
+    legacy = ChromaBackend(path=path, collection_name="legacy", dimension=3)._collection.configuration_json["hnsw"]
+    assert legacy["max_neighbors"] == 16
+
+
+def test_parsed_tags_are_interned(tmp_path):
+    backend = ChromaBackend(path=str(tmp_path / "chroma"), collection_name="test", dimension=3)
+    backend.insert("a", "text", [1.0, 0.0, 0.0], {"tags": ["auth", "db"], "created_at": "2026-01-01T00:00:00"})
+    backend.insert("b", "text", [0.0, 1.0, 0.0], {"tags": ["db"], "created_at": "2026-01-01T00:00:00"})
+    first, second = backend.get(["a", "b"])
+    assert first.metadata["tags"][1] is second.metadata["tags"][0]
@@ -4,30 +4,16 @@ All backends must pass these tests. ChromaDB runs by default;
 Qdrant requires a running server and is skipped unless available.
 """
 
-import uuid
-
 import pytest
 
-from annal.embedder import OnnxEmbedder
 from annal.backends.chromadb import ChromaBackend
 
+from tests.conftest import QDRANT_URL, qdrant_available, qdrant_collection_name
+
 try:
-    from qdrant_client import QdrantClient
     from annal.backends.qdrant import QdrantBackend
-
-    def _qdrant_available():
-        try:
-            QdrantClient(url="http://localhost:6333").get_collections()
-            return True
-        except Exception:
-            return False
 except ImportError:
-    _qdrant_available = lambda: False
-
-
-@pytest.fixture(scope="module")
-def embedder():
-    return OnnxEmbedder()
+    pass
 
 
 @pytest.fixture
@@ -39,26 +25,40 @@ def chromadb_backend(tmp_path, embedder):
     )
 
 
-@pytest.fixture
-def qdrant_backend(embedder):
-    collection = f"test_{uuid.uuid4().hex[:8]}"
+@pytest.fixture(scope="module")
+def qdrant_module_backend(embedder, qdrant_client):
+    """One collection per module; creating one per test dominated the run time."""
+    collection = qdrant_collection_name()
     b = QdrantBackend(
-        url="http://localhost:6333",
+        url=QDRANT_URL,
         collection_name=collection,
         dimension=embedder.dimension,
     )
     yield b
     try:
-        QdrantClient(url="http://localhost:6333").delete_collection(collection)
+        qdrant_client.delete_collection(collection)
     except Exception:
         pass
 
 
+@pytest.fixture
+def qdrant_backend(qdrant_module_backend, qdrant_client):
+    yield qdrant_module_backend
+    # Empty the shared collection so every test starts from zero points
+    from qdrant_client.models import Filter, FilterSelector
+
+    qdrant_client.delete(
+        collection_name=qdrant_module_backend._collection,
+        points_selector=FilterSelector(filter=Filter()),
+        wait=True,
+    )
+
+
 @pytest.fixture(
     params=[
         "chromadb",
         pytest.param("qdrant", marks=pytest.mark.skipif(
-            not _qdrant_available(), reason="Qdrant not available"
+            not qdrant_available(), reason="Qdrant not available"
         )),
     ]
 )
@@ -66,6 +66,12 @@ def backend(request):
     return request.getfixturevalue(f"{request.param}_backend")
 
 
+def _bulk_insert(backend, embedder, rows: list[tuple[str, str, dict]]) -> None:
+    """Insert (id, text, metadata) rows with one embedding call and one backend call."""
+    texts = [text for _, text, _ in rows]
+    backend.insert_many([doc_id for doc_id, _, _ in rows], texts, embedder.embed_batch(texts), [meta for _, _, meta in rows])
+
+
 # --- Shared conformance tests ---
 
 
@@ -94,23 +100,50 @@ def test_insert_and_get(backend, embedder):
     assert results[0].metadata["tags"] == ["test"]
 
 
+def test_insert_many(backend, embedder):
+    texts = ["first memory", "second memory", "third memory"]
+    backend.insert_many(
+        [f"m{i}" for i in range(3)],
+        texts,
+        embedder.embed_batch(texts),
+        [{"tags": [f"t{i}"], "created_at": "2026-01-01T00:00:00"} for i in range(3)],
+    )
+    assert backend.count() == 3
+    results = {r.id: r for r in backend.get(["m0", "m1", "m2"])}
+    assert results["m1"].text == "second memory"
+    assert results["m2"].metadata["tags"] == ["t2"]
+
+
+def test_insert_many_empty(backend):
+    backend.insert_many([], [], [], [])
+    assert backend.count() == 0
+
+
 def test_get_empty(backend):
     results = backend.get(["nonexistent"])
     assert len(results) == 0
 
 
+def test_exists(backend, embedder):
+    backend.insert("m1", "test", embedder.embed("test"), {"tags": [], "created_at": "2026-01-01T00:00:00"})
+    assert backend.exists(["m1", "nonexistent"]) == {"m1"}
+
+
 def test_scan(backend, embedder):
-    for i in range(5):
-        emb = embedder.embed(f"memory {i}")
-        backend.insert(f"m{i}", f"memory {i}", emb, {"tags": ["test"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"})
+    _bulk_insert(backend, embedder, [
+        (f"m{i}", f"memory {i}", {"tags": ["test"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"})
+        for i in range(5)
+    ])
     results, total = backend.scan(offset=0, limit=3)
     assert len(results) == 3
     assert total == 5
 
 
 def test_scan_with_where(backend, embedder):
-    backend.insert("m1", "agent mem", embedder.embed("agent mem"), {"tags": ["a"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"})
-    backend.insert("m2", "file chunk", embedder.embed("file chunk"), {"tags": ["b"], "chunk_type": "file-indexed", "created_at": "2026-01-01T00:00:00"})
+    _bulk_insert(backend, embedder, [
+        ("m1", "agent mem", {"tags": ["a"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"}),
+        ("m2", "file chunk", {"tags": ["b"], "chunk_type": "file-indexed", "created_at": "2026-01-01T00:00:00"}),
+    ])
     results, total = backend.scan(offset=0, limit=10, where={"chunk_type": "agent-memory"})
     assert total == 1
     assert results[0].id == "m1"
@@ -123,8 +156,10 @@ def test_count(backend, embedder):
 
 
 def test_count_with_where(backend, embedder):
-    backend.insert("m1", "a", embedder.embed("a"), {"tags": [], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"})
-    backend.insert("m2", "b", embedder.embed("b"), {"tags": [], "chunk_type": "file-indexed", "created_at": "2026-01-01T00:00:00"})
+    _bulk_insert(backend, embedder, [
+        ("m1", "a", {"tags": [], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"}),
+        ("m2", "b", {"tags": [], "chunk_type": "file-indexed", "created_at": "2026-01-01T00:00:00"}),
+    ])
     assert backend.count(where={"chunk_type": "agent-memory"}) == 1
 
 
@@ -153,49 +188,99 @@ def test_update_metadata_only(backend, embedder):
     assert results[0].metadata["tags"] == ["new"]
 
 
+def test_update_metadata_merges_keys(backend, embedder):
+    emb = embedder.embed("content stays")
+    backend.insert("m1", "content stays", emb, {"tags": ["old"], "source": "s", "created_at": "2026-01-01T00:00:00"})
+    backend.update_metadata("m1", {"tags": ["new"], "hit_count": 1})
+    results = backend.get(["m1"])
+    assert results[0].text == "content stays"
+    assert results[0].metadata["tags"] == ["new"]
+    assert results[0].metadata["hit_count"] == 1
+    assert results[0].metadata["source"] == "s"
+    assert results[0].metadata["created_at"] == "2026-01-01T00:00:00"
+
+
+def test_update_metadata_many_merges_keys_into_each(backend, embedder):
+    _bulk_insert(backend, embedder, [
+        ("m1", "first", {"tags": ["old"], "source": "a", "created_at": "2026-01-01T00:00:00"}),
+        ("m2", "second", {"tags": ["old", "keep"], "source": "b", "created_at": "2026-01-01T00:00:00"}),
+        ("m3", "untouched", {"tags": ["old"], "source": "c", "created_at": "2026-01-01T00:00:00"}),
+    ])
+    backend.update_metadata_many(["m1", "m2"], {"file_mtime": 42.0})
+    backend.update_metadata_many(["m1", "m2"], {"tags": ["new"]})
+
+    by_id = {r.id: r.metadata for r in backend.get(["m1", "m2", "m3"])}
+    assert by_id["m1"]["file_mtime"] == by_id["m2"]["file_mtime"] == 42.0
+    assert by_id["m1"]["source"] == "a" and by_id["m2"]["source"] == "b"
+    assert by_id["m1"]["tags"] == by_id["m2"]["tags"] == ["new"]
+    assert "file_mtime" not in by_id["m3"]
+    assert backend.count(where={"tags": {"$contains_any": ["old"]}}) == 1
+
+
 def test_query_with_tag_filter(backend, embedder):
-    backend.insert("m1", "auth stuff", embedder.embed("auth stuff"), {"tags": ["auth", "decision"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"})
-    backend.insert("m2", "frontend stuff", embedder.embed("frontend stuff"), {"tags": ["frontend"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"})
+    _bulk_insert(backend, embedder, [
+        ("m1", "auth stuff", {"tags": ["auth", "decision"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"}),
+        ("m2", "frontend stuff", {"tags": ["frontend"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"}),
+    ])
     results = backend.query(embedder.embed("stuff"), limit=10, where={"tags": {"$contains_any": ["auth"]}})
     assert len(results) == 1
     assert results[0].id == "m1"
 
 
+def test_query_without_text(backend, embedder):
+    backend.insert("m1", "auth stuff", embedder.embed("auth stuff"), {"tags": ["auth"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"})
+    results = backend.query(embedder.embed("auth stuff"), limit=10, with_text=False)
+    assert [r.id for r in results] == ["m1"]
+    assert results[0].text == ""
+    assert results[0].metadata["tags"] == ["auth"]
+    assert results[0].distance is not None
+
+
 def test_query_with_source_prefix(backend, embedder):
-    backend.insert("m1", "file content", embedder.embed("file content"), {"tags": [], "source": "file:/home/user/project/README.md|intro", "created_at": "2026-01-01T00:00:00"})
-    backend.insert("m2", "other content", embedder.embed("other content"), {"tags": [], "source": "file:/home/user/other/file.md", "created_at": "2026-01-01T00:00:00"})
+    _bulk_insert(backend, embedder, [
+        ("m1", "file content", {"tags": [], "source": "file:/home/user/project/README.md|intro", "created_at": "2026-01-01T00:00:00"}),
+        ("m2", "other content", {"tags": [], "source": "file:/home/user/other/file.md", "created_at": "2026-01-01T00:00:00"}),
+    ])
     results = backend.query(embedder.embed("content"), limit=10, where={"source": {"$prefix": "file:/home/user/project"}})
     assert len(results) == 1
     assert results[0].id == "m1"
 
 
 def test_query_with_date_range(backend, embedder):
-    backend.insert("m1", "old", embedder.embed("old"), {"tags": [], "created_at": "2026-01-01T00:00:00"})
-    backend.insert("m2", "new", embedder.embed("new"), {"tags": [], "created_at": "2026-02-15T00:00:00"})
+    _bulk_insert(backend, embedder, [
+        ("m1", "old", {"tags": [], "created_at": "2026-01-01T00:00:00"}),
+        ("m2", "new", {"tags": [], "created_at": "2026-02-15T00:00:00"}),
+    ])
     results = backend.query(embedder.embed("content"), limit=10, where={"created_at": {"$gt": "2026-02-01T00:00:00"}})
     assert len(results) == 1
     assert results[0].id == "m2"
 
 
 def test_scan_with_source_prefix(backend, embedder):
-    backend.insert("m1", "file a", embedder.embed("file a"), {"tags": [], "source": "file:/project/a.md", "created_at": "2026-01-01T00:00:00"})
-    backend.insert("m2", "file b", embedder.embed("file b"), {"tags": [], "source": "file:/other/b.md", "created_at": "2026-01-01T00:00:00"})
+    _bulk_insert(backend, embedder, [
+        ("m1", "file a", {"tags": [], "source": "file:/project/a.md", "created_at": "2026-01-01T00:00:00"}),
+        ("m2", "file b", {"tags": [], "source": "file:/other/b.md", "created_at": "2026-01-01T00:00:00"}),
+    ])
     results, total = backend.scan(offset=0, limit=10, where={"source": {"$prefix": "file:/project"}})
     assert total == 1
     assert results[0].id == "m1"
 
 
 def test_scan_with_tag_filter(backend, embedder):
-    backend.insert("m1", "tagged", embedder.embed("tagged"), {"tags": ["auth"], "created_at": "2026-01-01T00:00:00"})
-    backend.insert("m2", "untagged", embedder.embed("untagged"), {"tags": ["other"], "created_at": "2026-01-01T00:00:00"})
+    _bulk_insert(backend, embedder, [
+        ("m1", "tagged", {"tags": ["auth"], "created_at": "2026-01-01T00:00:00"}),
+        ("m2", "untagged", {"tags": ["other"], "created_at": "2026-01-01T00:00:00"}),
+    ])
     results, total = backend.scan(offset=0, limit=10, where={"tags": {"$contains_any": ["auth"]}})
     assert total == 1
     assert results[0].id == "m1"
 
 
 def test_query_not_exists_excludes_records_with_field(backend, embedder):
-    backend.insert("m1", "superseded", embedder.embed("superseded"), {"tags": [], "superseded_by": "m2", "created_at": "2026-01-01T00:00:00"})
-    backend.insert("m2", "current", embedder.embed("current"), {"tags": [], "created_at": "2026-01-01T00:00:00"})
+    _bulk_insert(backend, embedder, [
+        ("m1", "superseded", {"tags": [], "superseded_by": "m2", "created_at": "2026-01-01T00:00:00"}),
+        ("m2", "current", {"tags": [], "created_at": "2026-01-01T00:00:00"}),
+    ])
     results = backend.query(embedder.embed("memory"), limit=10, where={"superseded_by": {"$not_exists": True}})
     assert len(results) == 1
     assert results[0].id == "m2"
@@ -203,11 +288,10 @@ def test_query_not_exists_excludes_records_with_field(backend, embedder):
 
 def test_query_large_limit_with_post_filter_respects_limit(backend, embedder):
     """A large limit with post-filters should still return correct results capped at limit."""
-    for i in range(10):
-        backend.insert(
-            f"m{i}", f"memory {i}", embedder.embed(f"memory {i}"),
-            {"tags": ["keep"] if i < 5 else ["skip"], "created_at": "2026-01-01T00:00:00"},
-        )
+    _bulk_insert(backend, embedder, [
+        (f"m{i}", f"memory {i}", {"tags": ["keep"] if i < 5 else ["skip"], "created_at": "2026-01-01T00:00:00"})
+        for i in range(10)
+    ])
     # Request limit=3 with a tag post-filter — should get at most 3 matching results
     results = backend.query(
         embedder.embed("memory"), limit=3,
@@ -233,8 +317,23 @@ def test_query_large_limit_with_post_filter_caps_overfetch(backend, embedder):
 
 
 def test_scan_not_exists_excludes_records_with_field(backend, embedder):
-    backend.insert("m1", "superseded", embedder.embed("superseded"), {"tags": [], "superseded_by": "m2", "created_at": "2026-01-01T00:00:00"})
-    backend.insert("m2", "current", embedder.embed("current"), {"tags": [], "created_at": "2026-01-01T00:00:00"})
+    _bulk_insert(backend, embedder, [
+        ("m1", "superseded", {"tags": [], "superseded_by": "m2", "created_at": "2026-01-01T00:00:00"}),
+        ("m2", "current", {"tags": [], "created_at": "2026-01-01T00:00:00"}),
+    ])
     results, total = backend.scan(offset=0, limit=10, where={"superseded_by": {"$not_exists": True}})
     assert total == 1
     assert results[0].id == "m2"
+
+
+def test_iter_metadata_with_filters(backend, embedder):
+    _bulk_insert(backend, embedder, [
+        ("m1", "file a", {"tags": ["x"], "chunk_type": "file-indexed", "source": "file:/p/a.md", "created_at": "2026-01-01T00:00:00"}),
+        ("m2", "file b", {"tags": ["y"], "chunk_type": "file-indexed", "source": "file:/q/b.md", "created_at": "2026-01-01T00:00:00"}),
+        ("m3", "memory", {"tags": ["x"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"}),
+    ])
+    assert {doc_id for doc_id, _ in backend.iter_metadata()} == {"m1", "m2", "m3"}
+    rows = dict(backend.iter_metadata(where={"chunk_type": "file-indexed", "source": {"$prefix": "file:/p/"}}))
+    assert list(rows) == ["m1"]
+    assert rows["m1"]["tags"] == ["x"]
+    assert "text" not in rows["m1"]
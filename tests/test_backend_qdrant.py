@@ -4,50 +4,51 @@ Shared conformance tests live in test_backend_conformance.py.
 This file contains tests for Qdrant-only features (hybrid search).
 """
 
-import uuid
-
 import pytest
 
+from tests.conftest import QDRANT_URL, qdrant_available, qdrant_collection_name
+
 try:
-    from qdrant_client import QdrantClient
     from annal.backends.qdrant import QdrantBackend
-    from annal.embedder import OnnxEmbedder
-
-    def _qdrant_available():
-        try:
-            QdrantClient(url="http://localhost:6333").get_collections()
-            return True
-        except Exception:
-            return False
 except ImportError:
-    _qdrant_available = lambda: False
-
-pytestmark = pytest.mark.skipif(not _qdrant_available(), reason="Qdrant not available")
-
+    pass
 
-@pytest.fixture(scope="module")
-def embedder():
-    return OnnxEmbedder()
+pytestmark = pytest.mark.skipif(not qdrant_available(), reason="Qdrant not available")
 
 
-def test_hybrid_search_boosts_keyword_match(embedder):
+def test_hybrid_search_boosts_keyword_match(embedder, qdrant_client):
     """BM25 hybrid search should boost documents containing the exact query term."""
-    collection = f"test_{uuid.uuid4().hex[:8]}"
+    collection = qdrant_collection_name()
     b = QdrantBackend(
-        url="http://localhost:6333",
+        url=QDRANT_URL,
         collection_name=collection,
         dimension=embedder.dimension,
         hybrid=True,
     )
     try:
-        b.insert("m1", "The HNSW algorithm uses hierarchical navigable small world graphs",
-                 embedder.embed("The HNSW algorithm uses hierarchical navigable small world graphs"),
-                 {"tags": ["tech"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"})
-        b.insert("m2", "We decided to use PostgreSQL for the user database",
-                 embedder.embed("We decided to use PostgreSQL for the user database"),
-                 {"tags": ["tech"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"})
+        texts = [
+            "The HNSW algorithm uses hierarchical navigable small world graphs",
+            "We decided to use PostgreSQL for the user database",
+        ]
+        b.insert_many(
+            ["m1", "m2"], texts, embedder.embed_batch(texts),
+            [{"tags": ["tech"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"}] * 2,
+        )
 
         results = b.query(embedder.embed("HNSW"), limit=5, query_text="HNSW")
         assert results[0].id == "m1"
     finally:
-        QdrantClient(url="http://localhost:6333").delete_collection(collection)
+        qdrant_client.delete_collection(collection)
+
+
+def test_backends_for_one_server_share_a_client(embedder, qdrant_client):
+    names = [qdrant_collection_name() for _ in range(2)]
+    try:
+        first, second = (
+            QdrantBackend(url=QDRANT_URL, collection_name=name, dimension=embedder.dimension)
+            for name in names
+        )
+        assert first._client is second._client is qdrant_client
+    finally:
+        for name in names:
+            qdrant_client.delete_collection(name)
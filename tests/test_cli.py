@@ -1,6 +1,7 @@
 """Tests for the annal install/uninstall CLI."""
 
 import json
+import shutil
 from pathlib import Path
 from unittest.mock import patch
 
@@ -9,10 +10,7 @@ import pytest
 from annal.cli import install, uninstall
 
 
-@pytest.fixture
-def fake_home(tmp_path):
-    """Set up a fake home directory with expected client config dirs."""
-    home = tmp_path / "home"
+def _make_fake_home(home: Path) -> Path:
     home.mkdir()
     (home / ".claude").mkdir()
     (home / ".codex").mkdir()
@@ -26,19 +24,37 @@ def fake_home(tmp_path):
     return home
 
 
-def test_install_creates_config(fake_home):
-    with patch("annal.cli.Path.home", return_value=fake_home):
+@pytest.fixture(scope="session")
+def fake_home_template(tmp_path_factory):
+    """The fake home skeleton, built once and copied for each test."""
+    return _make_fake_home(tmp_path_factory.mktemp("template") / "home")
+
+
+@pytest.fixture
+def fake_home(tmp_path, fake_home_template):
+    """Set up a fake home directory with expected client config dirs."""
+    # Real copies, not hard links: install() rewrites some files in place
+    return Path(shutil.copytree(fake_home_template, tmp_path / "home"))
+
+
+@pytest.fixture(scope="module")
+def installed_home(tmp_path_factory, fake_home_template):
+    """One fresh install shared by the tests that only inspect its output."""
+    home = Path(shutil.copytree(fake_home_template, tmp_path_factory.mktemp("installed") / "home"))
+    with patch("annal.cli.Path.home", return_value=home):
         result = install(start_service=False)
+    return home, result
+
 
+def test_install_creates_config(installed_home):
+    fake_home, result = installed_home
     assert "config.yaml" in result
     config_path = fake_home / ".annal" / "config.yaml"
     assert config_path.exists()
 
 
-def test_install_creates_mcp_json(fake_home):
-    with patch("annal.cli.Path.home", return_value=fake_home):
-        install(start_service=False)
-
+def test_install_creates_mcp_json(installed_home):
+    fake_home, _ = installed_home
     mcp_json = fake_home / ".mcp.json"
     assert mcp_json.exists()
     data = json.loads(mcp_json.read_text())
@@ -46,19 +62,15 @@ def test_install_creates_mcp_json(fake_home):
     assert data["mcpServers"]["annal"]["url"] == "http://localhost:9200/mcp"
 
 
-def test_install_configures_codex(fake_home):
-    with patch("annal.cli.Path.home", return_value=fake_home):
-        install(start_service=False)
-
+def test_install_configures_codex(installed_home):
+    fake_home, _ = installed_home
     config = (fake_home / ".codex" / "config.toml").read_text()
     assert "[mcp_servers.annal]" in config
     assert "http://127.0.0.1:9200/mcp" in config
 
 
-def test_install_configures_gemini(fake_home):
-    with patch("annal.cli.Path.home", return_value=fake_home):
-        install(start_service=False)
-
+def test_install_configures_gemini(installed_home):
+    fake_home, _ = installed_home
     data = json.loads((fake_home / ".gemini" / "settings.json").read_text())
     assert "annal" in data["mcpServers"]
 
@@ -90,6 +102,12 @@ def test_install_idempotent(fake_home):
     codex = (fake_home / ".codex" / "config.toml").read_text()
     assert codex.count("[mcp_servers.annal]") == 1
 
+    # Nor should the commit hook be registered twice
+    settings = json.loads((fake_home / ".claude" / "settings.json").read_text())
+    post_hooks = settings["hooks"]["PostToolUse"]
+    annal_hooks = [e for e in post_hooks if "annal-commit-reminder" in json.dumps(e)]
+    assert len(annal_hooks) == 1
+
 
 def test_annal_executable_returns_list():
     """_annal_executable should return a list of strings, not a single string."""
@@ -114,7 +132,6 @@ def test_install_adds_agent_instructions_to_claude_md(fake_home):
 
 def test_install_creates_claude_md_if_missing(fake_home):
     # Remove the .claude dir created by fixture
-    import shutil
     shutil.rmtree(fake_home / ".claude", ignore_errors=True)
     with patch("annal.cli.Path.home", return_value=fake_home):
         result = install(start_service=False)
@@ -148,10 +165,8 @@ def test_uninstall_removes_agent_instructions(fake_home):
     assert "# Keep this" in content
 
 
-def test_install_creates_commit_hook(fake_home):
-    with patch("annal.cli.Path.home", return_value=fake_home):
-        result = install(start_service=False)
-
+def test_install_creates_commit_hook(installed_home):
+    fake_home, result = installed_home
     assert "post-commit reminder hook" in result
     hook = fake_home / ".claude" / "hooks" / "annal-commit-reminder.sh"
     assert hook.exists()
@@ -162,17 +177,6 @@ def test_install_creates_commit_hook(fake_home):
     assert any("annal-commit-reminder" in json.dumps(e) for e in post_hooks)
 
 
-def test_install_commit_hook_idempotent(fake_home):
-    with patch("annal.cli.Path.home", return_value=fake_home):
-        install(start_service=False)
-        install(start_service=False)
-
-    settings = json.loads((fake_home / ".claude" / "settings.json").read_text())
-    post_hooks = settings["hooks"]["PostToolUse"]
-    annal_hooks = [e for e in post_hooks if "annal-commit-reminder" in json.dumps(e)]
-    assert len(annal_hooks) == 1
-
-
 def test_install_preserves_existing_settings(fake_home):
     """Install should not clobber existing hooks in settings.json."""
     (fake_home / ".claude").mkdir(exist_ok=True)
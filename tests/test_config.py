@@ -3,6 +3,12 @@ import yaml
 import pytest
 from annal.config import AnnalConfig, ProjectConfig
 
+# libyaml when available, like annal.config itself
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
 
 def test_load_config_creates_default_when_missing(tmp_config_path):
     config = AnnalConfig.load(tmp_config_path)
@@ -23,7 +29,7 @@ def test_load_config_reads_existing(tmp_config_path):
     }
     os.makedirs(os.path.dirname(tmp_config_path), exist_ok=True)
     with open(tmp_config_path, "w") as f:
-        yaml.dump(raw, f)
+        yaml.dump(raw, f, Dumper=SafeDumper)
 
     config = AnnalConfig.load(tmp_config_path)
     assert config.data_dir == "/tmp/annal_test"
@@ -44,20 +50,93 @@ def test_save_config(tmp_config_path):
     config.save()
 
     with open(tmp_config_path) as f:
-        raw = yaml.safe_load(f)
+        raw = yaml.load(f, Loader=SafeLoader)
     assert raw["data_dir"] == "/tmp/test_data"
     assert "testproj" in raw["projects"]
 
 
+def test_load_returns_independent_copies(tmp_config_path):
+    """Cached loads must not share mutable state between callers."""
+    config = AnnalConfig(config_path=tmp_config_path)
+    config.add_project("proj", watch_paths=["/home/user/proj"])
+    config.save()
+
+    first = AnnalConfig.load(tmp_config_path)
+    first.projects["proj"].watch_paths.append("/elsewhere")
+    second = AnnalConfig.load(tmp_config_path)
+    assert second.projects["proj"].watch_paths == ["/home/user/proj"]
+
+
+def test_load_sees_changes_after_save(tmp_config_path):
+    config = AnnalConfig(config_path=tmp_config_path)
+    config.save()
+    assert AnnalConfig.load(tmp_config_path).projects == {}
+
+    config.add_project("later", watch_paths=["/home/user/later"])
+    config.save()
+    assert "later" in AnnalConfig.load(tmp_config_path).projects
+
+
+def test_save_skips_unchanged_file(tmp_config_path):
+    config = AnnalConfig(config_path=tmp_config_path)
+    config.add_project("proj", watch_paths=["/home/user/proj"])
+    config.save()
+    first = os.stat(tmp_config_path).st_mtime_ns
+
+    os.utime(tmp_config_path, ns=(first - 10**9, first - 10**9))
+    config.save()
+    assert os.stat(tmp_config_path).st_mtime_ns == first - 10**9
+
+    config.add_project("other", watch_paths=["/home/user/other"])
+    config.save()
+    assert "other" in AnnalConfig.load(tmp_config_path).projects
+
+
+def test_load_uses_json_sidecar_until_yaml_changes(tmp_config_path, monkeypatch):
+    from annal import config as config_module
+
+    config = AnnalConfig(config_path=tmp_config_path)
+    config.add_project("proj", watch_paths=["/home/user/proj"])
+    config.save()
+    assert os.path.exists(tmp_config_path.replace(".yaml", ".json.cache"))
+
+    # A fresh process has an empty in-memory cache but must not need YAML
+    config_module._load_raw.cache_clear()
+    with monkeypatch.context() as m:
+        m.setattr(config_module.yaml, "load", lambda *a, **k: pytest.fail("parsed YAML"))
+        assert AnnalConfig.load(tmp_config_path).projects["proj"].watch_paths == ["/home/user/proj"]
+
+    # Hand edits to the YAML file invalidate the sidecar
+    with open(tmp_config_path, "w") as f:
+        yaml.dump({"projects": {"edited": {"watch_paths": ["/x"]}}}, f, Dumper=SafeDumper)
+    config_module._load_raw.cache_clear()
+    assert list(AnnalConfig.load(tmp_config_path).projects) == ["edited"]
+
+
 def test_add_project(tmp_config_path):
     config = AnnalConfig.load(tmp_config_path)
     config.add_project("newproj", watch_paths=["/home/user/newproj"])
     assert "newproj" in config.projects
-    assert config.projects["newproj"].watch_patterns == [
+    assert list(config.projects["newproj"].watch_patterns) == [
         "**/*.md", "**/*.yaml", "**/*.toml", "**/*.json"
     ]
 
 
+def test_default_patterns_are_shared_and_saved_as_lists(tmp_config_path):
+    from annal.config import DEFAULT_WATCH_EXCLUDE, DEFAULT_WATCH_PATTERNS
+
+    config = AnnalConfig(config_path=tmp_config_path)
+    first = config.add_project("first", watch_paths=["/a"])
+    second = config.add_project("second", watch_paths=["/b"])
+    assert first.watch_patterns is second.watch_patterns is DEFAULT_WATCH_PATTERNS
+    assert first.watch_exclude is DEFAULT_WATCH_EXCLUDE
+    config.save()
+
+    with open(tmp_config_path) as f:
+        raw = yaml.load(f, Loader=SafeLoader)
+    assert raw["projects"]["first"]["watch_patterns"] == list(DEFAULT_WATCH_PATTERNS)
+
+
 def test_get_project_raises_for_unknown(tmp_config_path):
     config = AnnalConfig.load(tmp_config_path)
     with pytest.raises(KeyError):
@@ -72,7 +151,7 @@ def test_load_config_with_port(tmp_config_path):
     }
     os.makedirs(os.path.dirname(tmp_config_path), exist_ok=True)
     with open(tmp_config_path, "w") as f:
-        yaml.dump(raw, f)
+        yaml.dump(raw, f, Dumper=SafeDumper)
 
     config = AnnalConfig.load(tmp_config_path)
     assert config.port == 9300
@@ -101,7 +180,7 @@ def test_add_project_updates_existing_patterns(tmp_config_path):
     config.add_project("proj", watch_paths=["/tmp/proj"])
     # Defaults should be applied on creation
     from annal.config import DEFAULT_WATCH_EXCLUDE
-    assert config.projects["proj"].watch_exclude == list(DEFAULT_WATCH_EXCLUDE)
+    assert config.projects["proj"].watch_exclude == DEFAULT_WATCH_EXCLUDE
 
     # Now update just the excludes
     config.add_project("proj", watch_exclude=["**/custom_vendor/**"])
@@ -1,85 +1,66 @@
+import shutil
+
 import pytest
 from starlette.testclient import TestClient
 
+from annal.backends.chromadb import clear_client
 from annal.config import AnnalConfig, ProjectConfig
 from annal.dashboard import create_dashboard_app
 from annal.events import event_bus, Event
 from annal.pool import StorePool
 
 
-@pytest.fixture
-def dashboard_client(tmp_data_dir, tmp_config_path):
+def _seeded_dashboard(data_dir, config_path):
     config = AnnalConfig(
-        config_path=tmp_config_path,
-        data_dir=tmp_data_dir,
+        config_path=config_path,
+        data_dir=data_dir,
         projects={"testproj": ProjectConfig()},
     )
     config.save()
     pool = StorePool(config)
-    store = pool.get_store("testproj")
-    store.store(
-        "Billing decision about rounding",
-        tags=["decision", "billing"],
-        source="session",
-    )
-    store.store(
-        "Auth architecture notes",
-        tags=["decision", "auth"],
-        source="design review",
-    )
-    store.store(
-        "File content from README",
-        tags=["indexed", "docs"],
-        source="file:/tmp/README.md",
-        chunk_type="file-indexed",
-    )
     app = create_dashboard_app(pool, config)
-    return TestClient(app)
+    return TestClient(app), pool
 
 
 @pytest.fixture
-def empty_dashboard_client(tmp_data_dir, tmp_config_path):
-    """Dashboard with no projects configured."""
-    config = AnnalConfig(
-        config_path=tmp_config_path,
-        data_dir=tmp_data_dir,
-        projects={},
-    )
-    config.save()
-    pool = StorePool(config)
-    app = create_dashboard_app(pool, config)
-    return TestClient(app)
+def dashboard_with_pool(seeded_data_dir, tmp_config_path):
+    """Return both the TestClient and the StorePool for tests that need store access."""
+    client, pool = _seeded_dashboard(seeded_data_dir, tmp_config_path)
+    with client:
+        yield client, pool
 
 
-@pytest.fixture
-def dashboard_with_pool(tmp_data_dir, tmp_config_path):
-    """Return both the TestClient and the StorePool for tests that need store access."""
+@pytest.fixture(scope="module")
+def dashboard_client(seeded_store_dir, tmp_path_factory):
+    """One client and pool for the read-only page tests; nothing here mutates the store.
+
+    Entered as a context manager so all requests share one event loop
+    portal instead of starting a new one per request.
+    """
+    root = tmp_path_factory.mktemp("dashboard")
+    data_dir = str(root / "annal_data")
+    shutil.copytree(seeded_store_dir, data_dir)
+    client, _ = _seeded_dashboard(data_dir, str(root / "config.yaml"))
+    with client:
+        yield client
+    clear_client(data_dir)
+
+
+@pytest.fixture(scope="module")
+def empty_dashboard_client(tmp_path_factory):
+    """Dashboard with no projects configured."""
+    root = tmp_path_factory.mktemp("empty_dashboard")
     config = AnnalConfig(
-        config_path=tmp_config_path,
-        data_dir=tmp_data_dir,
-        projects={"testproj": ProjectConfig()},
+        config_path=str(root / "config.yaml"),
+        data_dir=str(root / "annal_data"),
+        projects={},
     )
     config.save()
     pool = StorePool(config)
-    store = pool.get_store("testproj")
-    store.store(
-        "Billing decision about rounding",
-        tags=["decision", "billing"],
-        source="session",
-    )
-    store.store(
-        "Auth architecture notes",
-        tags=["decision", "auth"],
-        source="design review",
-    )
-    store.store(
-        "File content from README",
-        tags=["indexed", "docs"],
-        source="file:/tmp/README.md",
-        chunk_type="file-indexed",
-    )
     app = create_dashboard_app(pool, config)
-    return TestClient(app), pool
+    with TestClient(app) as client:
+        yield client
+    clear_client(config.data_dir)
 
 
 def test_projects_page_with_data(dashboard_client):
@@ -134,27 +115,24 @@ def test_delete_single_memory(dashboard_with_pool):
     client, pool = dashboard_with_pool
     store = pool.get_store("testproj")
 
-    # Get all memories to find an ID to delete
-    memories, _ = store.browse()
-    target = next(m for m in memories if "Billing" in m["content"])
+    # Look up the billing memory by tag rather than scanning everything
+    (target,), _ = store.browse(tags=["billing"])
     target_id = target["id"]
 
     response = client.request("DELETE", f"/memories/{target_id}?project=testproj")
     assert response.status_code == 200
 
     # Verify the memory is actually gone from the store
-    remaining, total = store.browse()
-    remaining_ids = {m["id"] for m in remaining}
-    assert target_id not in remaining_ids
-    assert total == 2
+    assert store.exists_many([target_id]) == {target_id: False}
+    assert store.count() == 2
 
 
 def test_bulk_delete(dashboard_with_pool):
     client, pool = dashboard_with_pool
     store = pool.get_store("testproj")
 
-    memories, _ = store.browse()
-    ids_to_delete = [m["id"] for m in memories[:2]]
+    memories, _ = store.browse(limit=2)
+    ids_to_delete = [m["id"] for m in memories]
 
     response = client.post(
         "/memories/bulk-delete",
@@ -163,11 +141,8 @@ def test_bulk_delete(dashboard_with_pool):
     assert response.status_code == 200
 
     # Verify the memories are actually gone
-    remaining, total = store.browse()
-    remaining_ids = {m["id"] for m in remaining}
-    for deleted_id in ids_to_delete:
-        assert deleted_id not in remaining_ids
-    assert total == 1
+    assert not any(store.exists_many(ids_to_delete).values())
+    assert store.count() == 1
 
 
 def test_search(dashboard_with_pool):
@@ -204,87 +179,77 @@ def test_bulk_delete_filter(dashboard_with_pool):
         assert m["chunk_type"] == "agent-memory"
 
 
-def test_sse_endpoint_streams_events(dashboard_client):
+@pytest.mark.asyncio
+async def test_sse_endpoint_streams_events(dashboard_client, monkeypatch):
     """The /events SSE endpoint should stream events with correct format."""
-    import threading
-
-    import httpx
-    import uvicorn
-
-    # Use a real HTTP server to test the SSE endpoint, since the httpx
-    # ASGI transport buffers the full response and can't handle infinite streams.
-    app = dashboard_client.app
-
-    uv_config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning")
-    server = uvicorn.Server(uv_config)
-
-    server_started = threading.Event()
-    original_startup = server.startup
+    import asyncio
 
-    async def patched_startup(*a, **kw):
-        result = await original_startup(*a, **kw)
-        server_started.set()
-        return result
+    # Drive the ASGI app in-process: the httpx and TestClient transports
+    # wait for the response to finish, which an SSE stream never does.
+    subscriptions = []
+    subscribe = event_bus.subscribe
 
-    server.startup = patched_startup
+    def recording_subscribe():
+        subscriptions.append(subscribe())
+        return subscriptions[-1]
 
-    def run_server():
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(server.serve())
+    monkeypatch.setattr(event_bus, "subscribe", recording_subscribe)
 
-    t = threading.Thread(target=run_server, daemon=True)
-    t.start()
-    server_started.wait(timeout=5)
+    sent: asyncio.Queue = asyncio.Queue()
+    disconnected = asyncio.Event()
 
-    # Find the actual port
-    for s in server.servers:
-        for sock in s.sockets:
-            port = sock.getsockname()[1]
-            break
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
 
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/events", "raw_path": b"/events",
+        "root_path": "", "query_string": b"", "headers": [],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+    app_task = asyncio.create_task(dashboard_client.app(scope, receive, sent.put))
     try:
-        with httpx.stream("GET", f"http://127.0.0.1:{port}/events", timeout=5) as response:
-            assert response.status_code == 200
-            assert "text/event-stream" in response.headers.get("content-type", "")
+        start = await asyncio.wait_for(sent.get(), timeout=5)
+        assert start["status"] == 200
+        assert b"text/event-stream" in dict(start["headers"])[b"content-type"]
 
-            # Push an event so the stream yields data
-            event_bus.push(Event(type="memory_stored", project="test", detail="id123"))
+        # Push an event so the stream yields data
+        event_bus.push(Event(type="memory_stored", project="test", detail="id123"))
 
-            for chunk in response.iter_text():
-                assert "event: memory_stored" in chunk
-                assert "data: test|id123|" in chunk
-                break
+        chunk = (await asyncio.wait_for(sent.get(), timeout=5))["body"]
+        assert b"event: memory_stored" in chunk
+        assert b"data: test|id123|" in chunk
     finally:
-        server.should_exit = True
-        t.join(timeout=3)
+        disconnected.set()
+        await asyncio.wait_for(app_task, timeout=5)
+        # Release the executor thread still blocked on the queue
+        for q in subscriptions:
+            q.put_nowait(Event(type="closed", project="test"))
 
 
 def test_event_bus_thread_safety():
     """EventBus should handle concurrent subscribe/push/unsubscribe without errors."""
     import threading
+    from concurrent.futures import ThreadPoolExecutor
     from annal.events import EventBus, Event
 
     bus = EventBus()
-    errors = []
-
-    def subscriber():
-        try:
-            q = bus.subscribe()
-            for _ in range(100):
-                bus.push(Event(type="test", project="t"))
-            bus.unsubscribe(q)
-        except Exception as e:
-            errors.append(e)
-
-    threads = [threading.Thread(target=subscriber) for _ in range(10)]
-    for t in threads:
-        t.start()
-    for t in threads:
-        t.join()
-
-    assert errors == [], f"Thread safety errors: {errors}"
+    workers = 10
+    start = threading.Barrier(workers)
+    event = Event(type="test", project="t")
+
+    def subscriber(_):
+        start.wait(timeout=5)
+        q = bus.subscribe()
+        for _ in range(100):
+            bus.push(event)
+        bus.unsubscribe(q)
+
+    # map() re-raises the first worker exception, failing the test
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(subscriber, range(workers)))
+    assert bus._queues == []
 
 
 def test_dashboard_has_sse_connection(dashboard_client):
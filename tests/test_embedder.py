@@ -0,0 +1,41 @@
+import pytest
+
+from annal import embedder as embedder_module
+from annal.embedder import OnnxEmbedder
+
+# These exercise OnnxEmbedder itself, so the model has to be there
+pytestmark = pytest.mark.real_embedder
+
+
+def _counting(emb: OnnxEmbedder) -> list[list[str]]:
+    calls: list[list[str]] = []
+    model = emb._fn
+    emb._fn = lambda texts: calls.append(list(texts)) or model(texts)
+    return calls
+
+
+def test_embed_batch_runs_model_only_on_new_texts():
+    emb = OnnxEmbedder()
+    calls = _counting(emb)
+
+    first = emb.embed_batch(["alpha", "beta", "alpha"])
+    assert calls == [["alpha", "beta"]]
+    assert first[0] == first[2]
+
+    second = emb.embed_batch(["beta", "gamma"])
+    assert calls[1:] == [["gamma"]]
+    assert second[0] == first[1]
+    assert emb.embed("gamma") == second[1]
+    assert len(calls) == 2
+
+
+def test_embed_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(embedder_module, "EMBED_CACHE_SIZE", 2)
+    emb = OnnxEmbedder()
+    calls = _counting(emb)
+
+    emb.embed_batch(["a", "b"])
+    emb.embed("a")  # refresh "a", so "b" is the oldest
+    emb.embed("c")
+    emb.embed_batch(["a", "b"])
+    assert calls == [["a", "b"], ["c"], ["b"]]
@@ -4,8 +4,10 @@ import json
 
 import pytest
 
+from annal.backends.chromadb import clear_client
 from annal.config import AnnalConfig
 from annal.server import _run_export, _run_import, _make_backend
+from annal.store import BatchItem
 from tests.conftest import make_store
 
 
@@ -19,28 +21,42 @@ def project_with_data(tmp_data_dir, tmp_config_path):
     )
     config.save()
 
-    store = make_store(tmp_data_dir, "export_test")
-    store.store("First memory about auth", tags=["auth", "decision"], source="session")
-    store.store("Second memory about billing", tags=["billing"], source="design-doc")
-    store.store("Third memory about testing", tags=["testing"])
+    # Export never searches and import re-embeds, so skip the model here
+    store = make_store(tmp_data_dir, "export_test", fake_embeddings=True)
+    store.store_many([
+        BatchItem("First memory about auth", tags=["auth", "decision"], source="session"),
+        BatchItem("Second memory about billing", tags=["billing"], source="design-doc"),
+        BatchItem("Third memory about testing", tags=["testing"]),
+    ])
 
     return config, tmp_data_dir
 
 
-def test_make_backend_chromadb(tmp_data_dir, tmp_config_path):
+@pytest.fixture(scope="module")
+def backend_config(tmp_path_factory):
+    """A config the _make_backend tests only read from."""
+    root = tmp_path_factory.mktemp("make_backend")
+    config = AnnalConfig(
+        config_path=str(root / "config.yaml"),
+        data_dir=str(root / "annal_data"),
+        projects={},
+    )
+    yield config
+    clear_client(config.data_dir)
+
+
+def test_make_backend_chromadb(backend_config):
     """_make_backend should create a ChromaBackend for 'chromadb'."""
     from annal.backends.chromadb import ChromaBackend
 
-    config = AnnalConfig(config_path=tmp_config_path, data_dir=tmp_data_dir, projects={})
-    backend = _make_backend("chromadb", config, "annal_test", 384)
+    backend = _make_backend("chromadb", backend_config, "annal_test", 384)
     assert isinstance(backend, ChromaBackend)
 
 
-def test_make_backend_unknown_raises(tmp_config_path, tmp_data_dir):
+def test_make_backend_unknown_raises(backend_config):
     """_make_backend should raise ValueError for unknown backends."""
-    config = AnnalConfig(config_path=tmp_config_path, data_dir=tmp_data_dir, projects={})
     with pytest.raises(ValueError, match="Unknown backend"):
-        _make_backend("sqlite", config, "annal_test", 384)
+        _make_backend("sqlite", backend_config, "annal_test", 384)
 
 
 def test_export_writes_jsonl(project_with_data, capsys):
@@ -61,18 +77,14 @@ def test_export_writes_jsonl(project_with_data, capsys):
         assert "tags" in record["metadata"]
 
 
-def test_export_import_roundtrip(project_with_data, tmp_path, capsys):
+def test_export_import_roundtrip(project_with_data, tmp_path):
     """Export then import into a new project should produce identical memories."""
     config, _ = project_with_data
 
-    # Export
-    _run_export(config, "export_test")
-    captured = capsys.readouterr()
-    export_lines = [l for l in captured.out.strip().split("\n") if l]
-
-    # Write to a temp file
+    # Export straight to a file
     jsonl_file = tmp_path / "export.jsonl"
-    jsonl_file.write_text(captured.out)
+    with jsonl_file.open("w") as f:
+        _run_export(config, "export_test", out=f)
 
     # Import into a fresh project
     _run_import(config, "roundtrip_test", str(jsonl_file))
@@ -87,15 +99,13 @@ def test_export_import_roundtrip(project_with_data, tmp_path, capsys):
     assert any("auth" in t.lower() for t in auth_texts)
 
 
-def test_import_preserves_metadata(project_with_data, tmp_path, capsys):
+def test_import_preserves_metadata(project_with_data, tmp_path):
     """Imported memories should retain their original tags, source, and chunk_type."""
     config, _ = project_with_data
 
-    _run_export(config, "export_test")
-    captured = capsys.readouterr()
-
     jsonl_file = tmp_path / "export.jsonl"
-    jsonl_file.write_text(captured.out)
+    with jsonl_file.open("w") as f:
+        _run_export(config, "export_test", out=f)
 
     _run_import(config, "meta_test", str(jsonl_file))
 
@@ -1,6 +1,6 @@
 import os
 import pytest
-from annal.indexer import chunk_markdown, chunk_config_file, index_file
+from annal.indexer import chunk_markdown, chunk_config_file, index_content, index_file, prepare_content
 from tests.conftest import make_store
 
 
@@ -56,6 +56,17 @@ def test_index_file_stores_chunks(tmp_data_dir, tmp_path):
     assert results[0]["chunk_type"] == "file-indexed"
 
 
+def test_index_content_embeds_all_chunks_in_one_call(tmp_data_dir, monkeypatch):
+    store = make_store(tmp_data_dir, "batched")
+    calls = []
+    original = store._embedder.embed_batch
+    monkeypatch.setattr(store._embedder, "embed_batch", lambda texts: calls.append(texts) or original(texts))
+    monkeypatch.setattr(store._embedder, "embed", lambda text: pytest.fail("embedded a single chunk"))
+    content = b"# A\nContent A\n\n# B\nContent B\n\n# C\nContent C\n"
+    assert index_content(store, "/notes/test.md", content, 0.0) == 3
+    assert len(calls) == 1 and len(calls[0]) == 3
+
+
 def test_chunk_markdown_recognizes_h4_through_h6():
     """Headings #### through ###### should create chunk boundaries."""
     content = """# Top Level
@@ -84,33 +95,22 @@ Finest detail text
     assert any("Finest Detail" in h for h in headings)
 
 
-def test_index_file_prepends_heading_path_to_content(tmp_data_dir, tmp_path):
-    """Stored content should start with the heading path for embedding context."""
-    md_file = tmp_path / "doc.md"
-    md_file.write_text("# Project\nIntro\n\n## Design\n### Backend\nUses Python.\n")
-
-    store = make_store(tmp_data_dir,"headingtest")
-    index_file(store, str(md_file))
+def test_prepare_content_prepends_heading_path_to_content():
+    """Chunk content should start with the heading path for embedding context."""
+    items, _ = prepare_content("/docs/doc.md", b"# Project\nIntro\n\n## Design\n### Backend\nUses Python.\n")
 
-    results = store.search("Python", limit=5)
-    backend_chunk = [r for r in results if "Backend" in r["source"]]
-    assert len(backend_chunk) > 0
-    # Content should start with heading path
-    assert backend_chunk[0]["content"].startswith("doc.md")
-    assert "Backend" in backend_chunk[0]["content"]
-    assert "Uses Python" in backend_chunk[0]["content"]
+    backend_chunk = [item for item in items if "Backend" in item.source]
+    assert len(backend_chunk) == 1
+    assert backend_chunk[0].content.startswith("doc.md")
+    assert "Uses Python" in backend_chunk[0].content
 
 
-def test_reindex_file_replaces_old_chunks(tmp_data_dir, tmp_path):
-    md_file = tmp_path / "test.md"
-    md_file.write_text("# Version 1\nOld content\n")
-
+def test_reindex_replaces_old_chunks(tmp_data_dir):
     store = make_store(tmp_data_dir,"testproject")
-    index_file(store, str(md_file))
+    index_content(store, "/notes/test.md", b"# Version 1\nOld content\n", 1.0)
     assert store.count() == 1
 
-    md_file.write_text("# Version 2\nNew content\n\n# Extra\nMore stuff\n")
-    index_file(store, str(md_file))
+    index_content(store, "/notes/test.md", b"# Version 2\nNew content\n\n# Extra\nMore stuff\n", 2.0)
     assert store.count() == 2
 
     results = store.search("Old content", limit=5)
@@ -119,19 +119,24 @@ def test_reindex_file_replaces_old_chunks(tmp_data_dir, tmp_path):
         assert "Old content" not in r["content"]
 
 
-def test_heading_context_uses_full_path(tmp_data_dir, tmp_path):
-    """Stored content should start with 'filename > Heading > Subheading' format."""
-    md_file = tmp_path / "doc.md"
-    md_file.write_text("# Project\nIntro\n\n## Design\n### Backend\nUses Python.\n")
+def test_reindex_unchanged_content_only_refreshes_mtime(tmp_data_dir, monkeypatch):
+    content = b"# A\nContent A\n\n# B\nContent B\n"
+    store = make_store(tmp_data_dir, "unchanged")
+    assert index_content(store, "/notes/test.md", content, 1.0) == 2
+    ids = sorted(store.get_file_hash("/notes/test.md")[1])
+
+    monkeypatch.setattr(store._embedder, "embed_batch", lambda texts: pytest.fail("re-embedded unchanged file"))
+    assert index_content(store, "/notes/test.md", content, 2_000_000_000) == 2
+    assert sorted(store.get_file_hash("/notes/test.md")[1]) == ids
+    assert store.get_all_file_mtimes() == {"file:/notes/test.md": 2_000_000_000}
 
-    store = make_store(tmp_data_dir,"heading_strict")
-    index_file(store, str(md_file))
 
-    results = store.search("Python", limit=5)
-    backend_chunk = [r for r in results if "Backend" in r["source"]]
-    assert len(backend_chunk) > 0
-    # Content should start with the full heading path
-    assert backend_chunk[0]["content"].startswith("doc.md > Design > Backend")
+def test_heading_context_uses_full_path():
+    """Chunk content should start with 'filename > Heading > Subheading' format."""
+    items, _ = prepare_content("/docs/doc.md", b"# Project\nIntro\n\n## Design\n### Backend\nUses Python.\n")
+
+    backend_chunk = [item for item in items if "Backend" in item.source]
+    assert backend_chunk[0].content.startswith("doc.md > Design > Backend")
 
 
 def test_chunk_markdown_skips_empty_parent_headings():
@@ -147,3 +152,51 @@ Child body text here.
     # No chunk should have just "Parent" as its content
     for chunk in chunks:
         assert chunk["content"] != "Parent"
+
+
+def test_chunk_markdown_heading_needs_text_on_its_own_line():
+    """A bare or over-long run of hashes is body text, never a heading."""
+    content = "#\nNot a title\n####### Seven hashes\n## Real\nBody\n"
+    chunks = chunk_markdown(content, "test.md")
+    assert chunks == [
+        {"heading": "test.md", "content": "#\nNot a title\n####### Seven hashes"},
+        {"heading": "test.md > Real", "content": "Body"},
+    ]
+
+
+def test_store_files_replaces_several_files_in_one_write(tmp_data_dir):
+    from annal.indexer import store_files
+
+    store = make_store(tmp_data_dir, "testproject")
+    paths = ["/notes/a.md", "/notes/b.md"]
+    for path in paths:
+        index_content(store, path, f"# {path}\nOld {path}\n".encode(), 1.0)
+
+    calls = []
+    store_many = store.store_many
+    store.store_many = lambda items, **kw: calls.append(len(items)) or store_many(items, **kw)
+    files = [(p, *prepare_content(p, f"# {p}\nNew {p}\n\n# More\nSecond chunk\n".encode())) for p in paths]
+    assert store_files(store, [(p, items, 123.0 + i, h) for i, (p, items, h) in enumerate(files)]) == 4
+
+    assert calls == [4]
+    assert store.count() == 4
+    assert store.get_all_file_mtimes() == {f"file:{paths[0]}": 123.0, f"file:{paths[1]}": 124.0}
+    assert all("New" in r["content"] or "Second" in r["content"] for r in store.browse()[0])
+
+
+def test_store_files_keeps_old_chunks_when_insert_fails(tmp_data_dir, monkeypatch):
+    from annal.indexer import store_files
+
+    store = make_store(tmp_data_dir, "testproject")
+    index_content(store, "/notes/a.md", b"# A\nOld body\n", 1.0)
+    items, file_hash = prepare_content("/notes/a.md", b"# A\nNew body\n")
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("backend down")
+
+    monkeypatch.setattr(store, "store_many", fail)
+    with pytest.raises(RuntimeError):
+        store_files(store, [("/notes/a.md", items, 2.0, file_hash)])
+
+    assert ["Old body" in r["content"] for r in store.browse()[0]] == [True]
+    assert store.get_all_file_mtimes() == {"file:/notes/a.md": 1.0}
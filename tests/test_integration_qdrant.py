@@ -1,50 +1,48 @@
 """Integration tests for MemoryStore + QdrantBackend."""
 
-import uuid
-
 import pytest
 
+from tests.conftest import QDRANT_URL, qdrant_available, qdrant_collection_name
+
 try:
-    from qdrant_client import QdrantClient
     from annal.backends.qdrant import QdrantBackend
-
-    def _qdrant_available():
-        try:
-            QdrantClient(url="http://localhost:6333").get_collections()
-            return True
-        except Exception:
-            return False
 except ImportError:
-    _qdrant_available = lambda: False
+    pass
 
-from annal.embedder import OnnxEmbedder
 from annal.store import MemoryStore
 
-pytestmark = pytest.mark.skipif(not _qdrant_available(), reason="Qdrant not available")
+pytestmark = pytest.mark.skipif(not qdrant_available(), reason="Qdrant not available")
 
 
 @pytest.fixture(scope="module")
-def embedder():
-    return OnnxEmbedder()
-
-
-@pytest.fixture
-def store(embedder):
-    """Create a MemoryStore backed by Qdrant, clean up after."""
-    collection = f"test_{uuid.uuid4().hex[:8]}"
-    backend = QdrantBackend(
-        url="http://localhost:6333",
+def backend(embedder, qdrant_client):
+    """One hybrid collection for the module instead of one per test."""
+    collection = qdrant_collection_name()
+    yield QdrantBackend(
+        url=QDRANT_URL,
         collection_name=collection,
         dimension=embedder.dimension,
         hybrid=True,
     )
-    yield MemoryStore(backend, embedder)
     try:
-        QdrantClient(url="http://localhost:6333").delete_collection(collection)
+        qdrant_client.delete_collection(collection)
     except Exception:
         pass
 
 
+@pytest.fixture
+def store(backend, embedder, qdrant_client):
+    """A fresh MemoryStore over the shared collection, emptied after each test."""
+    yield MemoryStore(backend, embedder)
+    from qdrant_client.models import Filter, FilterSelector
+
+    qdrant_client.delete(
+        collection_name=backend._collection,
+        points_selector=FilterSelector(filter=Filter()),
+        wait=True,
+    )
+
+
 def test_store_and_search(store):
     store.store("JWT auth decision for the API gateway", tags=["auth", "decision"])
     results = store.search("authentication", limit=5)
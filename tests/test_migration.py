@@ -2,27 +2,20 @@
 
 import pytest
 
-from annal.embedder import OnnxEmbedder
 from annal.backends.chromadb import ChromaBackend
 from annal.migrate import migrate
 
 
-@pytest.fixture(scope="module")
-def embedder():
-    return OnnxEmbedder()
-
-
 def test_migrate_chromadb_to_chromadb(tmp_path, embedder):
     """Migration preserves all documents and metadata."""
     src = ChromaBackend(path=str(tmp_path / "src"), collection_name="test", dimension=embedder.dimension)
     dst = ChromaBackend(path=str(tmp_path / "dst"), collection_name="test", dimension=embedder.dimension)
 
-    for i in range(10):
-        emb = embedder.embed(f"memory {i}")
-        src.insert(
-            f"m{i}", f"memory {i}", emb,
-            {"tags": ["test", "batch"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"},
-        )
+    texts = [f"memory {i}" for i in range(10)]
+    src.insert_many(
+        [f"m{i}" for i in range(10)], texts, embedder.embed_batch(texts),
+        [{"tags": ["test", "batch"], "chunk_type": "agent-memory", "created_at": "2026-01-01T00:00:00"} for _ in texts],
+    )
 
     count = migrate(src, dst, embedder)
     assert count == 10
@@ -59,3 +52,22 @@ def test_migrate_preserves_ids(tmp_path, embedder):
     results = dst.get(["custom-id-123"])
     assert len(results) == 1
     assert results[0].id == "custom-id-123"
+
+
+def test_migrate_inserts_each_batch_in_one_call(tmp_path, embedder):
+    src = ChromaBackend(path=str(tmp_path / "src"), collection_name="test", dimension=embedder.dimension)
+    dst = ChromaBackend(path=str(tmp_path / "dst"), collection_name="test", dimension=embedder.dimension)
+    texts = [f"memory {i}" for i in range(10)]
+    src.insert_many(
+        [f"m{i}" for i in range(10)], texts, embedder.embed_batch(texts),
+        [{"tags": [], "created_at": "2026-01-01T00:00:00"} for _ in texts],
+    )
+
+    batches = []
+    real_insert_many = dst.insert_many
+    dst.insert_many = lambda ids, *rest: batches.append(len(ids)) or real_insert_many(ids, *rest)
+    dst.insert = lambda *a: pytest.fail("inserted one document at a time")
+
+    assert migrate(src, dst, embedder, batch_size=4) == 10
+    assert batches == [4, 4, 2]
+    assert dst.count() == 10
@@ -44,6 +44,13 @@ def test_get_store_creates_for_unknown_project(config_with_projects):
     assert store is not None
 
 
+def test_pools_share_one_embedder(config_with_projects):
+    first = StorePool(config_with_projects).get_store("myproject")
+    second = StorePool(config_with_projects).get_store("myproject")
+    assert first is not second
+    assert first._embedder is second._embedder
+
+
 def test_reconcile_project_indexes_files(config_with_projects):
     pool = StorePool(config_with_projects)
     pool.get_store("myproject")
@@ -64,31 +71,70 @@ def test_shutdown_stops_watchers(config_with_projects):
     pool.shutdown()
 
 
+def test_reconcile_and_watch_share_file_watcher(config_with_projects):
+    pool = StorePool(config_with_projects)
+    pool.reconcile_project("myproject")
+    watcher = pool._get_file_watcher("myproject")
+    pool.start_watcher("myproject")
+    try:
+        assert pool._watchers["myproject"] is watcher
+        assert pool._get_file_watcher("myproject") is watcher
+    finally:
+        pool.shutdown()
+
+    # Editing the project's patterns builds a fresh watcher
+    config_with_projects.add_project("myproject", watch_patterns=["**/*.txt"])
+    assert pool._get_file_watcher("myproject") is not watcher
+
+
+def test_full_reindex_reuses_file_watcher(config_with_projects):
+    """index_files' clear-and-reconcile path goes through the shared watcher."""
+    pool = StorePool(config_with_projects)
+    pool.start_watcher("myproject")
+    watcher = pool._watchers["myproject"]
+    done = threading.Event()
+    try:
+        pool.reconcile_project_async("myproject", on_complete=lambda _: done.set(), clear_first=True)
+        assert done.wait(10)
+        assert pool._get_file_watcher("myproject") is watcher
+        assert pool.get_last_reconcile("myproject")["file_count"] == 1
+    finally:
+        pool.shutdown()
+
+
 def test_store_pool_concurrent_get_store(tmp_data_dir, tmp_config_path):
     """Multiple threads calling get_store for a new project should not race."""
     config = AnnalConfig(config_path=tmp_config_path, data_dir=tmp_data_dir)
     config.save()
     pool = StorePool(config)
 
+    builds = []
+    create_backend = pool._create_backend
+    pool._create_backend = lambda project: builds.append(project) or create_backend(project)
+
+    workers = 10
+    start = threading.Barrier(workers)
     stores = []
     errors = []
 
     def get():
         try:
+            start.wait(timeout=5)
             s = pool.get_store("racetest")
             stores.append(s)
         except Exception as e:
             errors.append(e)
 
-    threads = [threading.Thread(target=get) for _ in range(10)]
+    threads = [threading.Thread(target=get) for _ in range(workers)]
     for t in threads:
         t.start()
     for t in threads:
         t.join()
 
     assert errors == [], f"Race condition errors: {errors}"
-    # All threads should get the same store instance
+    # All threads should get the same store instance, built exactly once
     assert len(set(id(s) for s in stores)) == 1
+    assert builds == ["racetest"]
 
 
 def test_reconcile_project_async(tmp_data_dir, tmp_config_path, tmp_path):
@@ -103,14 +149,60 @@ def test_reconcile_project_async(tmp_data_dir, tmp_config_path, tmp_path):
     pool = StorePool(config)
 
     pool.reconcile_project_async("asynctest")
-
-    # Give the background thread time to finish
-    time.sleep(2)
+    assert pool.wait_for_reconcile(timeout=10)
 
     store = pool.get_store("asynctest")
     assert store.count() > 0
 
 
+def test_reconcile_project_async_reuses_worker_thread(tmp_data_dir, tmp_config_path, tmp_path):
+    """Back-to-back reconciles run on one persistent worker, not a thread each."""
+    from unittest.mock import patch
+
+    config = AnnalConfig(config_path=tmp_config_path, data_dir=tmp_data_dir)
+    config.add_project("reuse", watch_paths=[str(tmp_path)])
+    pool = StorePool(config)
+
+    threads = []
+    with patch("annal.watcher.FileWatcher.reconcile",
+               lambda self, progress_callback=None: threads.append(threading.current_thread()) or 0):
+        for _ in range(3):
+            assert pool.reconcile_project_async("reuse").wait(10)
+    pool.shutdown()
+
+    assert len(threads) == 3 and len(set(threads)) == 1
+    assert threads[0] is not threading.current_thread()
+    assert pool.wait_for_reconcile(timeout=0)
+
+
+def test_reconcile_waiting_on_one_project_does_not_starve_others(tmp_data_dir, tmp_config_path, tmp_path):
+    """Reconciles queued behind a busy project leave the workers to other projects."""
+    from unittest.mock import patch
+    from annal.pool import MAX_CONCURRENT_RECONCILES
+
+    config = AnnalConfig(config_path=tmp_config_path, data_dir=tmp_data_dir)
+    config.add_project("busy", watch_paths=[str(tmp_path)])
+    config.add_project("other", watch_paths=[str(tmp_path)])
+    pool = StorePool(config)
+
+    busy_lock = pool._get_index_lock("busy")
+    busy_lock.acquire()
+    held = True
+    try:
+        with patch("annal.watcher.FileWatcher.reconcile", lambda self, progress_callback=None: 0):
+            busy = [pool.reconcile_project_async("busy") for _ in range(MAX_CONCURRENT_RECONCILES + 1)]
+            assert pool.reconcile_project_async("other").wait(10)
+            assert not any(done.is_set() for done in busy)
+            busy_lock.release()
+            held = False
+            assert pool.wait_for_reconcile(timeout=10)
+        assert all(done.is_set() for done in busy)
+    finally:
+        if held:
+            busy_lock.release()
+        pool.shutdown()
+
+
 def test_is_indexing(tmp_data_dir, tmp_config_path):
     """is_indexing should return False when no indexing is running."""
     config = AnnalConfig(config_path=tmp_config_path, data_dir=tmp_data_dir)
@@ -161,7 +253,7 @@ def test_reconcile_project_async_emits_index_failed_on_error(tmp_data_dir, tmp_c
     # Force reconcile to raise
     with patch("annal.watcher.FileWatcher.reconcile", side_effect=RuntimeError("boom")):
         pool.reconcile_project_async("failtest")
-        time.sleep(2)
+        assert pool.wait_for_reconcile(timeout=10)
 
     # Drain the queue
     while True:
@@ -240,3 +332,38 @@ def test_shutdown_waits_for_reconciliation(tmp_data_dir, tmp_config_path, tmp_pa
     # After shutdown, reconciliation should have completed
     store = pool.get_store("shutdowntest")
     assert store.count() > 0
+
+
+def test_reconcile_project_async_bounds_concurrency(tmp_data_dir, tmp_config_path, tmp_path):
+    """Background reconciles across projects never exceed the concurrency cap."""
+    from unittest.mock import patch
+    from annal.pool import MAX_CONCURRENT_RECONCILES
+
+    config = AnnalConfig(config_path=tmp_config_path, data_dir=tmp_data_dir)
+    names = [f"proj{i}" for i in range(MAX_CONCURRENT_RECONCILES + 2)]
+    for name in names:
+        config.add_project(name, watch_paths=[str(tmp_path)])
+    pool = StorePool(config)
+
+    running = 0
+    peak = 0
+    counter_lock = threading.Lock()
+    done = threading.Semaphore(0)
+
+    def fake_reconcile(self, progress_callback=None):
+        nonlocal running, peak
+        with counter_lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.3)
+        with counter_lock:
+            running -= 1
+        return 0
+
+    with patch("annal.watcher.FileWatcher.reconcile", fake_reconcile):
+        for name in names:
+            pool.reconcile_project_async(name, on_complete=lambda _count: done.release())
+        for _ in names:
+            assert done.acquire(timeout=10)
+
+    assert 1 < peak <= MAX_CONCURRENT_RECONCILES
@@ -1,5 +1,5 @@
 import pytest
-from annal.server import create_server, SERVER_INSTRUCTIONS
+from annal.server import _start_dashboard, create_server, load_instructions
 from annal.config import AnnalConfig
 
 
@@ -75,7 +75,8 @@ def test_create_server_accepts_external_pool(server_env):
 
 def test_server_has_instructions(server_env):
     mcp, _pool = create_server(config_path=server_env["config_path"])
-    assert mcp.instructions == SERVER_INSTRUCTIONS
+    assert mcp.instructions == load_instructions()
+    assert mcp.instructions.startswith("Annal is your persistent semantic memory.")
 
 
 @pytest.mark.asyncio
@@ -174,6 +175,7 @@ async def test_expand_memories_missing_ids(mcp):
     assert "[test]" in result
 
 
+@pytest.mark.real_embedder
 @pytest.mark.asyncio
 async def test_dedup_catches_duplicate_behind_file_indexed(mcp):
     """Dedup should find agent-memory duplicates even when file-indexed content is nearer."""
@@ -227,9 +229,8 @@ async def test_init_project_with_custom_excludes(server_env):
 @pytest.mark.asyncio
 async def test_index_files_clears_stale_chunks(server_env):
     """index_files should remove old file-indexed chunks before re-indexing."""
-    import time
 
-    mcp, _pool = create_server(config_path=server_env["config_path"])
+    mcp, pool = create_server(config_path=server_env["config_path"])
     watch_dir = server_env["watch_dir"]
 
     # Init project and index files
@@ -238,7 +239,7 @@ async def test_index_files_clears_stale_chunks(server_env):
         "watch_paths": [watch_dir],
     })
     # Wait for async init indexing to complete
-    time.sleep(2)
+    assert pool.wait_for_reconcile(timeout=10)
 
     # Store an agent memory (should survive re-index)
     await _call(mcp, "store_memory", {
@@ -251,7 +252,7 @@ async def test_index_files_clears_stale_chunks(server_env):
     result = await _call(mcp, "index_files", {"project": "staletest"})
     assert "Re-indexing started" in result
     # Wait for async re-indexing to complete
-    time.sleep(2)
+    assert pool.wait_for_reconcile(timeout=10)
 
     # Agent memory should still be searchable
     search_result = await _call(mcp, "search_memories", {
@@ -387,14 +388,13 @@ async def test_init_project_returns_immediately(server_env):
 @pytest.mark.asyncio
 async def test_index_files_returns_immediately(server_env):
     """index_files should return immediately with progress message."""
-    import time
 
-    mcp, _pool = create_server(config_path=server_env["config_path"])
+    mcp, pool = create_server(config_path=server_env["config_path"])
     await _call(mcp, "init_project", {
         "project_name": "asyncidx",
         "watch_paths": [server_env["watch_dir"]],
     })
-    time.sleep(1)
+    assert pool.wait_for_reconcile(timeout=10)
 
     result = await _call(mcp, "index_files", {"project": "asyncidx"})
     assert "asyncidx" in result.lower() or "index" in result.lower()
@@ -529,6 +529,7 @@ async def test_search_json_probe_mode(mcp):
     assert "content" not in first
 
 
+@pytest.mark.real_embedder
 @pytest.mark.asyncio
 async def test_search_summary_mode_text(mcp):
     """mode='summary' returns truncated content with metadata in text output."""
@@ -729,6 +730,7 @@ async def test_search_memories_cross_project_star(mcp_with_config):
     assert len(data_list["results"]) == 2
 
 
+@pytest.mark.real_embedder
 @pytest.mark.asyncio
 async def test_min_score_skipped_when_tags_provided(mcp):
     """min_score should not discard fuzzy tag matches with low content similarity."""
@@ -1094,6 +1096,7 @@ async def test_search_default_mode_is_summary(mcp):
 # ── store_batch tool tests ───────────────────────────────────────────
 
 
+@pytest.mark.real_embedder
 @pytest.mark.asyncio
 async def test_store_batch_tool_stores_multiple(mcp):
     """store_batch with 3 memories should store all and report correctly."""
@@ -1269,6 +1272,7 @@ async def test_search_grouped_results_text(mcp_with_pool):
     assert "File-indexed" in result
 
 
+@pytest.mark.real_embedder
 @pytest.mark.asyncio
 async def test_search_grouped_results_json(mcp_with_pool):
     """Search with mixed chunk types should show grouped JSON output."""
@@ -1351,6 +1355,7 @@ async def test_search_json_includes_hit_count(mcp):
 # ── Spike 14: Stale memory management ───────────────────────────────
 
 
+@pytest.mark.real_embedder
 @pytest.mark.asyncio
 async def test_prune_stale_dry_run(mcp_with_pool):
     """prune_stale with dry_run=True returns summary without deleting."""
@@ -1466,3 +1471,49 @@ async def test_expand_json_includes_hit_count(mcp):
     assert "hit_count" in first
     assert first["hit_count"] >= 1
     assert "last_accessed_at" in first
+
+
+def test_start_dashboard_serves_on_prebound_port(server_env, monkeypatch):
+    """The dashboard answers as soon as _start_dashboard returns its port."""
+    import threading
+    import httpx
+    import uvicorn
+    from annal.pool import StorePool
+
+    servers = []
+
+    class RecordingServer(uvicorn.Server):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.stopped = threading.Event()
+            servers.append(self)
+
+        async def serve(self, sockets=None):
+            try:
+                await super().serve(sockets=sockets)
+            finally:
+                self.stopped.set()
+
+    monkeypatch.setattr(uvicorn, "Server", RecordingServer)
+    config = AnnalConfig.load(server_env["config_path"])
+    try:
+        port = _start_dashboard(StorePool(config), config, port=0)
+        response = httpx.get(f"http://127.0.0.1:{port}/api/projects", timeout=5)
+        assert response.status_code == 200
+        assert response.json() == []
+    finally:
+        for server in servers:
+            server.should_exit = True
+            assert server.stopped.wait(5)
+
+
+def test_start_dashboard_port_in_use(server_env):
+    import socket
+    from annal.pool import StorePool
+
+    config = AnnalConfig.load(server_env["config_path"])
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        port = taken.getsockname()[1]
+        assert _start_dashboard(StorePool(config), config, port=port) is None
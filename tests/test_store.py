@@ -363,6 +363,7 @@ def test_search_overfetch_with_tag_filter(tmp_data_dir):
     assert all("Signal" in r["content"] for r in results)
 
 
+@pytest.mark.real_embedder
 def test_fuzzy_tag_matching(tmp_data_dir):
     """Searching with tags=['auth'] should find memories tagged 'authentication'."""
     store = make_store(tmp_data_dir, "fuzzy_tags")
@@ -374,6 +375,7 @@ def test_fuzzy_tag_matching(tmp_data_dir):
     assert "JWT" in results[0]["content"]
 
 
+@pytest.mark.real_embedder
 def test_fuzzy_tag_no_false_positives(tmp_data_dir):
     """Fuzzy matching should not match unrelated tags."""
     store = make_store(tmp_data_dir, "fuzzy_strict")
@@ -397,6 +399,7 @@ def test_fuzzy_tag_exact_still_works(tmp_data_dir):
     assert "Stripe" in results[0]["content"]
 
 
+@pytest.mark.real_embedder
 def test_fuzzy_tag_in_browse(tmp_data_dir):
     """browse() with tags should also use fuzzy matching."""
     store = make_store(tmp_data_dir, "fuzzy_browse")
@@ -408,6 +411,63 @@ def test_fuzzy_tag_in_browse(tmp_data_dir):
     assert "Auth" in results[0]["content"]
 
 
+def test_tag_embedding_cache_is_normalized_float16(tmp_data_dir):
+    """The tag cache holds one unit-length float16 row per known tag."""
+    import numpy as np
+
+    store = make_store(tmp_data_dir, "tag_cache_fp16")
+    store.store(content="Auth decision", tags=["authentication", "decision"])
+
+    names, index, matrix = store._get_tag_embeddings()
+    assert index == {name: i for i, name in enumerate(names)}
+    assert sorted(names) == ["authentication", "decision"]
+    assert matrix.dtype == np.float16
+    assert matrix.shape == (2, store._embedder.dimension)
+    norms = np.linalg.norm(matrix.astype(np.float32), axis=1)
+    assert np.allclose(norms, 1.0, atol=1e-2)
+
+
+def test_expand_tags_known_tags_skip_embedder(tmp_data_dir, monkeypatch):
+    """Known filter tags reuse cached rows instead of being re-embedded."""
+    store = make_store(tmp_data_dir, "expand_known")
+    store.store(content="Auth decision", tags=["authentication", "decision"])
+    store._get_tag_embeddings()
+
+    calls = []
+    original = store._embedder.embed_batch
+    monkeypatch.setattr(store._embedder, "embed_batch", lambda texts: calls.append(texts) or original(texts))
+    expanded = store._expand_tags(["decision", "authentication"])
+    assert {"decision", "authentication"} <= expanded
+    assert calls == []
+
+
+@pytest.mark.real_embedder
+def test_repeated_search_reuses_query_embedding(tmp_data_dir, monkeypatch):
+    """A repeated query is served from the embedder's cache, not the model."""
+    store = make_store(tmp_data_dir, "query_cache")
+    store.store(content="Billing uses Stripe", tags=["billing"])
+
+    calls = []
+    model = store._embedder._fn
+    monkeypatch.setattr(store._embedder, "_fn", lambda texts: calls.append(texts) or model(texts))
+    first = store.search("payments provider", limit=1)
+    calls.clear()
+    second = store.search("payments provider", limit=1)
+    assert calls == []
+    assert first[0]["id"] == second[0]["id"]
+
+
+def test_fuzzy_match_mask():
+    """_fuzzy_match flags known rows close to any filter row."""
+    import numpy as np
+    from annal.store import _fuzzy_match
+
+    known = np.array([[1, 0], [0, 1], [0.6, 0.8]], dtype=np.float16)
+    filt = np.array([[1, 0]], dtype=np.float32)
+    assert _fuzzy_match(filt, known, 0.72).tolist() == [True, False, False]
+    assert _fuzzy_match(filt, known, 0.5).tolist() == [True, False, True]
+
+
 def test_search_across_projects(tmp_data_dir):
     """Searching across multiple projects returns results from each."""
     store_a = make_store(tmp_data_dir, "project_a")
@@ -501,6 +561,7 @@ def test_retag_deduplicates(tmp_data_dir):
     assert final == ["auth", "decision", "new"]
 
 
+@pytest.mark.real_embedder
 def test_fuzzy_tag_matches_dbs_to_database(tmp_data_dir):
     """Lowered threshold (0.72) should match 'dbs' to 'database'."""
     store = make_store(tmp_data_dir, "fuzzy_threshold")
@@ -593,6 +654,26 @@ def test_list_topics_includes_superseded_when_requested(tmp_data_dir):
     assert topics["decision"] == 2
 
 
+def test_list_topics_is_cached_until_a_write(tmp_data_dir):
+    store = make_store(tmp_data_dir, "topics_cache")
+    mem_id = store.store(content="JWT for auth", tags=["auth"])
+    assert store.list_topics() == {"auth": 1}
+
+    scans = []
+    iter_metadata = store._backend.iter_metadata
+    store._backend.iter_metadata = lambda where=None: scans.append(where) or iter_metadata(where)
+    topics = store.list_topics()
+    topics["auth"] = 99  # callers get their own copy
+    assert store.list_topics() == {"auth": 1}
+    assert scans == []
+
+    store.retag(mem_id, add_tags=["security"])
+    assert store.list_topics() == {"auth": 1, "security": 1}
+    store.delete(mem_id)
+    assert store.list_topics() == {}
+    assert len(scans) == 2
+
+
 def test_stats_excludes_superseded_by_default(tmp_data_dir):
     """stats should not count superseded memories."""
     store = make_store(tmp_data_dir, "stats_supersede")
@@ -734,6 +815,38 @@ def test_store_batch_empty_list(tmp_data_dir):
     assert result.stored_ids == []
 
 
+def test_store_many_stores_all_items(tmp_data_dir):
+    """store_many should store every item without dedup and return IDs in order."""
+    store = make_store(tmp_data_dir, "store_many")
+    ids = store.store_many(
+        [
+            BatchItem(content="Chunk one", tags=["indexed"], source="file:/a.md|One"),
+            BatchItem(content="Chunk one", tags=["indexed"], source="file:/a.md|Two"),
+        ],
+        chunk_type="file-indexed",
+        file_mtime=1234.5,
+    )
+    assert len(ids) == 2
+    assert store.count() == 2
+    by_id = {r["id"]: r for r in store.get_by_ids(ids)}
+    assert by_id[ids[0]]["source"] == "file:/a.md|One"
+    assert by_id[ids[1]]["source"] == "file:/a.md|Two"
+    assert all(r["chunk_type"] == "file-indexed" for r in by_id.values())
+    assert store.get_all_file_mtimes() == {"file:/a.md": 1234.5}
+
+
+def test_store_many_supersedes(tmp_data_dir):
+    store = make_store(tmp_data_dir, "store_many_supersede")
+    old_id = store.store(content="Old decision", tags=["decision"])
+    [new_id] = store.store_many([BatchItem(content="New decision", tags=["decision"], supersedes=old_id)])
+    assert store.get_by_ids([old_id])[0]["superseded_by"] == new_id
+
+
+def test_store_many_empty_list(tmp_data_dir):
+    store = make_store(tmp_data_dir, "store_many_empty")
+    assert store.store_many([]) == []
+
+
 # ── Spike 13: Search improvements ───────────────────────────────────
 
 
@@ -946,6 +1059,7 @@ def test_find_stale_ignores_recently_created_never_accessed(tmp_data_dir):
     assert result["stale_count"] == 0
 
 
+@pytest.mark.real_embedder
 def test_agent_memory_boost_over_file_indexed(tmp_data_dir):
     """Agent memories should rank higher than file-indexed chunks at similar similarity."""
     store = make_store(tmp_data_dir, "boost_test")
@@ -967,3 +1081,11 @@ def test_agent_memory_boost_over_file_indexed(tmp_data_dir):
     # Agent memory should rank first due to boost
     assert results[0]["chunk_type"] == "agent-memory"
     assert results[1]["chunk_type"] == "file-indexed"
+
+
+def test_search_and_store_batch_do_not_count_collection(tmp_data_dir):
+    store = make_store(tmp_data_dir, "nocount")
+    store._backend.count = lambda where=None: pytest.fail("count() called")
+    assert store.search("anything") == []
+    store.store_batch([BatchItem(content="JWT for auth", tags=["auth"])])
+    assert len(store.search("JWT", limit=5)) == 1
@@ -32,6 +32,21 @@ def test_matches_patterns_excludes_nested_vendor():
     assert matches_patterns("docs/config.json", patterns, excludes) is True
 
 
+def test_matches_patterns_glob_edge_cases():
+    """Compiled patterns keep the fnmatch-based semantics."""
+    # "**/" matches at the root as well as at any directory boundary
+    assert matches_patterns("README.md", ["**/README.md"], []) is True
+    assert matches_patterns("a/b/README.md", ["**/README.md"], []) is True
+    assert matches_patterns("a/xREADME.md", ["**/README.md"], []) is False
+    # "prefix/**" covers the prefix itself and is not a glob
+    assert matches_patterns("build", ["**"], ["build/**"]) is False
+    assert matches_patterns("build.log", ["*.log"], ["build/**"]) is True
+    assert matches_patterns("a.b/c.md", ["**/*.md"], ["a.b/**"]) is False
+    assert matches_patterns("axb/c.md", ["**/*.md"], ["a.b/**"]) is True
+    # plain fnmatch "*" also crosses "/"
+    assert matches_patterns("docs/deep/file.md", ["docs/*.md"], []) is True
+
+
 def test_reconcile_indexes_new_files(tmp_data_dir, tmp_path):
     # Create a markdown file
     md_file = tmp_path / "test.md"
@@ -101,3 +116,447 @@ def test_reconcile_survives_unreadable_file(tmp_data_dir, tmp_path):
     finally:
         # Restore permissions so tmp_path cleanup works
         bad.chmod(0o644)
+
+
+def test_reconcile_walks_nested_dirs_without_following_dir_symlinks(tmp_data_dir, tmp_path):
+    """Nested files are found; symlinked directories are not descended into."""
+    nested = tmp_path / "docs" / "guide"
+    nested.mkdir(parents=True)
+    (nested / "intro.md").write_text("# Intro\nNested guide page.\n")
+    (tmp_path / "linked").symlink_to(tmp_path / "docs", target_is_directory=True)
+
+    store = make_store(tmp_data_dir, "testproject")
+    project_config = ProjectConfig(
+        watch_paths=[str(tmp_path)],
+        watch_patterns=["**/*.md"],
+    )
+
+    watcher = FileWatcher(store=store, project_config=project_config)
+    assert watcher.reconcile() == 1
+    results, _ = store.browse()
+    assert results[0]["source"].startswith(f"file:{nested / 'intro.md'}")
+
+
+def test_scandir_recursive_prunes_excluded_dirs(tmp_path, monkeypatch):
+    """Excluded directories are skipped without being listed."""
+    from annal import watcher as watcher_mod
+
+    (tmp_path / "src" / "node_modules" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "node_modules" / "pkg" / "README.md").write_text("x")
+    (tmp_path / "src" / "main.md").write_text("x")
+
+    scanned: list[str] = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(watcher_mod.os, "scandir", lambda p: scanned.append(p) or real_scandir(p))
+
+    excludes = watcher_mod._compile_patterns(("**/node_modules/**",))
+    root = str(tmp_path)
+    files = [e.path for e in watcher_mod._scandir_recursive(root, excludes, len(root) + 1)]
+    assert files == [str(tmp_path / "src" / "main.md")]
+    assert scanned == [root, str(tmp_path / "src")]
+
+
+def test_index_handler_caches_match_decisions(tmp_data_dir, tmp_path):
+    """_IndexHandler remembers pattern decisions per relative path."""
+    from annal.watcher import _IndexHandler
+
+    store = make_store(tmp_data_dir, "testproject")
+    project_config = ProjectConfig(
+        watch_paths=[str(tmp_path)],
+        watch_patterns=["**/*.md"],
+        watch_exclude=["node_modules/**"],
+    )
+    handler = _IndexHandler(store, project_config, str(tmp_path))
+
+    assert handler._should_index(str(tmp_path / "docs" / "a.md")) is True
+    assert handler._should_index(str(tmp_path / "node_modules" / "a.md")) is False
+    assert handler._match_cache == {"docs/a.md": True, "node_modules/a.md": False}
+
+
+def test_reconcile_indexes_many_files_and_reports_progress(tmp_data_dir, tmp_path):
+    """Parallel reconcile indexes every file and reports progress every 50."""
+    for i in range(55):
+        (tmp_path / f"note{i}.md").write_text(f"# Note {i}\nBody {i}\n")
+
+    store = make_store(tmp_data_dir, "testproject")
+    project_config = ProjectConfig(
+        watch_paths=[str(tmp_path)],
+        watch_patterns=["**/*.md"],
+    )
+
+    progress: list[int] = []
+    watcher = FileWatcher(store=store, project_config=project_config)
+    assert watcher.reconcile(progress_callback=progress.append) == 55
+    assert progress == [50]
+    assert store.count() == 55
+
+
+def test_index_handler_coalesces_burst_of_events(tmp_data_dir, tmp_path, monkeypatch):
+    """Several events for one path within the debounce window index it once."""
+    import threading
+    from watchdog.events import FileCreatedEvent, FileModifiedEvent
+    from annal import watcher as watcher_mod
+
+    md_file = tmp_path / "note.md"
+    md_file.write_text("# Note\nSaved in several writes.\n")
+
+    calls: list[str] = []
+    done = threading.Event()
+
+    def fake_index_file(store, path):
+        calls.append(path)
+        done.set()
+
+    monkeypatch.setattr(watcher_mod, "index_file", fake_index_file)
+    monkeypatch.setattr(watcher_mod, "_DEBOUNCE_SECONDS", 0.05)
+
+    store = make_store(tmp_data_dir, "testproject")
+    project_config = ProjectConfig(watch_paths=[str(tmp_path)], watch_patterns=["**/*.md"])
+    handler = watcher_mod._IndexHandler(store, project_config, str(tmp_path))
+
+    handler.on_created(FileCreatedEvent(str(md_file)))
+    for _ in range(3):
+        handler.on_modified(FileModifiedEvent(str(md_file)))
+
+    assert done.wait(timeout=5)
+    handler.cancel_pending()
+    assert calls == [str(md_file)]
+
+
+def test_index_handler_keeps_timer_rescheduled_while_running(tmp_data_dir, tmp_path, monkeypatch):
+    """A timer replaced while the old one waits to run is still cancellable."""
+    import threading
+    from annal import watcher as watcher_mod
+
+    md_file = tmp_path / "note.md"
+    md_file.write_text("# Note\n")
+    monkeypatch.setattr(watcher_mod, "index_file", lambda store, path: None)
+    monkeypatch.setattr(watcher_mod, "_DEBOUNCE_SECONDS", 0.01)
+
+    store = make_store(tmp_data_dir, "testproject")
+    project_config = ProjectConfig(watch_paths=[str(tmp_path)], watch_patterns=["**/*.md"])
+    handler = watcher_mod._IndexHandler(store, project_config, str(tmp_path))
+
+    entered = threading.Event()
+    release = threading.Event()
+    real_lock = handler._pending_lock
+
+    class GatedLock:
+        """Holds the first timer thread back until the test reschedules."""
+
+        def __enter__(self):
+            if isinstance(threading.current_thread(), threading.Timer) and not entered.is_set():
+                entered.set()
+                release.wait(timeout=5)
+            return real_lock.__enter__()
+
+        def __exit__(self, *exc):
+            return real_lock.__exit__(*exc)
+
+    handler._pending_lock = GatedLock()
+    handler._schedule(str(md_file), "index")
+    first = handler._pending[str(md_file)]
+    assert entered.wait(timeout=5)
+
+    monkeypatch.setattr(watcher_mod, "_DEBOUNCE_SECONDS", 60)
+    handler._schedule(str(md_file), "index")
+    second = handler._pending[str(md_file)]
+    release.set()
+    first.join(timeout=5)
+
+    assert handler._pending.get(str(md_file)) is second
+    handler.cancel_pending()
+    assert second.finished.is_set()
+
+
+def test_plan_watches_prunes_excluded_subtrees(tmp_path):
+    """Only directories with excluded descendants are watched non-recursively."""
+    from annal.watcher import _compile_patterns, _plan_watches
+
+    for d in ["docs/guide", "node_modules/pkg", "src/lib/node_modules/x", "src/app"]:
+        (tmp_path / d).mkdir(parents=True)
+    excludes = _compile_patterns(("**/node_modules/**",))
+
+    plan = sorted(_plan_watches(str(tmp_path), str(tmp_path), excludes))
+    assert plan == sorted([
+        (str(tmp_path), False),
+        (str(tmp_path / "docs"), True),
+        (str(tmp_path / "src"), False),
+        (str(tmp_path / "src" / "lib"), False),
+        (str(tmp_path / "src" / "app"), True),
+    ])
+
+
+def test_watcher_picks_up_new_dir_under_pruned_root(tmp_data_dir, tmp_path, monkeypatch):
+    """A directory created under a non-recursive watch gets watched and indexed."""
+    import threading
+    from annal import watcher as watcher_mod
+
+    (tmp_path / "node_modules").mkdir()
+    indexed: list[str] = []
+    done = threading.Event()
+
+    def fake_index_file(store, path):
+        indexed.append(path)
+        done.set()
+
+    monkeypatch.setattr(watcher_mod, "index_file", fake_index_file)
+    monkeypatch.setattr(watcher_mod, "_DEBOUNCE_SECONDS", 0.05)
+
+    store = make_store(tmp_data_dir, "testproject")
+    project_config = ProjectConfig(watch_paths=[str(tmp_path)], watch_patterns=["**/*.md"])
+    watcher = FileWatcher(store=store, project_config=project_config)
+    watcher.start()
+    try:
+        assert str(tmp_path) in watcher._flat_dirs
+        new_dir = tmp_path / "notes"
+        new_dir.mkdir()
+        (new_dir / "today.md").write_text("# Today\nA new note.\n")
+        assert done.wait(timeout=5)
+        assert indexed[0] == str(new_dir / "today.md")
+        assert str(new_dir) in watcher._watches
+    finally:
+        watcher.stop()
+
+
+def test_watcher_follows_dir_renamed_under_pruned_root(tmp_data_dir, tmp_path, monkeypatch):
+    """A renamed subdirectory is watched under its new name, not the old one."""
+    import threading
+    from annal import watcher as watcher_mod
+
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "drafts").mkdir()
+    actions: list[tuple[str, str]] = []
+    indexed = threading.Event()
+
+    def fake_run(self, path, action):
+        actions.append((path, action))
+        if path.endswith("later.md"):
+            indexed.set()
+
+    monkeypatch.setattr(watcher_mod._IndexHandler, "_run", fake_run)
+    monkeypatch.setattr(watcher_mod, "_DEBOUNCE_SECONDS", 0.05)
+
+    store = make_store(tmp_data_dir, "testproject")
+    project_config = ProjectConfig(watch_paths=[str(tmp_path)], watch_patterns=["**/*.md"])
+    watcher = FileWatcher(store=store, project_config=project_config)
+    watcher.start()
+    try:
+        assert str(tmp_path) in watcher._flat_dirs
+        assert str(tmp_path / "drafts") in watcher._watches
+        (tmp_path / "drafts").rename(tmp_path / "notes")
+        deadline = time.monotonic() + 5
+        while str(tmp_path / "notes") not in watcher._watches and time.monotonic() < deadline:
+            time.sleep(0.01)
+        (tmp_path / "notes" / "later.md").write_text("# Later\nWritten after the rename.\n")
+        assert indexed.wait(timeout=5)
+        assert str(tmp_path / "drafts") not in watcher._watches
+        assert (str(tmp_path / "drafts") + os.sep, "delete") in actions
+        assert (str(tmp_path / "notes" / "later.md"), "index") in actions
+    finally:
+        watcher.stop()
+
+
+def test_watcher_falls_back_to_recursive_watch_when_out_of_watches(tmp_data_dir, tmp_path, monkeypatch):
+    """Per-directory watches give way to one recursive watch past the budget or on OSError."""
+    from watchdog.observers.api import BaseObserver
+    from annal import watcher as watcher_mod
+
+    for d in ["node_modules", "docs", "src/app"]:
+        (tmp_path / d).mkdir(parents=True)
+    store = make_store(tmp_data_dir, "testproject")
+    project_config = ProjectConfig(watch_paths=[str(tmp_path)], watch_patterns=["**/*.md"])
+
+    # Watchers left running by other tests count against the same budget
+    before = watcher_mod._native_watches
+    monkeypatch.setattr(watcher_mod, "_MAX_NATIVE_WATCHES", before + 1)
+    watcher = FileWatcher(store=store, project_config=project_config)
+    watcher.start()
+    try:
+        assert list(watcher._watches) == [str(tmp_path)]
+        assert not watcher._flat_dirs
+    finally:
+        watcher.stop()
+    assert watcher_mod._native_watches == before
+
+    monkeypatch.setattr(watcher_mod, "_MAX_NATIVE_WATCHES", before + 64)
+    schedule = BaseObserver.schedule
+
+    def refuse_subdirs(self, handler, path, *, recursive=False, **kwargs):
+        if path != str(tmp_path):
+            raise OSError(24, "inotify instance limit reached")
+        return schedule(self, handler, path, recursive=recursive, **kwargs)
+
+    monkeypatch.setattr(BaseObserver, "schedule", refuse_subdirs)
+    watcher = FileWatcher(store=store, project_config=project_config)
+    watcher.start()
+    try:
+        assert list(watcher._watches) == [str(tmp_path)]
+        assert not watcher._flat_dirs
+        assert watcher_mod._native_watches == before + 1
+    finally:
+        watcher.stop()
+
+
+def test_default_patterns_compile_to_string_tests():
+    """Default include/exclude globs avoid the regex engine."""
+    from annal.config import DEFAULT_WATCH_EXCLUDE, DEFAULT_WATCH_PATTERNS
+    from annal.watcher import _compile_pattern
+
+    if os.path.normcase("A") != "A":
+        pytest.skip("case-insensitive platforms always use regexes")
+    kinds = {_compile_pattern(p)[0] for p in [*DEFAULT_WATCH_PATTERNS, *DEFAULT_WATCH_EXCLUDE]}
+    assert "re" not in kinds
+    assert _compile_pattern("docs/*.md")[0] == "re"
+
+
+def test_pattern_set_mixes_literal_and_regex_patterns():
+    """Merged literal tests and regex fallbacks agree with per-pattern matching."""
+    from annal.watcher import _compile_patterns
+
+    patterns = _compile_patterns(("**/*.md", "vendor/**", "**/.git/**", "Makefile", "docs/*.txt"))
+    assert patterns.matches("a/b/notes.md")
+    assert patterns.matches("vendor")
+    assert patterns.matches("vendor/lib/x.py")
+    assert patterns.matches("src/.git/HEAD")
+    assert patterns.matches("Makefile")
+    assert patterns.matches("docs/guide.txt")
+    assert not patterns.matches("vendored/x.py")
+    assert not patterns.matches("src/Makefile")
+    assert not patterns.matches("notes.txt")
+    assert not _compile_patterns(()).matches("anything.md")
+
+    excludes = _compile_patterns(("**/node_modules/**", "**/a/b/**", "**/node_modules/**"))
+    assert excludes.matches("node_modules/x.md")
+    assert excludes.matches("src/node_modules/")
+    assert excludes.matches("x/a/b/c.md")
+    assert not excludes.matches("src/node_modules")
+    assert not excludes.matches("a/bc/d.md")
+
+
+def test_reconcile_skips_touched_but_unchanged_files(tmp_data_dir, tmp_path):
+    """A new mtime with identical bytes refreshes the stored mtime only."""
+    md_file = tmp_path / "stable.md"
+    md_file.write_text("# Stable\nSame bytes after checkout.\n")
+
+    store = make_store(tmp_data_dir, "testproject")
+    project_config = ProjectConfig(watch_paths=[str(tmp_path)], watch_patterns=["**/*.md"])
+    watcher = FileWatcher(store=store, project_config=project_config)
+    assert watcher.reconcile() == 1
+    (original_id,) = [r["id"] for r in store.browse()[0]]
+
+    later = int(md_file.stat().st_mtime) + 100.0
+    os.utime(md_file, (later, later))
+    assert watcher.reconcile() == 0
+    assert [r["id"] for r in store.browse()[0]] == [original_id]
+    assert store.get_all_file_mtimes() == {f"file:{md_file}": later}
+
+    md_file.write_text("# Stable\nNow the content really changed.\n")
+    os.utime(md_file, (later + 100, later + 100))
+    assert watcher.reconcile() == 1
+    assert [r["id"] for r in store.browse()[0]] != [original_id]
+
+
+def test_reconcile_embeds_off_the_writing_thread(tmp_data_dir, tmp_path, monkeypatch):
+    import threading
+    from annal import watcher as watcher_module
+
+    for i in range(6):
+        (tmp_path / f"note{i}.md").write_text(f"# Note {i}\nBody of note {i}.\n")
+    monkeypatch.setattr(watcher_module, "_INSERT_BATCH", 1)
+
+    store = make_store(tmp_data_dir, "testproject")
+    embed_threads = []
+    real_embed_items = store.embed_items
+    monkeypatch.setattr(
+        store, "embed_items",
+        lambda items: embed_threads.append(threading.current_thread()) or real_embed_items(items),
+    )
+    project_config = ProjectConfig(watch_paths=[str(tmp_path)], watch_patterns=["**/*.md"])
+    assert FileWatcher(store=store, project_config=project_config).reconcile() == 6
+
+    assert len(embed_threads) == 6
+    assert threading.current_thread() not in embed_threads
+    assert len(store.get_all_file_mtimes()) == 6
+
+
+def test_batch_mtimes_keeps_order_across_batches(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    import annal.watcher as watcher_module
+
+    monkeypatch.setattr(watcher_module, "_STAT_BATCH", 3)
+    for i in range(10):
+        path = tmp_path / f"f{i}.md"
+        path.write_text("x")
+        os.utime(path, (1000 + i, 1000 + i))
+    entries = sorted(os.scandir(tmp_path), key=lambda e: int(e.name[1:-3]))
+    (tmp_path / "f4.md").unlink()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        mtimes = watcher_module._batch_mtimes(entries, pool)
+    assert mtimes == [1000 + i if i != 4 else None for i in range(10)]
+
+
+def test_prepared_files_bounds_reads_in_flight(tmp_path, monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    import annal.watcher as watcher_module
+
+    monkeypatch.setattr(watcher_module, "_RECONCILE_WORKERS", 2)
+    lock = threading.Lock()
+    active = peak = 0
+
+    def slow_prepare(path):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return path
+
+    monkeypatch.setattr(watcher_module, "prepare_file", slow_prepare)
+    pending = [(str(tmp_path / f"f{i}.md"), float(i)) for i in range(12)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(watcher_module._prepared_files(pool, pending))
+
+    assert sorted(path for path, _, _ in results) == sorted(path for path, _ in pending)
+    assert all(future.result() == path for path, _, future in results)
+    assert peak <= 4
+
+
+def test_watcher_polls_network_filesystems(tmp_data_dir, tmp_path, monkeypatch):
+    """Watch roots on network mounts get a PollingObserver; others stay native."""
+    import threading
+    from watchdog.observers.polling import PollingObserver
+    from annal import watcher as watcher_mod
+
+    assert watcher_mod._is_network_fs(str(tmp_path)) is False
+
+    indexed: list[str] = []
+    done = threading.Event()
+
+    def fake_index_file(store, path):
+        indexed.append(path)
+        done.set()
+
+    monkeypatch.setattr(watcher_mod, "index_file", fake_index_file)
+    monkeypatch.setattr(watcher_mod, "_DEBOUNCE_SECONDS", 0.05)
+    monkeypatch.setattr(watcher_mod, "_POLL_INTERVAL", 0.1)
+    monkeypatch.setattr(watcher_mod, "_is_network_fs", lambda path: True)
+
+    store = make_store(tmp_data_dir, "testproject")
+    project_config = ProjectConfig(watch_paths=[str(tmp_path)], watch_patterns=["**/*.md"])
+    watcher = FileWatcher(store=store, project_config=project_config)
+    watcher.start()
+    try:
+        assert list(watcher._observers) == [True]
+        assert isinstance(watcher._observers[True], PollingObserver)
+        (tmp_path / "remote.md").write_text("# Remote\nWritten by another client.\n")
+        assert done.wait(timeout=5)
+        assert indexed[0] == str(tmp_path / "remote.md")
+    finally:
+        watcher.stop()